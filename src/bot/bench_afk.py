@@ -0,0 +1,142 @@
+"""
+Benchmark do estágio AFK do pipeline de mensagens, com e sem o registo em memória.
+
+Semeia um banco SQLite temporário com alguns utilizadores AFK e passa mensagens
+sintéticas (autores que não estão AFK, 0 a 3 menções, algumas a utilizadores
+AFK) por dois estágios:
+  - "registo": o AFK.process_message atual (consulta ao registo em memória);
+  - "banco": o caminho anterior ao registo, um SELECT ao autor e um por menção.
+Cada mensagem tem o seu MessageContext, como no pipeline real. Mostra as
+mensagens por segundo de cada um e quantas consultas chegaram ao banco.
+
+Uso (na raiz do projeto):
+    python src/bot/bench_afk.py
+    python src/bot/bench_afk.py --messages 20000 --afk 500
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime
+from types import SimpleNamespace
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Utilizadores que escrevem e são mencionados (os AFK são os primeiros `afk` ids)
+POPULATION = 10_000
+
+class FakeUser(SimpleNamespace):
+    """O mínimo de um discord.Member que o estágio e o EmbedFactory usam."""
+
+    def __init__(self, user_id: int):
+        super().__init__(
+            id=user_id,
+            display_name=f"user{user_id}",
+            mention=f"<@{user_id}>",
+            display_avatar=SimpleNamespace(url="https://cdn.discordapp.com/embed/avatars/0.png"),
+        )
+
+    async def edit(self, **kwargs):
+        pass
+
+class FakeChannel:
+    async def send(self, *args, **kwargs):
+        pass
+
+class FakeMessage(SimpleNamespace):
+    async def reply(self, *args, **kwargs):
+        pass
+
+def make_messages(count: int, afk: int) -> list[FakeMessage]:
+    rng = random.Random(42)
+    users = [FakeUser(user_id) for user_id in range(1, POPULATION + 1)]
+    channel = FakeChannel()
+    messages = []
+    for _ in range(count):
+        # Autores fora do AFK: o registo não muda entre corridas e mede-se o caminho comum
+        author = users[rng.randrange(afk, POPULATION)]
+        mentions = [users[rng.randrange(POPULATION)] for _ in range(rng.choice((0, 0, 0, 1, 1, 2, 3)))]
+        messages.append(FakeMessage(
+            author=author, content="mensagem de teste", mentions=mentions, channel=channel, guild=None
+        ))
+    return messages
+
+async def run(messages: int, afk: int) -> int:
+    from sqlalchemy import event, insert, select
+    from bot.core.database import engine, init_db, get_session
+    from bot.core.pipeline import MessageContext
+    from bot.cogs.afk import AFK
+    from bot.models.afk import AFKStatus
+    from bot.services.afk_service import AFKService
+    import bot.models
+
+    await init_db()
+    async with engine.begin() as conn:
+        await conn.execute(insert(AFKStatus.__table__), [
+            {"user_id": user_id, "guild_id": 1, "reason": "Ocupado", "start_time": datetime.utcnow()}
+            for user_id in range(1, afk + 1)
+        ])
+
+    queries = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        nonlocal queries
+        queries += 1
+
+    async def db_stage(ctx: MessageContext):
+        """O estágio antes do registo: o autor e cada menção consultados no banco."""
+        message = ctx.message
+        session = await ctx.session()
+        stmt = select(AFKStatus).where(AFKStatus.user_id == message.author.id)
+        (await session.execute(stmt)).scalar_one_or_none()
+        for mentioned in message.mentions:
+            if mentioned.id == message.author.id:
+                continue
+            stmt = select(AFKStatus).where(AFKStatus.user_id == mentioned.id)
+            (await session.execute(stmt)).scalar_one_or_none()
+
+    cog = AFK(bot=None)
+    async with get_session() as session:
+        await AFKService(session).load_registry()
+
+    batch = make_messages(messages, afk)
+    results = {}
+    for label, stage in (("banco", db_stage), ("registo", cog.process_message)):
+        queries = 0
+        start = time.perf_counter()
+        for message in batch:
+            ctx = MessageContext(message)
+            try:
+                await stage(ctx)
+            finally:
+                await ctx.close()
+        elapsed = time.perf_counter() - start
+        results[label] = messages / elapsed
+        print(f"{label:>8}: {messages} mensagens em {elapsed:.2f}s ({results[label]:,.0f} msg/s, {queries} consultas)")
+
+    await engine.dispose()
+    print(f"\n⚡ Registo em memória: {results['registo'] / results['banco']:.0f}x mais rápido ({afk} AFK de {POPULATION}).")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do estágio AFK do pipeline de mensagens.")
+    parser.add_argument("--messages", type=int, default=5000, help="Mensagens sintéticas por corrida")
+    parser.add_argument("--afk", type=int, default=100, help="Utilizadores AFK semeados")
+    args = parser.parse_args()
+
+    if not 0 <= args.afk < POPULATION:
+        parser.error(f"--afk tem de estar entre 0 e {POPULATION - 1}.")
+
+    # Tem de ser definido antes de importar bot.config
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_afk.db")
+    os.environ["POSTGRES_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    sys.path.append(SRC_DIR)
+
+    sys.exit(asyncio.run(run(args.messages, args.afk)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Verificação dos planos de consulta (EXPLAIN QUERY PLAN) das consultas quentes dos serviços.
+
+Cria um banco SQLite temporário com as tabelas e índices do bot, semeia-o com
+muitos utilizadores (1M por omissão), corre as consultas reais dos serviços e
+falha (código de saída 1) se alguma fizer uma leitura completa da tabela.
+
+Uso (na raiz do projeto):
+    python src/bot/check_query_plans.py
+    python src/bot/check_query_plans.py --users 100000 --db /tmp/plans.db
+"""
+import os
+import re
+import sys
+import time
+import random
+import sqlite3
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Tabelas pequenas que podem ser lidas por inteiro sem problema
+ALLOWED_SCANS = {"shop_items"}
+
+# Consultas que podem ordenar numa tabela temporária, e porquê
+ALLOWED_SORTS = {
+    # Ordena só os membros de um servidor (não a tabela inteira), e só corre
+    # enquanto o ranking em memória ainda não foi carregado
+    "UserService.get_leaderboard (servidor)",
+}
+
+# "SCAN users" sem índice; "SCAN users USING INDEX ..." percorre o índice por ordem
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+TEMP_SORT = re.compile(r"^USE TEMP B-TREE")
+
+def seed(db_path: str, users: int):
+    """Semeia o banco com dados sintéticos (sqlite3 síncrono, em lote)."""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    def rows(count, factory):
+        return (factory(i) for i in range(1, count + 1))
+
+    few = max(1000, users // 100)
+
+    conn.executemany(
+        "INSERT INTO users (id, xp_maturidade, nivel, xp_total, dream_coins) VALUES (?, ?, ?, ?, ?)",
+        rows(users, lambda i: (i, rng.randrange(1000), rng.randrange(1, 80), rng.randrange(400000), rng.randrange(100000)))
+    )
+    conn.executemany(
+        "INSERT INTO guild_members (guild_id, user_id, joined_at) VALUES (?, ?, ?)",
+        rows(users, lambda i: (i % 100, i, now))
+    )
+    conn.executemany(
+        "INSERT INTO reminders (user_id, channel_id, message, created_at, due_at, active) VALUES (?, ?, ?, ?, ?, ?)",
+        rows(few, lambda i: (i, 1, "lembrete", now, now + timedelta(minutes=rng.randrange(-600, 6000)), rng.random() < 0.1))
+    )
+    conn.executemany(
+        "INSERT INTO giveaways (guild_id, channel_id, message_id, prize, winners_count, end_time, active) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows(few, lambda i: (1, 1, i, "prémio", 1, now + timedelta(minutes=rng.randrange(-600, 6000)), rng.random() < 0.1))
+    )
+    conn.executemany(
+        "INSERT INTO events (guild_id, channel_id, message_id, organizer_id, title, description, start_time, active) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        rows(few, lambda i: (1, 1, i, 1, "evento", "descrição", now + timedelta(hours=rng.randrange(-600, 600)), rng.random() < 0.1))
+    )
+    conn.executemany(
+        "INSERT INTO event_participants (event_id, user_id, status) VALUES (?, ?, ?)",
+        rows(few * 10, lambda i: (rng.randrange(1, few + 1), rng.randrange(1, users + 1), rng.choice(["going", "maybe"])))
+    )
+    conn.executemany(
+        "INSERT INTO reaction_roles (guild_id, channel_id, message_id, emoji, role_id) VALUES (?, ?, ?, ?, ?)",
+        rows(few, lambda i: (1, 1, i // 5, f"e{i % 5}", i))
+    )
+    conn.executemany(
+        "INSERT INTO tags (guild_id, author_id, name, content, uses, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        rows(few, lambda i: (i % 100, 1, f"tag_{i}", "conteúdo", 0, now))
+    )
+    conn.executemany(
+        "INSERT INTO birthdays (user_id, day, month) VALUES (?, ?, ?)",
+        rows(few * 10, lambda i: (i, rng.randrange(1, 29), rng.randrange(1, 13)))
+    )
+    conn.executemany(
+        "INSERT INTO user_skills (user_id, skill) VALUES (?, ?)",
+        rows(few * 10, lambda i: (rng.randrange(1, users + 1), rng.choice(["python", "marketing", "fitness", "design", "java", "rust"]) + str(i % 50)))
+    )
+    conn.executemany(
+        "INSERT INTO focus_sessions (user_id, channel_id, minutes, xp_reward, started_at, ends_at, active) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows(few, lambda i: (i, 1, 25, 125, now, now + timedelta(minutes=rng.randrange(-6000, 120)), rng.random() < 0.05))
+    )
+    conn.executemany(
+        "INSERT INTO automod_words (guild_id, word, created_at) VALUES (?, ?, ?)",
+        rows(few, lambda i: (i % 100, f"termo{i}", now))
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+def hot_queries():
+    """(rótulo, função async que recebe a sessão) das consultas a verificar."""
+    from bot.services.user_service import UserService
+    from bot.services.guild_service import GuildService
+    from bot.services.reminder_service import ReminderService
+    from bot.services.giveaway_service import GiveawayService
+    from bot.services.event_service import EventService
+    from bot.services.reaction_role_service import ReactionRoleService
+    from bot.services.tag_service import TagService
+    from bot.services.birthday_service import BirthdayService
+    from bot.services.networking_service import NetworkingService
+    from bot.services.focus_service import FocusService
+    from bot.services.automod_service import AutoModService
+
+    now = datetime.utcnow()
+    return [
+        ("UserService.get_profile", lambda s: UserService(s).get_profile(12345)),
+        ("UserService.get_leaderboard", lambda s: UserService(s).get_leaderboard()),
+        ("UserService.get_leaderboard (servidor)", lambda s: UserService(s).get_leaderboard(guild_id=7)),
+        ("UserService.get_rich_list", lambda s: UserService(s).get_rich_list()),
+        ("GuildService.get_config", lambda s: GuildService(s).get_config(1)),
+        ("ReminderService.get_due_reminders", lambda s: ReminderService(s).get_due_reminders(now + timedelta(hours=1))),
+        ("GiveawayService.get_due_giveaways", lambda s: GiveawayService(s).get_due_giveaways(now + timedelta(hours=1))),
+        ("EventService.get_due_events", lambda s: EventService(s).get_due_events(now + timedelta(hours=1), now - timedelta(hours=1))),
+        ("EventService.get_participants", lambda s: EventService(s).get_participants(7, "going")),
+        ("ReactionRoleService.get_role_by_reaction", lambda s: ReactionRoleService(s).get_role_by_reaction(10, "e1")),
+        ("TagService.get_tag", lambda s: TagService(s).get_tag(3, "tag_3")),
+        ("TagService.list_tags", lambda s: TagService(s).list_tags(3)),
+        ("BirthdayService.get_todays_birthdays", lambda s: BirthdayService(s).get_todays_birthdays()),
+        ("NetworkingService.search_users_by_skill", lambda s: NetworkingService(s).search_users_by_skill("py")),
+        ("NetworkingService.get_user_skills", lambda s: NetworkingService(s).get_user_skills(12345)),
+        ("FocusService.get_due_sessions", lambda s: FocusService(s).get_due_sessions(now + timedelta(hours=1))),
+        ("FocusService.get_active", lambda s: FocusService(s).get_active(12345)),
+        ("AutoModService.list_words", lambda s: AutoModService(s).list_words(3)),
+    ]
+
+async def run(db_path: str, users: int) -> int:
+    from sqlalchemy import event
+    from bot.core.database import engine, init_db, get_session
+    import bot.models
+
+    print(f"🗄️  Banco: {db_path}")
+    await init_db()
+
+    start = time.perf_counter()
+    seed(db_path, users)
+    print(f"🌱 Semeado com {users} utilizadores em {time.perf_counter() - start:.1f}s")
+
+    captured: list[tuple[str, tuple]] = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, tuple(parameters or ())))
+
+    plans = sqlite3.connect(db_path)
+    failures = 0
+
+    for label, call in hot_queries():
+        captured.clear()
+        async with get_session() as session:
+            await call(session)
+
+        for statement, parameters in captured:
+            rows = plans.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            details = [row[-1] for row in rows]
+            scans = [
+                d for d in details
+                if (m := FULL_SCAN.match(d)) and m.group(1) not in ALLOWED_SCANS
+                or TEMP_SORT.match(d) and label not in ALLOWED_SORTS
+            ]
+            status = "❌" if scans else "✅"
+            failures += bool(scans)
+            print(f"{status} {label}: {' | '.join(details)}")
+
+    plans.close()
+    await engine.dispose()
+
+    if failures:
+        print(f"\n{failures} consulta(s) com leitura completa de tabela ou ordenação temporária.")
+        return 1
+    print("\nTodas as consultas usam índices.")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica os planos de consulta dos serviços.")
+    parser.add_argument("--users", type=int, default=1_000_000, help="Utilizadores a semear")
+    parser.add_argument("--db", help="Caminho do banco (por omissão, um ficheiro temporário)")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "query_plans.db")
+    if os.path.exists(db_path):
+        print(f"❌ {db_path} já existe; indique um caminho novo.")
+        sys.exit(2)
+
+    # Tem de ser definido antes de importar bot.config
+    os.environ["POSTGRES_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    sys.path.append(SRC_DIR)
+
+    sys.exit(asyncio.run(run(db_path, args.users)))
+
+if __name__ == "__main__":
+    main()
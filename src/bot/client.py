@@ -5,7 +5,14 @@ import platform
 import datetime
 from discord.ext import commands
 from bot.config import settings
-from bot.core.database import init_db
+from bot.core.database import init_db, log_engine_profile
+from bot.core.cache import invalidation_channel
+from bot.core.ledger import user_ledger
+from bot.core.activity import activity_xp
+from bot.core.pipeline import MessagePipeline
+from bot.core.log_sink import LogSink
+from bot.core.scheduler import Scheduler
+from bot.core.reward_roles import RewardRoleSync
 import bot.models
 from bot.utils.logger import TermColors
 
@@ -29,18 +36,36 @@ class DreamClubBot(commands.Bot):
             activity=discord.Game(name=f"Iniciando {settings.bot_profile}...")
         )
 
+        # Pipeline de mensagens: os cogs registam estágios em vez de ouvirem on_message
+        self.pipeline = MessagePipeline()
+        # Logs de moderação agrupados por canal (até 10 embeds por mensagem)
+        self.log_sink = LogSink(self, settings.log_flush_delay, settings.log_max_queue)
+        # Trabalhos com hora marcada; os cogs registam os seus tipos em cog_load
+        self.scheduler = Scheduler(datetime.timedelta(seconds=settings.scheduler_horizon))
+        # Cargos de recompensa por nível (subidas de nível e acertos de servidor inteiro)
+        self.reward_roles = RewardRoleSync(self, settings.reward_sync_concurrency, settings.reward_sync_interval)
+
     async def setup_hook(self) -> None:
         """Configuração inicial ao ligar."""
         logger.info(f"--- Setup Hook ({settings.bot_profile}) ---")
         
         # 1. Banco de Dados
+        await log_engine_profile()
+
         # Apenas o MAIN deve criar tabelas para evitar conflitos de escrita (Database Locked)
         if settings.bot_profile == "MAIN":
             logger.info("Verificando integridade do Banco de Dados...")
             await init_db()
-        
+
+        # Invalidações de cache publicadas por outros processos (Web, MAIN, MUSIC_n)
+        invalidation_channel.start(settings.cache_poll_interval)
+
+        # Prémios de XP/DreamCoins acumulados em memória e gravados em lote
+        user_ledger.start()
+
         # 2. Carregar Cogs (Baseado no Perfil)
         await self.load_cogs()
+        self.scheduler.start()
         
         # 3. Sincronizar Comandos
         try:
@@ -101,6 +126,26 @@ class DreamClubBot(commands.Bot):
         
         logger.info(f"Total de módulos ativos para {settings.bot_profile}: {count}")
 
+    async def close(self):
+        """Encerra as tarefas internas antes de desligar a conexão."""
+        await invalidation_channel.stop()
+        await self.scheduler.stop()
+        await self.reward_roles.stop()
+        await self.log_sink.close()
+        # Grava os prémios pendentes antes de perder o processo (o XP de atividade passa pelo ledger)
+        await activity_xp.stop()
+        await user_ledger.stop()
+        await super().close()
+
+    async def on_message(self, message: discord.Message):
+        """Corre o pipeline uma vez por mensagem de servidor e depois os comandos de texto."""
+        if message.guild and not message.author.bot:
+            ctx = await self.pipeline.run(message)
+            if ctx.stopped:
+                return
+
+        await self.process_commands(message)
+
     async def on_ready(self):
         # Define o status baseado no perfil
         status_text = "Dream Club Members"
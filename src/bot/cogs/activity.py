@@ -0,0 +1,89 @@
+import discord
+from discord.ext import commands
+from bot.config import settings
+from bot.core.activity import activity_xp
+from bot.core.pipeline import MessageContext
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Activity(commands.Cog):
+    """
+    XP passivo por conversar e por estar em canais de voz.
+    Os prémios ficam em memória (core.activity) e são gravados em lote.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        activity_xp.on_level_up = self.level_up
+        activity_xp.start()
+        self.bot.pipeline.register("activity_xp", self.process_message, priority=200)
+        if self.bot.is_ready():
+            self.seed_voice()
+
+    async def cog_unload(self):
+        self.bot.pipeline.unregister("activity_xp")
+        await activity_xp.stop()
+        activity_xp.on_level_up = None
+
+    # --- Mensagens ---
+    async def process_message(self, ctx: MessageContext):
+        """Estágio do pipeline de mensagens (não abre sessão do banco)."""
+        message = ctx.message
+        if message.content.startswith(settings.command_prefix):
+            return
+        activity_xp.message(message.author.id, message.guild.id, len(message.content))
+
+    # --- Voz ---
+    @staticmethod
+    def _counts(member: discord.Member, humans: int) -> bool:
+        """A voz só conta acompanhada, sem ensurdecer e fora do canal AFK."""
+        voice = member.voice
+        if member.bot or voice is None or voice.channel is None:
+            return False
+        if voice.afk or voice.deaf or voice.self_deaf:
+            return False
+        return humans >= settings.activity_voice_min_members
+
+    def _refresh(self, channel: discord.VoiceChannel | discord.StageChannel):
+        """Reavalia quem conta XP num canal (a saída de um membro pode deixar outro sozinho)."""
+        members = channel.members
+        humans = sum(1 for m in members if not m.bot)
+        for member in members:
+            if self._counts(member, humans):
+                activity_xp.voice_start(member.id, channel.guild.id)
+            elif activity_xp.in_voice(member.id):
+                activity_xp.voice_stop(member.id)
+
+    def seed_voice(self):
+        """Abre os intervalos de quem já estava em voz quando o bot ligou."""
+        for guild in self.bot.guilds:
+            for channel in [*guild.voice_channels, *guild.stage_channels]:
+                if channel.members:
+                    self._refresh(channel)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.seed_voice()
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if member.bot:
+            return
+
+        if after.channel is None:
+            activity_xp.voice_stop(member.id)
+
+        for channel in {before.channel, after.channel} - {None}:
+            self._refresh(channel)
+
+    # --- Subidas de nível ---
+    async def level_up(self, guild_id: int, user_id: int, levels: list[int]):
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(user_id) if guild else None
+        if member:
+            self.bot.dispatch("level_up", member, levels)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Activity(bot))
@@ -2,6 +2,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from bot.core.database import get_session
+from bot.core.pipeline import MessageContext
 from bot.services.afk_service import AFKService
 from bot.utils.embeds import EmbedFactory, DreamColors
 import datetime
@@ -39,43 +40,48 @@ class AFK(commands.Cog):
         )
         await interaction.followup.send(embed=embed)
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
-            return
-
+    async def cog_load(self):
         async with get_session() as session:
-            service = AFKService(session)
+            await AFKService(session).load_registry()
+        self.bot.pipeline.register("afk", self.process_message, priority=50)
+
+    async def cog_unload(self):
+        self.bot.pipeline.unregister("afk")
+
+    async def process_message(self, ctx: MessageContext):
+        """Estágio do pipeline de mensagens."""
+        message = ctx.message
 
-            # 1. Voltou do AFK?
-            if not message.content.startswith("/afk"):
-                was_afk = await service.remove_afk(message.author.id)
-                if was_afk:
-                    # Mensagem simples de boas-vindas
-                    await message.channel.send(f"👋 Bem-vindo de volta, {message.author.mention}! Removi o teu AFK.", delete_after=5)
-                    try:
-                        name = message.author.display_name
-                        if name.startswith("[AFK] "):
-                            await message.author.edit(nick=name.replace("[AFK] ", "", 1))
-                    except: pass
+        # 1. Voltou do AFK? (a sessão só é aberta quando o autor está mesmo AFK)
+        if AFKService.is_afk(message.author.id) and not message.content.startswith("/afk"):
+            service = AFKService(await ctx.session())
+            was_afk = await service.remove_afk(message.author.id)
+            if was_afk:
+                # Mensagem simples de boas-vindas
+                await message.channel.send(f"👋 Bem-vindo de volta, {message.author.mention}! Removi o teu AFK.", delete_after=5)
+                try:
+                    name = message.author.display_name
+                    if name.startswith("[AFK] "):
+                        await message.author.edit(nick=name.replace("[AFK] ", "", 1))
+                except: pass
 
-            # 2. Mencionou alguém AFK?
-            if message.mentions:
-                for mentioned in message.mentions:
-                    if mentioned.id == message.author.id:
-                        continue
+        # 2. Mencionou alguém AFK?
+        if message.mentions:
+            for mentioned in message.mentions:
+                if mentioned.id == message.author.id:
+                    continue
 
-                    afk_data = await service.get_afk_status(mentioned.id)
-                    if afk_data:
-                        start_ts = int(afk_data.start_time.timestamp())
-                        
-                        embed = EmbedFactory.create(
-                            description=f"**Motivo:** {afk_data.reason}\n⏳ **Desde:** <t:{start_ts}:R>",
-                            color=DreamColors.WARNING,
-                            author=mentioned,
-                            footer="Este usuário está ausente."
-                        )
-                        await message.reply(embed=embed, delete_after=10)
+                afk_data = AFKService.lookup(mentioned.id)
+                if afk_data:
+                    start_ts = int(afk_data.start_time.timestamp())
+                    
+                    embed = EmbedFactory.create(
+                        description=f"**Motivo:** {afk_data.reason}\n⏳ **Desde:** <t:{start_ts}:R>",
+                        color=DreamColors.WARNING,
+                        author=mentioned,
+                        footer="Este usuário está ausente."
+                    )
+                    await message.reply(embed=embed, delete_after=10)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(AFK(bot))
\ No newline at end of file
@@ -2,9 +2,11 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from bot.core.database import get_session
+from bot.core.pipeline import MessageContext
+from bot.core.automod import automod_engine, DEFAULT_WORDS
+from bot.services.automod_service import AutoModService
 from bot.services.guild_service import GuildService
 from bot.utils.embeds import EmbedFactory, DreamColors
-import re
 import datetime
 
 class AutoMod(commands.Cog):
@@ -13,58 +15,54 @@ class AutoMod(commands.Cog):
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.invite_regex = re.compile(r'(https?://)?(www\.)?(discord\.(gg|io|me|li)|discordapp\.com/invite)/.+[a-z]')
-        self.bad_words = ["palavrao1", "palavrao2", "scam", "casino"]
+        self.engine = automod_engine
 
-    async def log_action(self, message: discord.Message, reason: str):
-        async with get_session() as session:
-            service = GuildService(session)
-            config = await service.get_config(message.guild.id)
-            
-            if config.log_channel_id:
-                channel = message.guild.get_channel(config.log_channel_id)
-                if channel:
-                    # Embed de Log Profissional
-                    embed = EmbedFactory.create(
-                        title="🛡️ AutoMod Action",
-                        description=f"**Infrator:** {message.author.mention} (`{message.author.id}`)\n"
-                                    f"**Motivo:** {reason}\n"
-                                    f"**Canal:** {message.channel.mention}",
-                        color=DreamColors.ERROR
-                    )
-                    embed.add_field(name="Conteúdo Apagado", value=message.content[:1024] or "*Conteúdo multimédia*", inline=False)
-                    await channel.send(embed=embed)
-
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if not message.guild or message.author.bot:
-            return
+    async def cog_load(self):
+        # Corre antes dos outros estágios: uma mensagem apagada não segue no pipeline
+        self.bot.pipeline.register("automod", self.process_message, priority=10)
+
+    async def cog_unload(self):
+        self.bot.pipeline.unregister("automod")
 
-        if message.author.guild_permissions.administrator:
+    async def log_action(self, ctx: MessageContext, reason: str):
+        message = ctx.message
+        if ctx.config and ctx.config.log_channel_id:
+            channel = message.guild.get_channel(ctx.config.log_channel_id)
+            if channel:
+                # Embed de Log Profissional
+                embed = EmbedFactory.create(
+                    title="🛡️ AutoMod Action",
+                    description=f"**Infrator:** {message.author.mention} (`{message.author.id}`)\n"
+                                f"**Motivo:** {reason}\n"
+                                f"**Canal:** {message.channel.mention}",
+                    color=DreamColors.ERROR
+                )
+                embed.add_field(name="Conteúdo Apagado", value=message.content[:1024] or "*Conteúdo multimédia*", inline=False)
+                self.bot.log_sink.push(channel, embed, "automod")
+
+    async def process_message(self, ctx: MessageContext):
+        """Estágio do pipeline de mensagens."""
+        if ctx.is_admin:
+            return
+        if ctx.config and not ctx.config.module_automod:
             return
 
-        content_lower = message.content.lower()
+        rules = await self.engine.rules_for(ctx.message.guild.id, ctx.session)
+        violation = self.engine.check(ctx, rules)
+        if not violation:
+            return
 
-        # Anti-Invite
-        if self.invite_regex.search(content_lower):
+        message = ctx.message
+        ctx.stop()
+        try:
             await message.delete()
-            # Aviso efêmero ou temporário
-            embed = EmbedFactory.warning(f"{message.author.mention} **Divulgação não é permitida aqui!**")
-            await message.channel.send(embed=embed, delete_after=5)
-            await self.log_action(message, "Link de Convite (Anti-Invite)")
+        except discord.NotFound:
             return
 
-        # Filtro de Palavras
-        for word in self.bad_words:
-            if word in content_lower:
-                try:
-                    await message.delete()
-                    embed = EmbedFactory.warning(f"{message.author.mention} ⚠️ Mantenha o nível da conversa.")
-                    await message.channel.send(embed=embed, delete_after=5)
-                    await self.log_action(message, f"Palavra Bloqueada: {word}")
-                    return
-                except discord.NotFound:
-                    pass
+        # Aviso efêmero ou temporário
+        embed = EmbedFactory.warning(f"{message.author.mention} {violation.warning}")
+        await message.channel.send(embed=embed, delete_after=5)
+        await self.log_action(ctx, violation.reason)
 
     @app_commands.command(name="config_logs", description="[Admin] Define o canal para logs de moderação.")
     @app_commands.checks.has_permissions(administrator=True)
@@ -77,5 +75,112 @@ class AutoMod(commands.Cog):
             
         await interaction.followup.send(embed=EmbedFactory.success(f"Canal de logs definido para: {canal.mention}"))
 
+    # --- Configuração das Regras ---
+    @app_commands.command(name="automod_palavras_add", description="[Admin] Bloqueia termos (separados por vírgula).")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def automod_palavras_add(self, interaction: discord.Interaction, termos: str):
+        await interaction.response.defer(ephemeral=True)
+
+        async with get_session() as session:
+            added = await AutoModService(session).add_words(interaction.guild.id, termos.split(","))
+        self.engine.invalidate(interaction.guild.id)
+
+        if added:
+            await interaction.followup.send(embed=EmbedFactory.success(f"{len(added)} termo(s) bloqueado(s)."))
+        else:
+            await interaction.followup.send(embed=EmbedFactory.warning("Nenhum termo novo (já estavam na lista)."))
+
+    @app_commands.command(name="automod_palavras_remover", description="[Admin] Remove um termo bloqueado.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def automod_palavras_remover(self, interaction: discord.Interaction, termo: str):
+        await interaction.response.defer(ephemeral=True)
+
+        async with get_session() as session:
+            removed = await AutoModService(session).remove_word(interaction.guild.id, termo)
+        self.engine.invalidate(interaction.guild.id)
+
+        if removed:
+            await interaction.followup.send(embed=EmbedFactory.success(f"Termo `{termo}` removido."))
+        else:
+            await interaction.followup.send(embed=EmbedFactory.error(f"O termo `{termo}` não está na lista."))
+
+    @app_commands.command(name="automod_palavras", description="[Admin] Lista os termos bloqueados.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def automod_palavras(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+
+        async with get_session() as session:
+            words = await AutoModService(session).list_words(interaction.guild.id)
+
+        if not words:
+            desc = "Nenhum termo configurado. A usar a lista padrão:\n" + ", ".join(f"`{w}`" for w in DEFAULT_WORDS)
+        else:
+            desc = ", ".join(f"`{w}`" for w in words)
+        embed = EmbedFactory.create(title=f"🛡️ Termos Bloqueados ({len(words)})", description=desc[:4000], color=DreamColors.INFO)
+        await interaction.followup.send(embed=embed)
+
+    @app_commands.command(name="automod_config", description="[Admin] Ajusta as regras do AutoMod.")
+    @app_commands.describe(
+        convites="Bloquear convites de outros servidores",
+        palavras="Bloquear termos da lista",
+        maiusculas="Percentagem de maiúsculas a partir da qual apaga (0 desliga)",
+        mencoes="Máximo de menções por mensagem (0 desliga)",
+        repeticoes="Repetições da mesma mensagem permitidas (0 desliga)",
+        flood="Detetar rajadas de mensagens e tempestades de menções"
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def automod_config(self, interaction: discord.Interaction,
+                             convites: bool = None, palavras: bool = None,
+                             maiusculas: app_commands.Range[int, 0, 100] = None,
+                             mencoes: app_commands.Range[int, 0, 50] = None,
+                             repeticoes: app_commands.Range[int, 0, 20] = None,
+                             flood: bool = None):
+        await interaction.response.defer(ephemeral=True)
+
+        fields = {}
+        if convites is not None: fields["block_invites"] = convites
+        if palavras is not None: fields["block_words"] = palavras
+        if maiusculas is not None:
+            fields["block_caps"] = maiusculas > 0
+            if maiusculas: fields["caps_ratio"] = maiusculas / 100
+        if mencoes is not None:
+            fields["block_mentions"] = mencoes > 0
+            if mencoes: fields["mention_limit"] = mencoes
+        if repeticoes is not None:
+            fields["block_duplicates"] = repeticoes > 0
+            if repeticoes: fields["duplicate_limit"] = repeticoes
+        if flood is not None: fields["block_flood"] = flood
+
+        async with get_session() as session:
+            config = await AutoModService(session).update_config(interaction.guild.id, **fields)
+        self.engine.invalidate(interaction.guild.id)
+
+        def state(on: bool) -> str:
+            return "✅" if on else "❌"
+
+        embed = EmbedFactory.create(title="🛡️ Regras do AutoMod", color=DreamColors.INFO)
+        embed.add_field(name="Convites", value=state(config.block_invites), inline=True)
+        embed.add_field(name="Palavras", value=state(config.block_words), inline=True)
+        embed.add_field(name="Maiúsculas", value=f"{state(config.block_caps)} {int(config.caps_ratio * 100)}%", inline=True)
+        embed.add_field(name="Menções", value=f"{state(config.block_mentions)} máx. {config.mention_limit}", inline=True)
+        embed.add_field(name="Repetições", value=f"{state(config.block_duplicates)} máx. {config.duplicate_limit} em {config.duplicate_window}s", inline=True)
+        embed.add_field(name="Flood", value=state(config.block_flood), inline=True)
+        await interaction.followup.send(embed=embed)
+
+    @app_commands.command(name="automod_stats", description="[Admin] Mostra quantas vezes cada regra atuou.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def automod_stats(self, interaction: discord.Interaction):
+        hits = self.engine.hits
+        lines = [f"**{rule}:** {count}" for rule, count in hits.most_common()] or ["Nenhuma ação desde o arranque."]
+
+        lines.append(f"\n👥 Membros seguidos pelo detetor de flood: {len(self.engine.flood)}")
+
+        stats = self.bot.pipeline.stats.get("automod")
+        if stats and stats.calls:
+            lines.append(f"\n⏱️ {stats.calls} mensagens | média {stats.avg_ms:.2f} ms | pico {stats.max * 1000:.1f} ms")
+
+        embed = EmbedFactory.create(title="🛡️ AutoMod — Estatísticas", description="\n".join(lines), color=DreamColors.INFO)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(AutoMod(bot))
\ No newline at end of file
@@ -56,7 +56,9 @@ class Birthdays(commands.Cog):
                     if member:
                         mentions.append(member.mention)
                         # Presente de aniversário: 500 XP!
-                        await user_service.add_xp(member.id, 500)
+                        levels = await user_service.add_xp(member.id, 500)
+                        if levels:
+                            self.bot.dispatch("level_up", member, levels)
 
                 if mentions:
                     mentions_str = ", ".join(mentions)
@@ -55,11 +55,13 @@ class Challenges(commands.Cog):
                 return
 
             # Dá o XP
-            leveled_up = await user_service.add_xp(interaction.user.id, challenge.xp_reward)
+            levels = await user_service.add_xp(interaction.user.id, challenge.xp_reward)
             
             msg = f"✅ **Desafio Cumprido!**\nParabéns pela dedicação. Ganhaste **{challenge.xp_reward} XP**."
-            if leveled_up:
-                msg += "\n🏆 **LEVEL UP!**"
+            if levels:
+                msg += f"\n🏆 **LEVEL UP!** Agora és nível **{levels[-1]}**."
+                if interaction.guild:
+                    self.bot.dispatch("level_up", interaction.user, levels)
 
             await interaction.followup.send(msg)
 
@@ -23,8 +23,7 @@ class Confessions(commands.Cog):
             guild_service = GuildService(session)
             config = await guild_service.get_config(interaction.guild.id)
             
-            # Tenta pegar o ID do canal (lida com o caso de o campo ainda não existir na classe Python se não tiver reiniciado)
-            channel_id = getattr(config, "confession_channel_id", None)
+            channel_id = config.confession_channel_id
 
             if not channel_id:
                 await interaction.followup.send("❌ O canal de desabafos não está configurado.")
@@ -68,11 +67,7 @@ class Confessions(commands.Cog):
         
         async with get_session() as session:
             g_service = GuildService(session)
-            config = await g_service.get_config(interaction.guild.id)
-            
-            config.confession_channel_id = canal.id
-            session.add(config)
-            await session.commit()
+            await g_service.update_config(interaction.guild.id, confession_channel_id=canal.id)
             
         await interaction.followup.send(f"✅ Canal de desabafos definido para: {canal.mention}")
 
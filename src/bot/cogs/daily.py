@@ -91,7 +91,7 @@ class Daily(commands.Cog):
             coins_reward = random.randint(100, 300) # Dinheiro para a loja
 
             # Aplica recompensas
-            await service.add_xp(interaction.user.id, xp_reward)
+            levels = await service.add_xp(interaction.user.id, xp_reward)
             await service.add_coins(interaction.user.id, coins_reward)
             
             # Atualiza a data do daily
@@ -99,6 +99,9 @@ class Daily(commands.Cog):
             session.add(user)
             await session.commit()
 
+            if levels and interaction.guild:
+                self.bot.dispatch("level_up", interaction.user, levels)
+
             # Feedback Visual
             embed = discord.Embed(
                 title="☀️ Recompensa Diária Resgatada!",
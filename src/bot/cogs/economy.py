@@ -59,9 +59,8 @@ class Economy(commands.Cog):
 
         async with get_session() as session:
             service = UserService(session)
-            # Verifica saldo
-            user = await service.get_profile(interaction.user.id)
-            if user.dream_coins < valor:
+            # Debita a aposta logo à partida (atómico); o prémio devolve-a em dobro
+            if await service.try_debit(interaction.user.id, valor) is None:
                 await interaction.followup.send("❌ Você não tem DreamCoins suficientes para essa aposta.")
                 return
 
@@ -69,11 +68,10 @@ class Economy(commands.Cog):
             ganhou = (resultado == escolha.value)
 
             if ganhou:
-                await service.add_coins(interaction.user.id, valor)
+                await service.add_coins(interaction.user.id, valor * 2)
                 color = discord.Color.green()
                 msg = f"🎉 **Vitória!** Deu **{resultado.title()}**.\nGanhaste **DC$ {valor}**!"
             else:
-                await service.remove_coins(interaction.user.id, valor)
                 color = discord.Color.red()
                 msg = f"📉 **Derrota...** Deu **{resultado.title()}**.\nPerdeste **DC$ {valor}**."
 
@@ -90,9 +88,7 @@ class Economy(commands.Cog):
 
         async with get_session() as session:
             service = UserService(session)
-            user = await service.get_profile(interaction.user.id)
-            
-            if user.dream_coins < valor:
+            if await service.try_debit(interaction.user.id, valor) is None:
                 await interaction.followup.send("❌ Saldo insuficiente.")
                 return
 
@@ -101,11 +97,10 @@ class Economy(commands.Cog):
             # Regra: 1-3 Perde | 4-6 Ganha
             if lado >= 4:
                 lucro = int(valor * 0.5) # Ganha 50% de lucro
-                await service.add_coins(interaction.user.id, lucro)
+                await service.add_coins(interaction.user.id, valor + lucro)
                 msg = f"🎲 O dado caiu em **{lado}**!\n**Você venceu!** Lucro de **DC$ {lucro}**."
                 color = discord.Color.green()
             else:
-                await service.remove_coins(interaction.user.id, valor)
                 msg = f"🎲 O dado caiu em **{lado}**...\n**Você perdeu** DC$ {valor}."
                 color = discord.Color.red()
 
@@ -1,19 +1,172 @@
+import time
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
+from bot.config import settings
 from bot.core.database import get_session
 from bot.services.event_service import EventService
 import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+class EventRoster:
+    """Presenças de um evento em memória, com as alterações ainda por gravar."""
+
+    def __init__(self, event_id: int, statuses: dict[int, str]):
+        self.event_id = event_id
+        self.statuses = statuses # user_id -> status, por ordem de inscrição
+        self.pending: dict[int, str | None] = {}
+        self.message: discord.Message | None = None
+        self.last_render = 0.0
+        self.task: asyncio.Task | None = None
+
+    def set(self, user_id: int, status: str | None) -> bool:
+        """Altera a presença (None remove). Retorna False se nada mudou."""
+        if self.statuses.get(user_id) == status:
+            return False
+        # Uma mudança de estado conta como nova inscrição (igual à ordem no banco)
+        self.statuses.pop(user_id, None)
+        if status is not None:
+            self.statuses[user_id] = status
+        self.pending[user_id] = status
+        return True
+
+    def ids(self, status: str) -> list[int]:
+        return [user_id for user_id, s in self.statuses.items() if s == status]
 
 class EventButtons(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=None)
 
-    async def update_event_message(self, interaction: discord.Interaction, event_id: int, service: EventService):
+    async def rsvp(self, interaction: discord.Interaction, status: str | None, reply: str):
+        """Atualiza a presença em memória; a gravação e a edição do painel são agrupadas pelo cog."""
+        await interaction.response.defer(ephemeral=True)
+        cog: "Events" = interaction.client.get_cog("Events")
+        if cog is None:
+            return
+
+        roster, error = await cog.roster_for(interaction.message.id)
+        if roster:
+            cog.update_rsvp(roster, interaction.message, interaction.user.id, status)
+            await interaction.followup.send(reply, ephemeral=True)
+        else:
+            await interaction.followup.send(error, ephemeral=True)
+
+    @discord.ui.button(label="Vou!", style=discord.ButtonStyle.success, custom_id="evt_going")
+    async def going_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.rsvp(interaction, "going", "✅ Presença confirmada!")
+
+    @discord.ui.button(label="Talvez", style=discord.ButtonStyle.secondary, custom_id="evt_maybe")
+    async def maybe_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.rsvp(interaction, "maybe", "❔ Marcado como 'Talvez'.")
+
+    @discord.ui.button(label="Não Vou", style=discord.ButtonStyle.danger, custom_id="evt_not")
+    async def not_going_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.rsvp(interaction, None, "❌ Retirado da lista.")
+
+class Events(commands.Cog):
+    """
+    Eventos da comunidade. As presenças ficam em memória por evento: cada clique
+    responde logo, as alterações são gravadas em lote e o painel é reeditado no
+    máximo uma vez a cada `event_render_interval` segundos, já com o estado final.
+    Só os eventos ativos têm presenças em memória: saem quando o evento começa ou
+    quando o painel é apagado.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._rosters: dict[int, EventRoster] = {} # message_id do painel -> presenças
+        self._loading = asyncio.Lock()
+
+    # Eventos que começaram há mais do que isto já não são anunciados (ex: bot esteve desligado)
+    START_GRACE = datetime.timedelta(hours=1)
+
+    async def cog_load(self):
+        self.bot.add_view(EventButtons())
+        self.bot.scheduler.register("event_start", self.announce_event, self.load_due_events)
+
+    def cog_unload(self):
+        self.bot.scheduler.unregister("event_start")
+
+    # --- Presenças ---
+    async def roster_for(self, message_id: int) -> tuple[EventRoster | None, str | None]:
+        """
+        Presenças do evento do painel (lidas do banco numa só consulta na primeira vez).
+        Sem presenças (evento inexistente ou que já começou), devolve (None, mensagem de erro).
+        """
+        roster = self._rosters.get(message_id)
+        if roster:
+            return roster, None
+
+        async with self._loading:
+            roster = self._rosters.get(message_id)
+            if roster:
+                return roster, None
+            async with get_session() as session:
+                service = EventService(session)
+                event = await service.get_event_by_message(message_id)
+                if not event:
+                    return None, "❌ Evento não encontrado (o painel pode ser de um evento apagado)."
+                # Ativo mas fora da tolerância: nunca vai ser anunciado, nem sair da memória
+                expired = event.start_time < datetime.datetime.utcnow() - self.START_GRACE
+                if not event.active or expired:
+                    return None, "❌ Este evento já começou."
+                roster = EventRoster(event.id, await service.get_roster(event.id))
+            self._rosters[message_id] = roster
+            return roster, None
+
+    def update_rsvp(self, roster: EventRoster, message: discord.Message, user_id: int, status: str | None):
+        roster.message = message
+        if roster.set(user_id, status) and roster.task is None:
+            roster.task = asyncio.create_task(self._sync(roster))
+
+    async def _sync(self, roster: EventRoster):
+        """Grava as alterações pendentes e reedita o painel, respeitando o intervalo mínimo."""
+        try:
+            while roster.pending:
+                wait = roster.last_render + settings.event_render_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                changes, roster.pending = roster.pending, {}
+                roster.last_render = time.monotonic()
+                try:
+                    async with get_session() as session:
+                        await EventService(session).save_rsvps(roster.event_id, changes)
+                except Exception as e:
+                    logger.error(f"Falha ao gravar {len(changes)} presença(s) do evento {roster.event_id}: {e}")
+                    # Tenta de novo no próximo ciclo, sem pisar cliques mais recentes
+                    for user_id, status in changes.items():
+                        roster.pending.setdefault(user_id, status)
+                    continue
+
+                await self.render_roster(roster)
+        finally:
+            roster.task = None
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        self.drop_rosters([payload.message_id])
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        self.drop_rosters(payload.message_ids)
+
+    def drop_rosters(self, message_ids):
+        """Painel apagado: as presenças saem da memória (as alterações em fila ainda são gravadas)."""
+        for message_id in message_ids:
+            self._rosters.pop(message_id, None)
+
+    async def render_roster(self, roster: EventRoster):
         """Atualiza a lista visual de participantes no embed."""
-        going_ids = await service.get_participants(event_id, "going")
-        maybe_ids = await service.get_participants(event_id, "maybe")
-        
+        message = roster.message
+        if message is None or not message.embeds:
+            return
+
+        going_ids = roster.ids("going")
+        maybe_ids = roster.ids("maybe")
+
         # Formata listas (mentions)
         # Limita visualmente para não estourar o embed
         def format_list(ids):
@@ -23,57 +176,47 @@ class EventButtons(discord.ui.View):
                 return ", ".join(mentions[:10]) + f" e mais {len(mentions)-10}..."
             return ", ".join(mentions)
 
-        # Recupera embed original
-        message = interaction.message
         embed = message.embeds[0]
-        
-        # Atualiza campos (assume posições fixas ou busca por nome)
-        # Vamos reconstruir os campos de status
         embed.clear_fields()
         embed.add_field(name=f"✅ Confirmados ({len(going_ids)})", value=format_list(going_ids), inline=False)
         embed.add_field(name=f"❔ Talvez ({len(maybe_ids)})", value=format_list(maybe_ids), inline=False)
-        
-        await message.edit(embed=embed)
 
-    @discord.ui.button(label="Vou!", style=discord.ButtonStyle.success, custom_id="evt_going")
-    async def going_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer(ephemeral=True)
-        async with get_session() as session:
-            service = EventService(session)
-            event = await service.get_event_by_message(interaction.message.id)
-            if event:
-                await service.add_participant(event.id, interaction.user.id, "going")
-                await self.update_event_message(interaction, event.id, service)
-                await interaction.followup.send("✅ Presença confirmada!", ephemeral=True)
+        try:
+            await message.edit(embed=embed)
+        except discord.HTTPException as e:
+            logger.warning(f"Falha ao atualizar o painel do evento {roster.event_id}: {e}")
 
-    @discord.ui.button(label="Talvez", style=discord.ButtonStyle.secondary, custom_id="evt_maybe")
-    async def maybe_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer(ephemeral=True)
+    # --- Início dos eventos ---
+    async def load_due_events(self, until: datetime.datetime) -> list[tuple[datetime.datetime, int]]:
+        since = datetime.datetime.utcnow() - self.START_GRACE
         async with get_session() as session:
             service = EventService(session)
-            event = await service.get_event_by_message(interaction.message.id)
-            if event:
-                await service.add_participant(event.id, interaction.user.id, "maybe")
-                await self.update_event_message(interaction, event.id, service)
-                await interaction.followup.send("❔ Marcado como 'Talvez'.", ephemeral=True)
+            return [(event.start_time, event.id) for event in await service.get_due_events(until, since)]
+
+    async def announce_event(self, event_id: int):
+        """Chamado pelo agendador na hora de início: avisa os confirmados no canal do evento."""
+        await self.bot.wait_until_ready()
 
-    @discord.ui.button(label="Não Vou", style=discord.ButtonStyle.danger, custom_id="evt_not")
-    async def not_going_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer(ephemeral=True)
         async with get_session() as session:
             service = EventService(session)
-            event = await service.get_event_by_message(interaction.message.id)
-            if event:
-                await service.remove_participant(event.id, interaction.user.id)
-                await self.update_event_message(interaction, event.id, service)
-                await interaction.followup.send("❌ Retirado da lista.", ephemeral=True)
+            event = await service.mark_started(event_id)
+            if not event:
+                return
+            # Sai da memória (a tarefa em curso ainda grava o que estiver pendente)
+            roster = self._rosters.pop(event.message_id, None)
+            going_ids = roster.ids("going") if roster else await service.get_participants(event.id, "going")
 
-class Events(commands.Cog):
-    def __init__(self, bot: commands.Bot):
-        self.bot = bot
+        channel = self.bot.get_channel(event.channel_id)
+        if not channel:
+            return
 
-    async def cog_load(self):
-        self.bot.add_view(EventButtons())
+        mentions = " ".join(f"<@{uid}>" for uid in going_ids[:50])
+        embed = discord.Embed(
+            title=f"🔔 O evento vai começar: {event.title}",
+            description=f"{event.description}\n\n✅ **Confirmados:** {len(going_ids)}",
+            color=discord.Color.purple()
+        )
+        await channel.send(content=mentions or None, embed=embed)
 
     @app_commands.command(name="evento_criar", description="Agenda um evento para a comunidade.")
     @app_commands.describe(titulo="Nome do evento", descricao="O que vai acontecer?", data="Data/Hora (Ex: 25/12 18:00)")
@@ -92,6 +235,8 @@ class Events(commands.Cog):
         await interaction.response.defer()
 
         timestamp = int(start_time.timestamp())
+        # Guardado em UTC (como o resto do banco) para o agendador disparar na hora certa
+        start_time_utc = datetime.datetime.utcfromtimestamp(timestamp)
 
         embed = discord.Embed(
             title=f"📅 {titulo}",
@@ -107,15 +252,16 @@ class Events(commands.Cog):
 
         async with get_session() as session:
             service = EventService(session)
-            await service.create_event(
+            event = await service.create_event(
                 interaction.guild.id,
                 interaction.channel.id,
                 message.id,
                 interaction.user.id,
                 titulo,
                 descricao,
-                start_time
+                start_time_utc
             )
+        self.bot.scheduler.schedule("event_start", event.id, start_time_utc)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Events(bot))
\ No newline at end of file
@@ -1,9 +1,10 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import asyncio
+import datetime
 from bot.core.database import get_session
 from bot.services.user_service import UserService
+from bot.services.focus_service import FocusService
 
 class Focus(commands.Cog):
     """
@@ -12,26 +13,82 @@ class Focus(commands.Cog):
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        # Dicionário para rastrear quem está focado: {user_id: True}
-        self.active_sessions = {}
+
+    async def cog_load(self):
+        # As sessões ficam no banco: um reinício do bot já não perde o temporizador
+        self.bot.scheduler.register("focus_end", self.finish_session, self.load_due_sessions)
+
+    def cog_unload(self):
+        self.bot.scheduler.unregister("focus_end")
+
+    async def load_due_sessions(self, until: datetime.datetime) -> list[tuple[datetime.datetime, int]]:
+        async with get_session() as session:
+            service = FocusService(session)
+            return [(focus.ends_at, focus.id) for focus in await service.get_due_sessions(until)]
+
+    async def finish_session(self, session_id: int):
+        """Chamado pelo agendador quando o tempo de foco acaba."""
+        await self.bot.wait_until_ready()
+
+        async with get_session() as session:
+            focus = await FocusService(session).finish(session_id)
+            if not focus:
+                return # Cancelada entretanto
+
+            # Entrega a recompensa
+            service = UserService(session)
+            levels = await service.add_xp(focus.user_id, focus.xp_reward)
+
+            # Mensagem de Conclusão
+            msg = (
+                f"🔔 **Tempo Esgotado!** <@{focus.user_id}>\n"
+                f"✅ Sessão de {focus.minutes} minutos concluída.\n"
+                f"💎 Ganhaste **{focus.xp_reward} XP** pela tua disciplina."
+            )
+            
+            if levels:
+                msg += f"\n🏆 **SUBIU DE NÍVEL!** Agora és nível **{levels[-1]}**."
+                channel = self.bot.get_channel(focus.channel_id) if focus.channel_id else None
+                member = channel.guild.get_member(focus.user_id) if getattr(channel, "guild", None) else None
+                if member:
+                    self.bot.dispatch("level_up", member, levels)
+
+        # Tenta enviar DM; se estiver fechada, avisa no canal onde o comando foi usado
+        try:
+            user = self.bot.get_user(focus.user_id) or await self.bot.fetch_user(focus.user_id)
+            await user.send(msg)
+        except (discord.Forbidden, discord.NotFound):
+            channel = self.bot.get_channel(focus.channel_id) if focus.channel_id else None
+            if channel:
+                try:
+                    await channel.send(msg, delete_after=60)
+                except discord.HTTPException:
+                    pass # Canal deletado ou sem permissão
 
     @app_commands.command(name="focar", description="Inicia um temporizador de foco e ganha XP ao terminar.")
     @app_commands.describe(minutos="Tempo de foco em minutos (min: 5, máx: 120)")
     async def focar(self, interaction: discord.Interaction, minutos: int):
         user_id = interaction.user.id
 
-        # Validações Básicas
-        if user_id in self.active_sessions:
-            await interaction.response.send_message("❌ Já tens uma sessão de foco ativa! Termina essa primeiro.", ephemeral=True)
-            return
-
         if minutos < 5 or minutos > 120:
             await interaction.response.send_message("⏱️ O tempo deve ser entre **5** e **120** minutos.", ephemeral=True)
             return
 
         # Calcula a recompensa (Ex: 5 XP por minuto focado)
         xp_reward = minutos * 5
-        
+
+        async with get_session() as session:
+            service = FocusService(session)
+
+            # Validações Básicas
+            if await service.get_active(user_id):
+                await interaction.response.send_message("❌ Já tens uma sessão de foco ativa! Termina essa primeiro.", ephemeral=True)
+                return
+
+            focus = await service.start_session(user_id, interaction.channel_id, minutos, xp_reward)
+
+        self.bot.scheduler.schedule("focus_end", focus.id, focus.ends_at)
+
         # Feedback inicial
         await interaction.response.send_message(
             f"🧘 **Modo Foco Ativado!**\n"
@@ -41,54 +98,13 @@ class Focus(commands.Cog):
             ephemeral=True # Mensagem privada para não poluir o chat
         )
 
-        # Marca o utilizador como ocupado
-        self.active_sessions[user_id] = True
-
-        try:
-            # Espera o tempo passar (conversão para segundos)
-            # Nota: Se o bot reiniciar durante este tempo, o timer é perdido (limitação de memória)
-            await asyncio.sleep(minutos * 60)
-            
-            # Verifica se ainda está na lista (caso tenhamos cancelado futuramente)
-            if user_id in self.active_sessions:
-                
-                # Entrega a recompensa
-                async with get_session() as session:
-                    service = UserService(session)
-                    leveled_up = await service.add_xp(user_id, xp_reward)
-                    
-                    # Mensagem de Conclusão
-                    msg = (
-                        f"🔔 **Tempo Esgotado!** {interaction.user.mention}\n"
-                        f"✅ Sessão de {minutos} minutos concluída.\n"
-                        f"💎 Ganhaste **{xp_reward} XP** pela tua disciplina."
-                    )
-                    
-                    if leveled_up:
-                        user_data = await service.get_profile(user_id)
-                        msg += f"\n🏆 **SUBIU DE NÍVEL!** Agora és nível **{user_data.nivel}**."
-
-                    # Tenta enviar DM, se falhar, manda no canal original (se possível) ou apenas remove da lista
-                    try:
-                        await interaction.user.send(msg)
-                    except discord.Forbidden:
-                        # Se DM fechada, tenta mandar no canal onde o comando foi usado (se ainda existir)
-                        try:
-                            await interaction.followup.send(msg, ephemeral=True)
-                        except:
-                            pass # Usuário sumiu ou canal deletado
-
-        except Exception as e:
-            # Garante que o utilizador é removido da lista se der erro
-            pass
-        finally:
-            # Remove da lista de sessões ativas
-            self.active_sessions.pop(user_id, None)
-
     @app_commands.command(name="foco_cancelar", description="Cancela o temporizador atual (sem recompensa).")
     async def foco_cancelar(self, interaction: discord.Interaction):
-        if interaction.user.id in self.active_sessions:
-            self.active_sessions.pop(interaction.user.id, None)
+        async with get_session() as session:
+            session_id = await FocusService(session).cancel(interaction.user.id)
+
+        if session_id:
+            self.bot.scheduler.cancel("focus_end", session_id)
             await interaction.response.send_message("🛑 Sessão de foco cancelada. Nenhum XP foi atribuído.", ephemeral=True)
         else:
             await interaction.response.send_message("❌ Não tens nenhuma sessão ativa.", ephemeral=True)
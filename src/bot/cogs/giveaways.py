@@ -1,11 +1,15 @@
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
+from bot.config import settings
 from bot.core.database import get_session
 from bot.services.giveaway_service import GiveawayService
+from bot.models.giveaway import Giveaway
 import datetime
-import random
 import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 class GiveawayView(discord.ui.View):
     def __init__(self):
@@ -13,97 +17,185 @@ class GiveawayView(discord.ui.View):
 
     @discord.ui.button(label="Participar 🎉", style=discord.ButtonStyle.success, custom_id="gw_join_btn")
     async def join_giveaway(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # Apenas responde para dar feedback visual, a "inscrição" é estar na lista de interações da mensagem
+        cog: "Giveaways" = interaction.client.get_cog("Giveaways")
+        giveaway_id = GiveawayService.giveaway_for(interaction.message.id)
+        if cog is None or giveaway_id is None:
+            await interaction.response.send_message("❌ Este sorteio já terminou.", ephemeral=True)
+            return
+
+        cog.queue_entry(giveaway_id, interaction.user.id, True)
         await interaction.response.send_message("✅ Você está participando do sorteio! Boa sorte.", ephemeral=True)
 
 class Giveaways(commands.Cog):
+    """
+    Sorteios. As inscrições (reação 🎉 ou botão) são gravadas em `giveaway_entries`
+    no momento em que acontecem, juntadas em pequenos lotes. No fim, os vencedores
+    saem de uma amostra aleatória feita no banco: terminar um sorteio custa sempre
+    o mesmo nº de chamadas à API, seja qual for o nº de participantes (os sorteios
+    anteriores às inscrições gravadas leem as reações uma vez, no fim).
+    """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.check_giveaways.start()
+        # (giveaway_id, user_id) -> True inscreve, False desiste
+        self._pending: dict[tuple[int, int], bool] = {}
+        self._flush_task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+
+    async def cog_load(self):
+        self.bot.add_view(GiveawayView())
+        async with get_session() as session:
+            count = await GiveawayService(session).load_active()
+        logger.info(f"Sorteios ativos carregados: {count}.")
+        self.bot.scheduler.register("giveaway_end", self.end_due_giveaway, self.load_due_giveaways)
+
+    async def cog_unload(self):
+        self.bot.scheduler.unregister("giveaway_end")
+        if self._flush_task:
+            self._flush_task.cancel()
+        await self.flush_entries()
+
+    # --- Inscrições ---
+    def queue_entry(self, giveaway_id: int, user_id: int, joined: bool):
+        self._pending[(giveaway_id, user_id)] = joined
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(settings.giveaway_flush_delay)
+        finally:
+            self._flush_task = None
+        await self.flush_entries()
+
+    async def flush_entries(self):
+        """Grava as inscrições em fila num só lote."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            try:
+                async with get_session() as session:
+                    await GiveawayService(session).save_entries(
+                        [key for key, joined in batch.items() if joined],
+                        [key for key, joined in batch.items() if not joined]
+                    )
+            except Exception as e:
+                logger.error(f"Falha ao gravar {len(batch)} inscrição(ões) em sorteios: {e}")
+                for key, joined in batch.items():
+                    self._pending.setdefault(key, joined)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        if str(payload.emoji) != "🎉" or (payload.member and payload.member.bot):
+            return
+        giveaway_id = GiveawayService.giveaway_for(payload.message_id)
+        if giveaway_id:
+            self.queue_entry(giveaway_id, payload.user_id, True)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        if str(payload.emoji) != "🎉":
+            return
+        giveaway_id = GiveawayService.giveaway_for(payload.message_id)
+        if giveaway_id:
+            self.queue_entry(giveaway_id, payload.user_id, False)
 
-    def cog_unload(self):
-        self.check_giveaways.cancel()
+    # --- Fim do sorteio ---
+    async def load_due_giveaways(self, until: datetime.datetime) -> list[tuple[datetime.datetime, int]]:
+        async with get_session() as session:
+            service = GiveawayService(session)
+            return [(gw.end_time, gw.id) for gw in await service.get_due_giveaways(until)]
 
-    @tasks.loop(seconds=30)
-    async def check_giveaways(self):
-        """Verifica periodicamente se algum sorteio chegou ao fim."""
+    async def end_due_giveaway(self, giveaway_id: int):
+        """Chamado pelo agendador quando o sorteio chega ao fim."""
         # Aguarda o bot estar pronto para evitar erros de cache
         await self.bot.wait_until_ready()
 
         async with get_session() as session:
             service = GiveawayService(session)
-            active_gws = await service.get_active_giveaways()
+            gw = await service.get_giveaway(giveaway_id)
+            if gw and gw.active:
+                await self.roll_winner(gw, session)
 
-            for gw in active_gws:
-                if datetime.datetime.utcnow() >= gw.end_time:
-                    # O tempo acabou! Vamos sortear.
-                    await self.roll_winner(gw, session)
+    async def get_channel(self, channel_id: int) -> discord.abc.Messageable | None:
+        channel = self.bot.get_channel(channel_id)
+        if channel:
+            return channel
+        # Tenta buscar (fetch) se não estiver no cache
+        try:
+            return await self.bot.fetch_channel(channel_id)
+        except discord.HTTPException:
+            return None
 
-    async def roll_winner(self, gw, session):
-        """Realiza o sorteio e anuncia o vencedor."""
+    async def announce_winners(self, channel: discord.abc.Messageable, gw: Giveaway, winners: list[int], reroll: bool = False):
+        winners_mention = ", ".join(f"<@{user_id}>" for user_id in winners)
+        embed = discord.Embed(
+            title="🔁 NOVO SORTEIO!" if reroll else "🎉 TEMOS UM VENCEDOR!",
+            description=f"**Prémio:** {gw.prize}\n**Ganhador(es):** {winners_mention}",
+            color=discord.Color.gold()
+        )
+        embed.set_footer(text="Parabéns! Abra um ticket para resgatar.")
+        await channel.send(content=f"🎉 Parabéns {winners_mention}!", embed=embed)
+
+    async def backfill_entries(self, channel: discord.abc.Messageable, gw: Giveaway, service: GiveawayService) -> int:
+        """
+        Sorteio sem inscrições gravadas (criado antes de `giveaway_entries` existir):
+        lê uma vez quem reagiu com 🎉 e grava-os como inscritos. Retorna quantos.
+        """
         try:
-            channel = self.bot.get_channel(gw.channel_id)
-            if not channel:
-                # Tenta buscar (fetch) se não estiver no cache
-                try:
-                    channel = await self.bot.fetch_channel(gw.channel_id)
-                except:
-                    # Canal deletado? Marca como encerrado para parar de tentar
-                    service = GiveawayService(session)
-                    await service.end_giveaway(gw.message_id)
-                    return
+            message = await channel.fetch_message(gw.message_id)
+        except discord.HTTPException:
+            return 0 # Mensagem deletada?
 
-            try:
-                message = await channel.fetch_message(gw.message_id)
-            except:
-                # Mensagem deletada?
-                service = GiveawayService(session)
-                await service.end_giveaway(gw.message_id)
-                return
+        reaction = discord.utils.get(message.reactions, emoji="🎉")
+        if not reaction:
+            return 0
 
-            # Pega quem interagiu com a mensagem (Botão ou Reações)
-            # Como usamos botão, precisamos pegar quem interagiu. 
-            # Infelizmente, a API do Discord não lista fácil quem clicou num botão passado.
-            # SOLUÇÃO SIMPLES: Vamos usar Reação 🎉 para sortear, é mais seguro para persistência.
-            
-            # Vamos buscar as reações da mensagem
-            reaction = discord.utils.get(message.reactions, emoji="🎉")
-            
-            users = []
-            if reaction:
-                async for user in reaction.users():
-                    if not user.bot:
-                        users.append(user)
+        user_ids = [user.id async for user in reaction.users() if not user.bot]
+        if user_ids:
+            await service.save_entries([(gw.id, user_id) for user_id in user_ids], [])
+        return len(user_ids)
 
+    async def roll_winner(self, gw, session):
+        """Realiza o sorteio e anuncia o vencedor."""
+        try:
+            # Primeiro sai dos ativos (deixa de aceitar inscrições), depois grava as que
+            # ainda estão em fila: assim nenhuma fica de fora do sorteio
             service = GiveawayService(session)
             await service.end_giveaway(gw.message_id)
+            await self.flush_entries()
 
-            if not users:
-                await channel.send(f"⚠️ **Sorteio Encerrado:** {gw.prize}\nNinguém participou. 😢")
-                return
+            channel = await self.get_channel(gw.channel_id)
+            if not channel:
+                return # Canal deletado: fica só marcado como encerrado
 
-            # Sorteia
-            winner_count = min(len(users), gw.winners_count)
-            winners = random.sample(users, winner_count)
-            winners_mention = ", ".join([w.mention for w in winners])
+            total = await service.count_entries(gw.id)
+            if total == 0:
+                total = await self.backfill_entries(channel, gw, service)
+            winners = await service.draw_winners(gw.id, gw.winners_count)
 
-            embed = discord.Embed(
-                title="🎉 TEMOS UM VENCEDOR!",
-                description=f"**Prémio:** {gw.prize}\n**Ganhador(es):** {winners_mention}",
-                color=discord.Color.gold()
+            # Edita a mensagem original para dizer ENCERRADO (sem a ler)
+            closed = discord.Embed(
+                title="🎉 SORTEIO ENCERRADO",
+                description=f"**Prémio:** {gw.prize}\n\n"
+                            f"👥 **Participantes:** {total}\n"
+                            f"🏆 **Vencedores:** {', '.join(f'<@{uid}>' for uid in winners) or 'Ninguém'}",
+                color=discord.Color.dark_grey()
             )
-            embed.set_footer(text="Parabéns! Abra um ticket para resgatar.")
-            
-            await channel.send(content=f"🎉 Parabéns {winners_mention}!", embed=embed)
-            
-            # Edita a mensagem original para dizer ENCERRADO
-            original_embed = message.embeds[0]
-            original_embed.color = discord.Color.dark_grey()
-            original_embed.set_footer(text="🔴 Sorteio Encerrado")
-            await message.edit(embed=original_embed, view=None)
+            closed.set_footer(text="🔴 Sorteio Encerrado")
+            try:
+                await channel.get_partial_message(gw.message_id).edit(embed=closed, view=None)
+            except discord.HTTPException:
+                pass # Mensagem deletada?
+
+            if not winners:
+                await channel.send(f"⚠️ **Sorteio Encerrado:** {gw.prize}\nNinguém participou. 😢")
+                return
+
+            await self.announce_winners(channel, gw, winners)
 
         except Exception as e:
-            print(f"Erro ao finalizar sorteio {gw.id}: {e}")
+            logger.error(f"Erro ao finalizar sorteio {gw.id}: {e}")
 
     @app_commands.command(name="sorteio_criar", description="[Admin] Inicia um novo sorteio.")
     @app_commands.describe(premio="O que será sorteado", duracao="Duração (ex: 10m, 1h, 24h)", vencedores="Quantas pessoas ganham")
@@ -130,17 +222,16 @@ class Giveaways(commands.Cog):
             description=f"**Prémio:** {premio}\n\n"
                         f"⏰ **Termina:** <t:{end_timestamp}:R>\n"
                         f"🏆 **Vencedores:** {vencedores}\n\n"
-                        f"**Reaja com 🎉 para participar!**",
+                        f"**Reaja com 🎉 ou clique em Participar!**",
             color=discord.Color.purple()
         )
         
-        await interaction.response.send_message(embed=embed)
+        await interaction.response.send_message(embed=embed, view=GiveawayView())
         message = await interaction.original_response()
-        await message.add_reaction("🎉")
 
         async with get_session() as session:
             service = GiveawayService(session)
-            await service.create_giveaway(
+            gw = await service.create_giveaway(
                 interaction.guild.id,
                 interaction.channel.id,
                 message.id,
@@ -148,6 +239,8 @@ class Giveaways(commands.Cog):
                 end_time,
                 vencedores
             )
+        self.bot.scheduler.schedule("giveaway_end", gw.id, end_time)
+        await message.add_reaction("🎉")
 
     @app_commands.command(name="sorteio_encerrar", description="[Admin] Encerra um sorteio imediatamente.")
     @app_commands.describe(id_mensagem="ID da mensagem do sorteio")
@@ -164,16 +257,47 @@ class Giveaways(commands.Cog):
         async with get_session() as session:
             service = GiveawayService(session)
             # Verifica se existe
-            stmt = select(Giveaway).where(Giveaway.message_id == msg_id, Giveaway.active == True)
-            gw = (await session.execute(stmt)).scalar_one_or_none()
+            gw = await service.get_by_message(msg_id)
             
-            if not gw:
+            if not gw or not gw.active:
                 await interaction.followup.send("❌ Sorteio não encontrado ou já encerrado.")
                 return
 
             # Força o encerramento manual
+            self.bot.scheduler.cancel("giveaway_end", gw.id)
             await self.roll_winner(gw, session)
             await interaction.followup.send("✅ Sorteio encerrado manualmente.")
 
+    @app_commands.command(name="sorteio_reroll", description="[Admin] Sorteia novo(s) vencedor(es) de um sorteio encerrado.")
+    @app_commands.describe(id_mensagem="ID da mensagem do sorteio", vencedores="Quantas pessoas sortear de novo")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def sorteio_reroll(self, interaction: discord.Interaction, id_mensagem: str, vencedores: int = 1):
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            msg_id = int(id_mensagem)
+        except ValueError:
+            await interaction.followup.send("❌ ID inválido.")
+            return
+
+        async with get_session() as session:
+            service = GiveawayService(session)
+            gw = await service.get_by_message(msg_id)
+            if not gw or gw.active:
+                await interaction.followup.send("❌ Sorteio não encontrado ou ainda a decorrer.")
+                return
+
+            # Quem já ganhou não volta a sair
+            winners = await service.draw_winners(gw.id, max(1, vencedores))
+
+        if not winners:
+            await interaction.followup.send("❌ Não há mais participantes para sortear.")
+            return
+
+        channel = await self.get_channel(gw.channel_id)
+        if channel:
+            await self.announce_winners(channel, gw, winners, reroll=True)
+        await interaction.followup.send("✅ Novo sorteio realizado.")
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(Giveaways(bot))
\ No newline at end of file
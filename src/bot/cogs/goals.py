@@ -66,13 +66,14 @@ class Goals(commands.Cog):
 
             # Recompensa: 100 XP por meta cumprida!
             xp_reward = 100
-            leveled_up = await user_service.add_xp(interaction.user.id, xp_reward)
+            levels = await user_service.add_xp(interaction.user.id, xp_reward)
 
             msg = f"✅ **Meta Concluída!**\n~~{completed_goal.description}~~\n💎 Ganhaste **{xp_reward} XP** pela disciplina."
             
-            if leveled_up:
-                user_data = await user_service.get_profile(interaction.user.id)
-                msg += f"\n🏆 **LEVEL UP!** Parabéns, agora és nível **{user_data.nivel}**!"
+            if levels:
+                msg += f"\n🏆 **LEVEL UP!** Parabéns, agora és nível **{levels[-1]}**!"
+                if interaction.guild:
+                    self.bot.dispatch("level_up", interaction.user, levels)
 
             await interaction.followup.send(msg)
 
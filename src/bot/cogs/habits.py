@@ -71,12 +71,14 @@ class Habits(commands.Cog):
             xp_bonus = min(habit.current_streak * 5, 100) # Máximo 100 XP extra
             total_xp = 50 + xp_bonus
             
-            leveled_up = await user_service.add_xp(interaction.user.id, total_xp)
+            levels = await user_service.add_xp(interaction.user.id, total_xp)
 
             response = f"✅ **Check-in realizado!** ({habit.name})\n{msg}\n💎 Ganhaste **{total_xp} XP**."
             
-            if leveled_up:
-                 response += "\n🏆 **SUBIU DE NÍVEL!**"
+            if levels:
+                 response += f"\n🏆 **SUBIU DE NÍVEL!** Agora és nível **{levels[-1]}**."
+                 if interaction.guild:
+                     self.bot.dispatch("level_up", interaction.user, levels)
 
             await interaction.followup.send(response)
 
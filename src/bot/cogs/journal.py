@@ -26,12 +26,14 @@ class Journal(commands.Cog):
             # Recompensa o hábito da escrita com XP
             user_service = UserService(session)
             xp_amount = 50
-            leveled_up = await user_service.add_xp(interaction.user.id, xp_amount)
+            levels = await user_service.add_xp(interaction.user.id, xp_amount)
             
         msg = f"✅ **Salvo!** Sua reflexão foi guardada com segurança no cofre.\n🧠 Ganhaste **{xp_amount} XP** por exercitar a mente."
         
-        if leveled_up:
-             msg += "\n🏆 **Evolução!** Você subiu de nível."
+        if levels:
+             msg += f"\n🏆 **Evolução!** Você subiu para o nível {levels[-1]}."
+             if interaction.guild:
+                 self.bot.dispatch("level_up", interaction.user, levels)
 
         await interaction.followup.send(msg)
 
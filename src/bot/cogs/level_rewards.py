@@ -7,10 +7,23 @@ from bot.services.level_service import LevelService
 class LevelRewards(commands.Cog):
     """
     Gerencia a entrega automática de cargos por nível.
+    As recompensas ficam em memória (LevelService) e os cargos são acertados pelo bot.reward_roles.
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        async with get_session() as session:
+            await LevelService(session).load_index()
+
+    def _backfill_note(self, guild: discord.Guild) -> str:
+        """Acerta os membros que já tinham o nível antes da mudança (em segundo plano)."""
+        if self.bot.reward_roles.start_backfill(guild):
+            return "\n🔄 A acertar os cargos dos membros atuais em segundo plano."
+        if self.bot.reward_roles.is_backfilling(guild.id):
+            return "\n🔄 Já há um acerto de cargos em curso; os membros serão revistos de novo quando terminar."
+        return ""
+
     @app_commands.command(name="config_nivel_premio", description="[Admin] Define um cargo para quem atingir X nível.")
     @app_commands.checks.has_permissions(administrator=True)
     async def config_reward(self, interaction: discord.Interaction, nivel: int, cargo: discord.Role):
@@ -24,7 +37,10 @@ class LevelRewards(commands.Cog):
             service = LevelService(session)
             await service.add_reward(interaction.guild.id, nivel, cargo.id)
 
-        await interaction.followup.send(f"✅ Configurado! Quem atingir o **Nível {nivel}** ganhará o cargo **{cargo.name}**.")
+        await interaction.followup.send(
+            f"✅ Configurado! Quem atingir o **Nível {nivel}** ganhará o cargo **{cargo.name}**."
+            + self._backfill_note(interaction.guild)
+        )
 
     @app_commands.command(name="config_nivel_lista", description="[Admin] Lista as recompensas configuradas.")
     @app_commands.checks.has_permissions(administrator=True)
@@ -62,5 +78,15 @@ class LevelRewards(commands.Cog):
         else:
             await interaction.followup.send("❌ Nenhuma recompensa encontrada para esse nível.")
 
+    @app_commands.command(name="config_nivel_sincronizar", description="[Admin] Acerta os cargos por nível de todos os membros.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def sync_rewards(self, interaction: discord.Interaction):
+        if not LevelService.reward_role_ids(interaction.guild.id):
+            await interaction.response.send_message("📭 Nenhuma recompensa de nível configurada.", ephemeral=True)
+            return
+
+        note = self._backfill_note(interaction.guild).strip()
+        await interaction.response.send_message(note, ephemeral=True)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(LevelRewards(bot))
\ No newline at end of file
@@ -108,7 +108,7 @@ class Library(commands.Cog):
                 return
                 
             xp_reward = 150
-            leveled_up = await user_service.add_xp(resource.submitter_id, xp_reward)
+            levels = await user_service.add_xp(resource.submitter_id, xp_reward)
             
             await interaction.followup.send(f"✅ **Aprovado!** O recurso **{resource.title}** foi adicionado à biblioteca.")
             
@@ -116,8 +116,9 @@ class Library(commands.Cog):
                 author = interaction.guild.get_member(resource.submitter_id)
                 if author:
                     msg = f"📚 Sua sugestão **{resource.title}** foi aprovada!\n💎 Ganhaste **{xp_reward} XP**."
-                    if leveled_up: 
-                        msg += "\n🏆 **LEVEL UP!**"
+                    if levels: 
+                        msg += f"\n🏆 **LEVEL UP!** Agora és nível **{levels[-1]}**."
+                        self.bot.dispatch("level_up", author, levels)
                     await author.send(msg)
             except:
                 pass
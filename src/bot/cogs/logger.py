@@ -1,9 +1,8 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from bot.core.database import get_session
-from bot.services.guild_service import GuildService
 import datetime
+from collections import Counter
 
 class Logger(commands.Cog):
     """
@@ -13,13 +12,12 @@ class Logger(commands.Cog):
         self.bot = bot
 
     async def get_log_channel(self, guild_id: int):
-        """Busca o canal de logs configurado no banco."""
-        async with get_session() as session:
-            service = GuildService(session)
-            config = await service.get_config(guild_id)
-            if config and config.log_channel_id:
-                return self.bot.get_channel(config.log_channel_id)
-        return None
+        """Canal de logs configurado (servido pela cache de configuração)."""
+        return await self.bot.log_sink.channel_for(guild_id)
+
+    def send_log(self, channel, embed: discord.Embed, category: str):
+        """Entrega o embed à fila de logs; o envio é agrupado (até 10 por mensagem)."""
+        self.bot.log_sink.push(channel, embed, category)
 
     @commands.Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message):
@@ -42,7 +40,7 @@ class Logger(commands.Cog):
         embed.set_footer(text=f"ID: {before.id}")
         embed.timestamp = datetime.datetime.utcnow()
 
-        await channel.send(embed=embed)
+        self.send_log(channel, embed, "mensagens")
 
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message):
@@ -63,7 +61,7 @@ class Logger(commands.Cog):
         embed.set_footer(text=f"ID: {message.id}")
         embed.timestamp = datetime.datetime.utcnow()
 
-        await channel.send(embed=embed)
+        self.send_log(channel, embed, "mensagens")
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
@@ -85,7 +83,7 @@ class Logger(commands.Cog):
         embed.add_field(name="ID", value=member.id, inline=True)
         embed.timestamp = datetime.datetime.utcnow()
 
-        await channel.send(embed=embed)
+        self.send_log(channel, embed, "membros")
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
@@ -97,13 +95,10 @@ class Logger(commands.Cog):
         embed.add_field(name="Cargos", value=f"{len(member.roles)-1}", inline=True)
         embed.timestamp = datetime.datetime.utcnow()
 
-        await channel.send(embed=embed)
+        self.send_log(channel, embed, "membros")
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
-        channel = await self.get_log_channel(member.guild.id)
-        if not channel: return
-
         # Entrou em canal
         if not before.channel and after.channel:
             msg = f"🔊 Entrou em **{after.channel.name}**"
@@ -119,11 +114,41 @@ class Logger(commands.Cog):
         else:
             return # Outras mudanças (mute, deafen) ignoramos para não spammar
 
+        channel = await self.get_log_channel(member.guild.id)
+        if not channel: return
+
         embed = discord.Embed(description=f"**{member.display_name}**: {msg}", color=color)
         # Timestamp minimalista para logs de voz
         embed.set_footer(text=datetime.datetime.utcnow().strftime("%H:%M:%S"))
         
-        await channel.send(embed=embed)
+        self.send_log(channel, embed, "voz")
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        """Apagamento em massa (ex: /clear): um único resumo em vez de um log por mensagem."""
+        if not payload.guild_id:
+            return
+
+        channel = await self.get_log_channel(payload.guild_id)
+        if not channel: return
+
+        total = len(payload.message_ids)
+        embed = discord.Embed(
+            title="🧹 Mensagens Apagadas em Massa",
+            description=f"**{total}** mensagens apagadas em <#{payload.channel_id}>.",
+            color=discord.Color.dark_red()
+        )
+
+        # Só conhecemos os autores das mensagens que estavam em cache
+        authors = Counter(m.author.display_name for m in payload.cached_messages if not m.author.bot)
+        if authors:
+            lines = [f"**{name}:** {count}" for name, count in authors.most_common(10)]
+            if len(authors) > 10:
+                lines.append(f"*... e mais {len(authors) - 10} autores*")
+            embed.add_field(name="Autores (em cache)", value="\n".join(lines), inline=False)
+
+        embed.timestamp = datetime.datetime.utcnow()
+        self.send_log(channel, embed, "mensagens")
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Logger(bot))
\ No newline at end of file
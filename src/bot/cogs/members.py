@@ -0,0 +1,91 @@
+import asyncio
+import discord
+from discord.ext import commands
+from bot.core.database import get_session
+from bot.core.leaderboard import leaderboards
+from bot.services.guild_member_service import GuildMemberService
+import logging
+
+logger = logging.getLogger(__name__)
+
+class GuildMembers(commands.Cog):
+    """
+    Mantém a tabela `guild_members` (e os rankings por servidor) a par de quem
+    entra e sai. No arranque, cada servidor é acertado com a cache do Discord,
+    para apanhar o que mudou enquanto o bot esteve desligado.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._sync_task: asyncio.Task | None = None
+
+    def cog_unload(self):
+        if self._sync_task:
+            self._sync_task.cancel()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # on_ready repete-se em reconexões; só corre um acerto de cada vez
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = asyncio.create_task(self.sync_all())
+
+    async def sync_all(self):
+        try:
+            # Os rankings têm de estar carregados antes de receberem as diferenças
+            await leaderboards.load()
+        except Exception as e:
+            logger.error(f"Falha ao carregar os rankings antes do acerto de membros: {e}")
+
+        for guild in list(self.bot.guilds):
+            try:
+                await self.sync_guild(guild)
+            except Exception as e:
+                logger.error(f"Falha ao acertar os membros de {guild.name}: {e}")
+            await asyncio.sleep(0)
+
+    async def sync_guild(self, guild: discord.Guild):
+        current = {member.id for member in guild.members if not member.bot}
+
+        async with get_session() as session:
+            service = GuildMemberService(session)
+            stored = await service.get_member_ids(guild.id)
+            added = list(current - stored)
+            removed = list(stored - current)
+            await service.add_members(guild.id, added)
+            await service.remove_members(guild.id, removed)
+
+        for user_id in added:
+            leaderboards.join(guild.id, user_id)
+        for user_id in removed:
+            leaderboards.leave(guild.id, user_id)
+
+        if added or removed:
+            logger.info(f"Membros de {guild.name}: +{len(added)} / -{len(removed)}")
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if member.bot:
+            return
+        async with get_session() as session:
+            await GuildMemberService(session).add_members(member.guild.id, [member.id])
+        leaderboards.join(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        if member.bot:
+            return
+        async with get_session() as session:
+            await GuildMemberService(session).remove_members(member.guild.id, [member.id])
+        leaderboards.leave(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        await self.sync_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        async with get_session() as session:
+            await GuildMemberService(session).remove_guild(guild.id)
+        leaderboards.drop_guild(guild.id)
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(GuildMembers(bot))
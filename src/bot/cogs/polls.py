@@ -2,20 +2,140 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from bot.core.database import get_session
+from bot.core.poll_votes import poll_votes
+from bot.models.poll import Poll
 from bot.services.poll_service import PollService
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 class Polls(commands.Cog):
     """
     Sistema de votação e enquetes.
+    Os votos vêm das reações e são contados em memória (ver PollVoteStore):
+    resultados e encerramento não precisam de ler a mensagem. As enquetes ativas
+    sem votos gravados (anteriores a `poll_votes`) leem as reações uma vez, no arranque.
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         # Emojis numéricos para até 10 opções
         self.emojis = ["1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟"]
+        self._seed_task: asyncio.Task | None = None
+
+    async def cog_load(self):
+        count = await poll_votes.load()
+        poll_votes.start()
+        self._seed_task = asyncio.create_task(self.seed_from_reactions())
+        logger.info(f"Enquetes ativas carregadas: {count}.")
+
+    async def cog_unload(self):
+        if self._seed_task:
+            self._seed_task.cancel()
+        await poll_votes.stop()
+
+    async def seed_from_reactions(self):
+        """Conta os votos que só existem nas reações (uma leitura da mensagem por enquete)."""
+        await self.bot.wait_until_ready()
+        seeded = 0
+        for message_id, channel_id in poll_votes.take_unseeded():
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                continue
+            try:
+                message = await channel.fetch_message(message_id)
+                for reaction in message.reactions:
+                    emoji = str(reaction.emoji)
+                    if emoji not in self.emojis:
+                        continue
+                    option = self.emojis.index(emoji)
+                    async for user in reaction.users():
+                        if not user.bot:
+                            # Escolha única com várias reações antigas: fica a última lida
+                            poll_votes.vote(message_id, user.id, option)
+                seeded += 1
+            except discord.HTTPException as e:
+                logger.warning(f"Não consegui ler as reações da enquete {message_id}: {e}")
+        if seeded:
+            logger.info(f"Votos de {seeded} enquete(s) antigas lidos das reações.")
+
+    def build_embed(self, question: str, options_list: list[str], author: discord.abc.User | None,
+                    multi_choice: bool, closed: bool = False) -> discord.Embed:
+        # Monta o texto visual das opções
+        description = ""
+        for i, option in enumerate(options_list):
+            description += f"{self.emojis[i]} **{option}**\n\n"
+
+        embed = discord.Embed(
+            title=f"📊 {question}",
+            description=description,
+            color=discord.Color.greyple() if closed else discord.Color.gold()
+        )
+        if author:
+            embed.set_author(name=author.display_name, icon_url=author.display_avatar.url)
+
+        if closed:
+            embed.set_footer(text="🔴 Enquete Encerrada")
+        elif multi_choice:
+            embed.set_footer(text="Reaja abaixo para votar! (pode escolher várias opções)")
+        else:
+            embed.set_footer(text="Reaja abaixo para votar!")
+        return embed
+
+    def build_report(self, poll: Poll, counts: list[int]) -> str:
+        options_list = poll.options.split("|")
+        results = sorted(zip(options_list, counts), key=lambda x: x[1], reverse=True)
+        total_votes = sum(counts)
+
+        report = f"**Pergunta:** {poll.question}\n\n"
+        for opt, count in results:
+            pct = (count / total_votes * 100) if total_votes > 0 else 0
+            bar = "█" * int(pct / 10)
+            report += f"**{opt}**: {count} votos ({int(pct)}%)\n`{bar}`\n"
+
+        report += f"\n👥 **Total de Votos:** {total_votes}"
+        return report
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        if not poll_votes.watches(payload.message_id) or payload.user_id == self.bot.user.id:
+            return
+        if payload.member and payload.member.bot:
+            return
+
+        emoji = str(payload.emoji)
+        if emoji not in self.emojis:
+            return
+
+        replaced = poll_votes.vote(payload.message_id, payload.user_id, self.emojis.index(emoji))
+
+        # Escolha única: tira as reações das opções anteriores (os votos já foram retirados)
+        if replaced:
+            channel = self.bot.get_channel(payload.channel_id)
+            if channel:
+                message = channel.get_partial_message(payload.message_id)
+                for option in replaced:
+                    try:
+                        await message.remove_reaction(self.emojis[option], discord.Object(payload.user_id))
+                    except discord.HTTPException:
+                        pass
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        if not poll_votes.watches(payload.message_id):
+            return
+
+        emoji = str(payload.emoji)
+        if emoji in self.emojis:
+            poll_votes.unvote(payload.message_id, payload.user_id, self.emojis.index(emoji))
 
     @app_commands.command(name="enquete", description="Cria uma votação pública.")
-    @app_commands.describe(pergunta="Qual é a questão?", opcoes="Separe as opções com a barra vertical | (Ex: Pizza|Hambúrguer|Salada)")
-    async def enquete(self, interaction: discord.Interaction, pergunta: str, opcoes: str):
+    @app_commands.describe(
+        pergunta="Qual é a questão?",
+        opcoes="Separe as opções com a barra vertical | (Ex: Pizza|Hambúrguer|Salada)",
+        multipla="Permite votar em mais de uma opção (Padrão: não)"
+    )
+    async def enquete(self, interaction: discord.Interaction, pergunta: str, opcoes: str, multipla: bool = False):
         # Separa as opções
         options_list = [opt.strip() for opt in opcoes.split("|") if opt.strip()]
         
@@ -29,36 +149,53 @@ class Polls(commands.Cog):
 
         await interaction.response.defer()
 
-        # Monta o texto visual das opções
-        description = ""
-        for i, option in enumerate(options_list):
-            description += f"{self.emojis[i]} **{option}**\n\n"
-
-        embed = discord.Embed(
-            title=f"📊 {pergunta}",
-            description=description,
-            color=discord.Color.gold()
-        )
-        embed.set_author(name=interaction.user.display_name, icon_url=interaction.user.display_avatar.url)
-        embed.set_footer(text="Reaja abaixo para votar!")
-
+        embed = self.build_embed(pergunta, options_list, interaction.user, multipla)
         message = await interaction.followup.send(embed=embed)
 
-        # Adiciona as reações correspondentes
-        for i in range(len(options_list)):
-            await message.add_reaction(self.emojis[i])
-
-        # Salva no banco
+        # Salva no banco e começa a contar antes de abrir as reações
         async with get_session() as session:
             service = PollService(session)
-            await service.create_poll(
+            poll = await service.create_poll(
                 interaction.guild.id,
                 interaction.channel.id,
                 message.id,
                 interaction.user.id,
                 pergunta,
-                opcoes
+                "|".join(options_list),
+                multipla
             )
+        poll_votes.track(poll)
+
+        # Adiciona as reações correspondentes
+        for i in range(len(options_list)):
+            await message.add_reaction(self.emojis[i])
+
+    @app_commands.command(name="enquete_resultados", description="Mostra o resultado parcial de uma enquete.")
+    @app_commands.describe(id_mensagem="ID da mensagem da enquete")
+    async def enquete_resultados(self, interaction: discord.Interaction, id_mensagem: str):
+        try:
+            msg_id = int(id_mensagem)
+        except ValueError:
+            await interaction.response.send_message("❌ ID inválido.", ephemeral=True)
+            return
+
+        counts = poll_votes.results(msg_id)
+        if counts is None:
+            await interaction.response.send_message("❌ Enquete não encontrada ou já encerrada.", ephemeral=True)
+            return
+
+        async with get_session() as session:
+            poll = await PollService(session).get_active_poll(msg_id)
+        if not poll:
+            await interaction.response.send_message("❌ Enquete não encontrada ou já encerrada.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="📊 Resultado Parcial",
+            description=self.build_report(poll, counts),
+            color=discord.Color.gold()
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @app_commands.command(name="enquete_encerrar", description="Finaliza uma enquete e mostra o resultado.")
     @app_commands.describe(id_mensagem="ID da mensagem da enquete (Ative o Modo Desenvolvedor do Discord para pegar)")
@@ -72,63 +209,42 @@ class Polls(commands.Cog):
 
         await interaction.response.defer(ephemeral=True)
 
+        # Grava os votos em fila antes de fechar
+        await poll_votes.flush()
+
         async with get_session() as session:
             service = PollService(session)
             poll = await service.close_poll(msg_id)
 
-            if not poll:
-                await interaction.followup.send("❌ Enquete não encontrada ou já encerrada.")
-                return
+        if not poll:
+            await interaction.followup.send("❌ Enquete não encontrada ou já encerrada.")
+            return
+
+        tally = poll_votes.forget(msg_id)
+        options_list = poll.options.split("|")
+        counts = tally.counts if tally else [0] * len(options_list)
 
-            # Busca a mensagem para contar votos
-            try:
-                channel = interaction.guild.get_channel(poll.channel_id)
-                message = await channel.fetch_message(poll.message_id)
-            except:
-                await interaction.followup.send("❌ Não consegui encontrar a mensagem original da enquete.")
-                return
-
-            # Contagem
-            options_list = poll.options.split("|")
-            results = []
-            total_votes = 0
-            
-            # Itera sobre as reações da mensagem
-            for reaction in message.reactions:
-                if str(reaction.emoji) in self.emojis:
-                    index = self.emojis.index(str(reaction.emoji))
-                    if index < len(options_list):
-                        # Subtrai 1 porque o bot conta como 1 voto
-                        count = reaction.count - 1 
-                        results.append((options_list[index], count))
-                        total_votes += count
-
-            # Ordena por mais votado
-            results.sort(key=lambda x: x[1], reverse=True)
-
-            # Gera relatório
-            report = f"**Pergunta:** {poll.question}\n\n"
-            for opt, count in results:
-                pct = (count / total_votes * 100) if total_votes > 0 else 0
-                bar = "█" * int(pct / 10)
-                report += f"**{opt}**: {count} votos ({int(pct)}%)\n`{bar}`\n"
-
-            report += f"\n👥 **Total de Votos:** {total_votes}"
-
-            # Atualiza a mensagem original para "Encerrada"
-            original_embed = message.embeds[0]
-            original_embed.color = discord.Color.greyple()
-            original_embed.set_footer(text="🔴 Enquete Encerrada")
-            await message.edit(embed=original_embed)
-
-            # Envia resultado no chat
-            result_embed = discord.Embed(
-                title="📊 Resultado da Enquete",
-                description=report,
-                color=discord.Color.green()
-            )
-            await channel.send(embed=result_embed)
-            await interaction.followup.send("✅ Enquete encerrada com sucesso!")
+        channel = interaction.guild.get_channel(poll.channel_id)
+        if not channel:
+            await interaction.followup.send("❌ Não consegui encontrar o canal da enquete.")
+            return
+
+        # Atualiza a mensagem original para "Encerrada" (embed reconstruído, sem ler a mensagem)
+        author = interaction.guild.get_member(poll.author_id)
+        embed = self.build_embed(poll.question, options_list, author, poll.multi_choice, closed=True)
+        try:
+            await channel.get_partial_message(poll.message_id).edit(embed=embed)
+        except discord.HTTPException:
+            pass
+
+        # Envia resultado no chat
+        result_embed = discord.Embed(
+            title="📊 Resultado da Enquete",
+            description=self.build_report(poll, counts),
+            color=discord.Color.green()
+        )
+        await channel.send(embed=result_embed)
+        await interaction.followup.send("✅ Enquete encerrada com sucesso!")
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(Polls(bot))
\ No newline at end of file
+    await bot.add_cog(Polls(bot))
@@ -3,7 +3,6 @@ from discord import app_commands
 from discord.ext import commands
 from bot.core.database import get_session
 from bot.services.user_service import UserService
-from bot.services.level_service import LevelService
 from bot.utils.embeds import EmbedFactory, DreamColors
 import logging
 
@@ -13,34 +12,31 @@ class Profile(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    async def check_level_rewards(self, member: discord.Member, new_level: int):
-        async with get_session() as session:
-            lvl_service = LevelService(session)
-            rewards = await lvl_service.get_rewards_for_level(member.guild.id, new_level)
-            
-            if not rewards: return
+    async def check_level_rewards(self, member: discord.Member, levels: list[int]):
+        """Acerta os cargos de recompensa para o novo nível (inclui os de níveis anteriores em falta)."""
+        new_level = max(levels)
+        try:
+            change = await self.bot.reward_roles.sync_member(member, new_level)
+        except discord.Forbidden:
+            logger.warning(f"Sem permissão para dar cargos por nível em {member.guild.name}")
+            return
 
-            roles_added = []
-            for r in rewards:
-                role = member.guild.get_role(r.role_id)
-                if role and role not in member.roles:
-                    try:
-                        await member.add_roles(role, reason=f"Level Up: {new_level}")
-                        roles_added.append(role.name)
-                    except discord.Forbidden:
-                        logger.warning(f"Sem permissão para dar cargo {role.name}")
+        if change.add:
+            try:
+                role_names = ", ".join(role.name for role in change.add)
+                embed = EmbedFactory.create(
+                    title="🎉 Recompensas Desbloqueadas!",
+                    description=f"Ao atingir o nível **{new_level}**, ganhaste:\n**{role_names}**",
+                    color=discord.Color.gold(),
+                    footer=f"Servidor: {member.guild.name}"
+                )
+                await member.send(embed=embed)
+            except: pass
 
-            if roles_added:
-                try:
-                    role_names = ", ".join(roles_added)
-                    embed = EmbedFactory.create(
-                        title="🎉 Recompensas Desbloqueadas!",
-                        description=f"Ao atingir o nível **{new_level}**, ganhaste:\n**{role_names}**",
-                        color=discord.Color.gold(),
-                        footer=f"Servidor: {member.guild.name}"
-                    )
-                    await member.send(embed=embed)
-                except: pass
+    @commands.Cog.listener()
+    async def on_level_up(self, member: discord.Member, levels: list[int]):
+        """Evento despachado (bot.dispatch("level_up", ...)) por quem dá XP num servidor."""
+        await self.check_level_rewards(member, levels)
 
     @app_commands.command(name="perfil", description="Veja seu nível de maturidade e progresso.")
     async def perfil(self, interaction: discord.Interaction, membro: discord.Member = None):
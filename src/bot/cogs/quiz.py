@@ -30,10 +30,13 @@ class QuizButton(discord.ui.Button):
         if self.is_correct:
             async with get_session() as session:
                 service = UserService(session)
-                leveled_up = await service.add_xp(interaction.user.id, view.xp_reward)
+                levels = await service.add_xp(interaction.user.id, view.xp_reward)
                 
             msg = f"✅ **Correto!** Ganhaste **{view.xp_reward} XP** de sabedoria."
-            if leveled_up: msg += "\n🏆 **SUBIU DE NÍVEL!**"
+            if levels:
+                msg += f"\n🏆 **SUBIU DE NÍVEL!** Agora és nível **{levels[-1]}**."
+                if interaction.guild:
+                    interaction.client.dispatch("level_up", interaction.user, levels)
         else:
             msg = "❌ **Errado!** Mais sorte na próxima vez."
 
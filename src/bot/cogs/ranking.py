@@ -1,40 +1,78 @@
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
 from bot.core.database import get_session
+from bot.core.leaderboard import leaderboards
 from bot.services.user_service import UserService
+import logging
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 10
+# Vizinhos mostrados acima e abaixo no /rank
+NEIGHBOURS = 2
 
 class Ranking(commands.Cog):
     """
     Sistema de Leaderboard para exibir os membros mais evoluídos.
+    As posições vêm do ranking em memória (core.leaderboard), sem ORDER BY na tabela.
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self._load_task: asyncio.Task | None = None
+
+    async def cog_load(self):
+        # Em segundo plano: até acabar, o /ranking usa a consulta ao banco
+        self._load_task = asyncio.create_task(self._load())
+
+    def cog_unload(self):
+        if self._load_task:
+            self._load_task.cancel()
+
+    async def _load(self):
+        try:
+            await leaderboards.load()
+        except Exception as e:
+            logger.error(f"Falha ao carregar os rankings: {e}")
 
-    @app_commands.command(name="ranking", description="Veja o Top 10 membros com maior maturidade.")
-    async def ranking(self, interaction: discord.Interaction):
+    def _name(self, guild: discord.Guild | None, user_id: int) -> str:
+        member = guild.get_member(user_id) if guild else None
+        return member.display_name if member else f"Utilizador {user_id}"
+
+    @staticmethod
+    def _scope(interaction: discord.Interaction, geral: bool) -> int | None:
+        """Servidor do ranking (None = global, também fora de servidores)."""
+        return None if geral or not interaction.guild else interaction.guild.id
+
+    @app_commands.command(name="ranking", description="Veja os membros com maior maturidade.")
+    @app_commands.describe(pagina="Página do ranking (10 por página)", geral="Ranking de todos os servidores em vez deste")
+    async def ranking(self, interaction: discord.Interaction, pagina: app_commands.Range[int, 1] = 1, geral: bool = False):
         await interaction.response.defer()
+        guild_id = self._scope(interaction, geral)
 
         async with get_session() as session:
             service = UserService(session)
-            top_users = await service.get_leaderboard(limit=10)
+            top_users = await service.get_leaderboard(limit=PAGE_SIZE, offset=(pagina - 1) * PAGE_SIZE, guild_id=guild_id)
 
         if not top_users:
-            await interaction.followup.send("Ainda não há dados suficientes para o ranking.")
+            if pagina > 1:
+                await interaction.followup.send(f"📭 A página {pagina} do ranking está vazia.")
+            else:
+                await interaction.followup.send("Ainda não há dados suficientes para o ranking.")
             return
 
         embed = discord.Embed(
-            title="🏆 Ranking de Maturidade",
+            title="🏆 Ranking de Maturidade" + ("" if guild_id is None else f" — {interaction.guild.name}"),
             description="Aqueles que buscam a evolução constante.",
             color=discord.Color.gold()
         )
 
         medals = ["🥇", "🥈", "🥉"]
         
-        for index, user_data in enumerate(top_users):
+        for index, user_data in enumerate(top_users, (pagina - 1) * PAGE_SIZE):
             # Tenta pegar o nome do membro no servidor
-            member = interaction.guild.get_member(user_data.id)
-            name = member.display_name if member else f"Utilizador {user_data.id}"
+            name = self._name(interaction.guild, user_data.id)
             
             # Define o ícone da posição (medalha ou número)
             rank_icon = medals[index] if index < 3 else f"`#{index + 1}`"
@@ -45,8 +83,43 @@ class Ranking(commands.Cog):
                 inline=False
             )
 
-        embed.set_footer(text="Continue focado no seu progresso.")
+        footer = "Continue focado no seu progresso."
+        if leaderboards.loaded:
+            board = leaderboards.xp if guild_id is None else leaderboards.guild(guild_id)
+            pages = max((len(board) + PAGE_SIZE - 1) // PAGE_SIZE, 1)
+            footer = f"Página {pagina}/{pages} • {footer}"
+        embed.set_footer(text=footer)
         await interaction.followup.send(embed=embed)
 
+    @app_commands.command(name="rank", description="Veja a sua posição no ranking e quem está à sua volta.")
+    @app_commands.describe(geral="Posição entre todos os servidores em vez deste")
+    async def rank(self, interaction: discord.Interaction, membro: discord.Member = None, geral: bool = False):
+        target = membro or interaction.user
+        guild_id = self._scope(interaction, geral)
+
+        if not leaderboards.loaded:
+            await interaction.response.send_message("⏳ O ranking ainda está a ser carregado. Tenta daqui a pouco.", ephemeral=True)
+            return
+
+        board = leaderboards.xp if guild_id is None else leaderboards.guild(guild_id)
+        start, entries = board.around(target.id, NEIGHBOURS)
+        if not entries:
+            await interaction.response.send_message(f"📭 **{target.display_name}** ainda não tem XP no ranking.", ephemeral=True)
+            return
+
+        lines = []
+        for position, (user_id, xp_total) in enumerate(entries, start):
+            line = f"`#{position}` {self._name(interaction.guild, user_id)} — {xp_total} XP"
+            lines.append(f"**{line}**" if user_id == target.id else line)
+
+        embed = discord.Embed(
+            title=f"📊 Posição de {target.display_name}",
+            description="\n".join(lines),
+            color=discord.Color.gold()
+        )
+        embed.set_thumbnail(url=target.display_avatar.url)
+        embed.set_footer(text=f"#{board.rank(target.id)} de {len(board)} • XP total acumulado")
+        await interaction.response.send_message(embed=embed)
+
 async def setup(bot: commands.Bot):
-    await bot.add_cog(Ranking(bot))
\ No newline at end of file
+    await bot.add_cog(Ranking(bot))
@@ -1,6 +1,8 @@
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
+from bot.config import settings
 from bot.core.database import get_session
 from bot.services.reaction_role_service import ReactionRoleService
 import logging
@@ -10,50 +12,92 @@ logger = logging.getLogger(__name__)
 class ReactionRoles(commands.Cog):
     """
     Gerencia a entrega automática de cargos via reações.
+    As configurações ficam num índice em memória (ver ReactionRoleService); as
+    mudanças de cargos de cada membro são juntadas durante um pequeno atraso (um
+    reagir/desreagir rápido anula-se) e aplicadas como delta, cargo a cargo, sem
+    reescrever a lista de cargos do membro.
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # (guild_id, user_id) -> {role_id: True para dar, False para tirar}
+        self._pending: dict[tuple[int, int], dict[int, bool]] = {}
+        self._tasks: dict[tuple[int, int], asyncio.Task] = {}
+
+    async def cog_load(self):
+        async with get_session() as session:
+            count = await ReactionRoleService(session).load_index()
+        logger.info(f"Reaction roles carregados: {count}.")
+
+    async def cog_unload(self):
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._pending.clear()
+
+    def _queue(self, guild_id: int, user_id: int, role_id: int, granted: bool):
+        key = (guild_id, user_id)
+        self._pending.setdefault(key, {})[role_id] = granted
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._apply(key))
+
+    async def _apply(self, key: tuple[int, int]):
+        await asyncio.sleep(settings.reaction_role_batch_delay)
+        self._tasks.pop(key, None)
+        changes = self._pending.pop(key, None)
+        guild = self.bot.get_guild(key[0])
+        if not changes or not guild:
+            return
+
+        member = guild.get_member(key[1])
+        if member is None:
+            try:
+                member = await guild.fetch_member(key[1])
+            except discord.HTTPException:
+                return
+
+        current = {role.id for role in member.roles}
+        grant = [role for role_id, granted in changes.items()
+                 if granted and role_id not in current and (role := guild.get_role(role_id))]
+        revoke = [role for role in member.roles
+                  if changes.get(role.id) is False]
+        if not grant and not revoke:
+            return
+
+        # Só o delta, um cargo por pedido (atómico no Discord): nunca reescreve a lista
+        # inteira, por isso não desfaz edições concorrentes (ex: recompensas de nível)
+        try:
+            if grant:
+                await member.add_roles(*grant, reason="Reaction Role")
+            if revoke:
+                await member.remove_roles(*revoke, reason="Reaction Role")
+        except discord.Forbidden:
+            logger.warning(f"Sem permissão para editar os cargos de {member} em {guild.name}")
+        except discord.HTTPException as e:
+            logger.warning(f"Falha ao aplicar reaction roles a {member}: {e}")
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
         """Disparado quando alguém reage."""
-        if payload.member.bot:
+        # Caminho quente: estrelas, votos e afins nunca chegam ao banco
+        if not payload.guild_id or not ReactionRoleService.watches(payload.message_id):
+            return
+        if payload.member and payload.member.bot:
             return
 
-        # Busca no banco se essa reação vale alguma coisa
-        async with get_session() as session:
-            service = ReactionRoleService(session)
-            # O emoji pode ser string (Unicode) ou custom (<:name:id>)
-            emoji_str = str(payload.emoji)
-            rr = await service.get_role_by_reaction(payload.message_id, emoji_str)
-
-            if rr:
-                guild = self.bot.get_guild(payload.guild_id)
-                role = guild.get_role(rr.role_id)
-                if role:
-                    try:
-                        await payload.member.add_roles(role, reason="Reaction Role")
-                    except discord.Forbidden:
-                        logger.warning(f"Sem permissão para dar cargo {role.name} em {guild.name}")
+        # O emoji pode ser string (Unicode) ou custom (<:name:id>)
+        role_id = ReactionRoleService.lookup(payload.message_id, str(payload.emoji))
+        if role_id:
+            self._queue(payload.guild_id, payload.user_id, role_id, True)
 
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
         """Disparado quando alguém remove a reação (tira o cargo)."""
-        async with get_session() as session:
-            service = ReactionRoleService(session)
-            emoji_str = str(payload.emoji)
-            rr = await service.get_role_by_reaction(payload.message_id, emoji_str)
-
-            if rr:
-                guild = self.bot.get_guild(payload.guild_id)
-                role = guild.get_role(rr.role_id)
-                member = guild.get_member(payload.user_id)
-                
-                if role and member:
-                    try:
-                        await member.remove_roles(role, reason="Reaction Role Removed")
-                    except discord.Forbidden:
-                        pass
+        if not payload.guild_id or not ReactionRoleService.watches(payload.message_id):
+            return
+
+        role_id = ReactionRoleService.lookup(payload.message_id, str(payload.emoji))
+        if role_id:
+            self._queue(payload.guild_id, payload.user_id, role_id, False)
 
     @app_commands.command(name="rr_add", description="[Admin] Adiciona um cargo por reação a uma mensagem.")
     @app_commands.describe(id_mensagem="ID da mensagem já enviada", emoji="O emoji para reagir", cargo="O cargo a ganhar")
@@ -1,8 +1,11 @@
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
+from bot.config import settings
 from bot.core.database import get_session
+from bot.core.reminder_delivery import ReminderDelivery
 from bot.services.reminder_service import ReminderService
+from bot.utils.cron import CronError, get_zone, next_fire, parse_schedule
 import datetime
 
 class Reminders(commands.Cog):
@@ -11,47 +14,33 @@ class Reminders(commands.Cog):
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.check_reminders.start()
+        self.delivery = ReminderDelivery(
+            bot,
+            workers=settings.reminder_workers,
+            max_concurrency=settings.reminder_max_concurrency,
+            batch_window=settings.reminder_batch_window,
+            max_attempts=settings.reminder_max_attempts,
+            retry_base=settings.reminder_retry_base
+        )
 
-    def cog_unload(self):
-        self.check_reminders.cancel()
+    async def cog_load(self):
+        self.delivery.start()
+        self.bot.scheduler.register("reminder", self.deliver_reminder, self.load_due_reminders)
 
-    @tasks.loop(seconds=30)
-    async def check_reminders(self):
-        """Verifica a cada 30 segundos se há lembretes para entregar."""
-        await self.bot.wait_until_ready()
+    async def cog_unload(self):
+        self.bot.scheduler.unregister("reminder")
+        await self.delivery.stop()
 
+    async def load_due_reminders(self, until: datetime.datetime) -> list[tuple[datetime.datetime, int]]:
+        """Lembretes pendentes até ao horizonte do agendador (inclui os atrasados após um reinício)."""
         async with get_session() as session:
             service = ReminderService(session)
-            due_list = await service.get_due_reminders()
-
-            for reminder in due_list:
-                try:
-                    # Tenta pegar o canal (ou DM)
-                    channel = self.bot.get_channel(reminder.channel_id)
-                    if not channel:
-                        try:
-                            # Se for DM e não estiver no cache
-                            user = await self.bot.fetch_user(reminder.user_id)
-                            channel = await user.create_dm()
-                        except:
-                            pass # Falha na entrega
-                    
-                    if channel:
-                        embed = discord.Embed(
-                            title="⏰ Lembrete!",
-                            description=f"**Você pediu para lembrar:**\n\n📝 {reminder.message}",
-                            color=discord.Color.teal(),
-                            timestamp=reminder.created_at
-                        )
-                        embed.set_footer(text="Definido em")
-                        await channel.send(content=f"<@{reminder.user_id}>", embed=embed)
-                    
-                except Exception as e:
-                    print(f"Erro ao entregar lembrete {reminder.id}: {e}")
-                finally:
-                    # Marca como completo para não repetir
-                    await service.complete_reminder(reminder.id)
+            return [(r.due_at, r.id) for r in await service.get_due_reminders(until)]
+
+    async def deliver_reminder(self, reminder_id: int):
+        """Chamado pelo agendador na hora exata do lembrete (a entrega é feita pelos workers)."""
+        await self.bot.wait_until_ready()
+        await self.delivery.deliver(reminder_id)
 
     @app_commands.command(name="lembrete", description="Define um alerta para o futuro.")
     @app_commands.describe(tempo="Daqui a quanto tempo? (ex: 10m, 1h, 30s)", mensagem="O que devo lembrar?")
@@ -87,14 +76,92 @@ class Reminders(commands.Cog):
             service = ReminderService(session)
             # Salva o ID do canal atual para responder aqui mesmo.
             # Se quiseres forçar DM, podes usar interaction.user.dm_channel.id (se existir)
-            await service.create_reminder(
+            reminder = await service.create_reminder(
                 interaction.user.id,
                 interaction.channel_id,
                 mensagem,
                 due_at
             )
+        self.bot.scheduler.schedule("reminder", reminder.id, due_at)
 
         await interaction.followup.send(f"✅ **Lembrete definido!**\nVou te avisar sobre *'{mensagem}'* <t:{timestamp}:R>.")
 
+    @app_commands.command(name="lembrete_recorrente", description="Define um alerta que se repete (rotinas diárias, semanais...).")
+    @app_commands.describe(
+        agenda="Ex: 'dias úteis 08:00', 'seg,qua,sex 18h30', 'todos os dias 07:00' ou cron '0 8 * * 1-5'",
+        mensagem="O que devo lembrar?",
+        fuso="Fuso horário IANA (Padrão: America/Sao_Paulo)"
+    )
+    async def lembrete_recorrente(self, interaction: discord.Interaction, agenda: str, mensagem: str, fuso: str | None = None):
+        try:
+            schedule = parse_schedule(agenda)
+            zone = get_zone(fuso or settings.default_timezone)
+            due_at = next_fire(schedule, zone, datetime.datetime.utcnow())
+        except CronError as e:
+            await interaction.response.send_message(
+                f"❌ Agenda inválida: {e}.\nExemplos: `dias úteis 08:00`, `seg,qua 19h30`, `0 8 * * 1-5`.",
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        async with get_session() as session:
+            service = ReminderService(session)
+            if await service.count_recurring(interaction.user.id) >= settings.reminder_max_recurring:
+                await interaction.followup.send(f"❌ Você já tem {settings.reminder_max_recurring} lembretes recorrentes. Cancele algum com `/lembrete_cancelar`.")
+                return
+
+            # Uma só linha por agenda: depois de cada entrega, o próximo disparo é atualizado nela
+            reminder = await service.create_reminder(
+                interaction.user.id,
+                interaction.channel_id,
+                mensagem,
+                due_at,
+                cron=schedule.expression,
+                timezone=zone.key
+            )
+        self.bot.scheduler.schedule("reminder", reminder.id, due_at)
+
+        timestamp = int(due_at.replace(tzinfo=datetime.timezone.utc).timestamp())
+        await interaction.followup.send(
+            f"✅ **Lembrete recorrente #{reminder.id} definido!**\n"
+            f"🔁 `{schedule.expression}` ({zone.key})\n"
+            f"Próximo aviso sobre *'{mensagem}'*: <t:{timestamp}:F>."
+        )
+
+    @app_commands.command(name="lembretes", description="Lista os seus lembretes ativos.")
+    async def lembretes(self, interaction: discord.Interaction):
+        async with get_session() as session:
+            reminders = await ReminderService(session).get_user_reminders(interaction.user.id)
+
+        if not reminders:
+            await interaction.response.send_message("📭 Você não tem lembretes ativos.", ephemeral=True)
+            return
+
+        lines = []
+        for reminder in reminders[:15]:
+            timestamp = int(reminder.due_at.replace(tzinfo=datetime.timezone.utc).timestamp())
+            repeat = f" 🔁 `{reminder.cron}`" if reminder.cron else ""
+            lines.append(f"**#{reminder.id}** <t:{timestamp}:R>{repeat}\n📝 {reminder.message[:80]}")
+
+        embed = discord.Embed(title="⏰ Seus Lembretes", description="\n\n".join(lines), color=discord.Color.teal())
+        if len(reminders) > 15:
+            embed.set_footer(text=f"E mais {len(reminders) - 15}...")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="lembrete_cancelar", description="Cancela um lembrete (único ou recorrente).")
+    @app_commands.describe(id="Número do lembrete (veja em /lembretes)")
+    async def lembrete_cancelar(self, interaction: discord.Interaction, id: int):
+        async with get_session() as session:
+            cancelled = await ReminderService(session).cancel_reminder(id, interaction.user.id)
+
+        if not cancelled:
+            await interaction.response.send_message("❌ Lembrete não encontrado.", ephemeral=True)
+            return
+
+        self.bot.scheduler.cancel("reminder", id)
+        await interaction.response.send_message(f"🗑️ Lembrete #{id} cancelado.", ephemeral=True)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(Reminders(bot))
\ No newline at end of file
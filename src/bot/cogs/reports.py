@@ -58,9 +58,8 @@ class Reports(commands.Cog):
             g_service = GuildService(session)
             config = await g_service.get_config(guild.id)
             
-            # Tenta usar o campo report_channel_id (adicionado recentemente)
-            # Se der erro de atributo (caso não tenha reiniciado o banco), usa log_channel_id como fallback
-            channel_id = getattr(config, "report_channel_id", None) or config.log_channel_id
+            # Sem canal de denúncias, usa o canal de logs
+            channel_id = config.report_channel_id or config.log_channel_id
             
             if not channel_id:
                 return False
@@ -152,14 +151,8 @@ class Reports(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         async with get_session() as session:
-            # Assumindo que GuildConfig já foi atualizado com o campo
             g_service = GuildService(session)
-            config = await g_service.get_config(interaction.guild.id)
-            
-            # Atualização manual do campo se o método específico não existir no service
-            config.report_channel_id = canal.id
-            session.add(config)
-            await session.commit()
+            await g_service.update_config(interaction.guild.id, report_channel_id=canal.id)
             
         await interaction.followup.send(f"✅ Canal de denúncias definido para: {canal.mention}")
 
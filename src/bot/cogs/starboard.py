@@ -1,18 +1,49 @@
+import asyncio
 import discord
+from collections import OrderedDict
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
+from bot.config import settings
 from bot.core.database import get_session
 from bot.services.starboard_service import StarboardService
 import logging
 
 logger = logging.getLogger(__name__)
 
+STAR = "⭐"
+
 class Starboard(commands.Cog):
     """
     Sistema de destaque de mensagens (Quadro de Honra).
+    As estrelas são contadas em memória a partir dos eventos de reação: cada
+    mensagem é lida uma única vez para saber a contagem inicial. As edições do
+    quadro são agrupadas (uma rajada de estrelas dá uma só edição) e as contagens
+    são gravadas no banco em lote.
     """
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # message_id -> estrelas (limitado; as menos recentes saem primeiro)
+        self._counts: OrderedDict[int, int] = OrderedDict()
+        self._seeding: set[int] = set()
+        # Mensagens com contagem alterada à espera de edição no quadro
+        self._dirty: set[int] = set()
+        self._tasks: dict[int, asyncio.Task] = {}
+        # Contagens por gravar (original_message_id -> estrelas)
+        self._unsaved: dict[int, int] = {}
+        self.save_loop.change_interval(seconds=settings.starboard_save_interval)
+        self.save_loop.start()
+
+    async def cog_load(self):
+        async with get_session() as session:
+            configs, posts = await StarboardService(session).load_cache()
+        logger.info(f"Starboard carregado: {configs} servidor(es), {posts} destaque(s).")
+
+    async def cog_unload(self):
+        self.save_loop.cancel()
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        await self._save()
 
     def get_star_emoji(self, count: int) -> str:
         if count < 5: return "⭐"
@@ -20,67 +51,137 @@ class Starboard(commands.Cog):
         if count < 20: return "✨"
         return "💫"
 
+    # --- Contagem ---
+    def _track(self, message_id: int, count: int):
+        self._counts[message_id] = max(count, 0)
+        self._counts.move_to_end(message_id)
+        while len(self._counts) > settings.starboard_max_tracked:
+            self._counts.popitem(last=False)
+
+    async def _seed(self, channel_id: int, message_id: int) -> bool:
+        """Lê a mensagem uma vez para obter a contagem atual. Retorna False se não der."""
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            return False
+
+        self._seeding.add(message_id)
+        try:
+            message = await channel.fetch_message(message_id)
+        except discord.HTTPException:
+            return False
+        finally:
+            self._seeding.discard(message_id)
+
+        reaction = discord.utils.get(message.reactions, emoji=STAR)
+        self._track(message_id, reaction.count if reaction else 0)
+        return True
+
+    async def _on_star(self, payload: discord.RawReactionActionEvent, delta: int):
+        if str(payload.emoji) != STAR or not payload.guild_id:
+            return
+
+        # Sem starboard no servidor (ou estrela no próprio quadro): nada a fazer, sem I/O
+        config = StarboardService.config_for(payload.guild_id)
+        if not config or payload.channel_id == config.channel_id:
+            return
+
+        message_id = payload.message_id
+        if message_id in self._counts:
+            self._track(message_id, self._counts[message_id] + delta)
+        elif message_id in self._seeding:
+            return # A leitura em curso já inclui esta reação
+        elif delta < 0 and StarboardService.post_for(message_id) is None:
+            return # Mensagem fora do quadro a perder estrelas: irrelevante
+        elif not await self._seed(payload.channel_id, message_id):
+            return
+
+        self._queue_render(payload.guild_id, payload.channel_id, message_id)
+
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        if str(payload.emoji) != "⭐":
+        await self._on_star(payload, 1)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        await self._on_star(payload, -1)
+
+    # --- Quadro ---
+    def _queue_render(self, guild_id: int, channel_id: int, message_id: int):
+        self._dirty.add(message_id)
+        if message_id not in self._tasks:
+            self._tasks[message_id] = asyncio.create_task(self._render_loop(guild_id, channel_id, message_id))
+
+    async def _render_loop(self, guild_id: int, channel_id: int, message_id: int):
+        """Espera o atraso e edita; se chegarem estrelas durante a edição, repete."""
+        try:
+            while message_id in self._dirty:
+                await asyncio.sleep(settings.starboard_edit_delay)
+                self._dirty.discard(message_id)
+                try:
+                    await self._render(guild_id, channel_id, message_id)
+                except discord.HTTPException as e:
+                    logger.warning(f"Falha ao atualizar o starboard para {message_id}: {e}")
+        finally:
+            self._tasks.pop(message_id, None)
+
+    async def _render(self, guild_id: int, channel_id: int, message_id: int):
+        config = StarboardService.config_for(guild_id)
+        count = self._counts.get(message_id)
+        channel = self.bot.get_channel(channel_id)
+        star_channel = self.bot.get_channel(config.channel_id) if config else None
+        if count is None or not channel or not star_channel:
             return
 
-        async with get_session() as session:
-            service = StarboardService(session)
-            config = await service.get_config(payload.guild_id)
-            
-            # Se não estiver configurado, ignora
-            if not config:
-                return
+        content = f"{self.get_star_emoji(count)} **{count}** | {channel.mention}"
+        post_id = StarboardService.post_for(message_id)
 
-            # Busca a mensagem original
-            channel = self.bot.get_channel(payload.channel_id)
+        if post_id:
+            # Só o cabeçalho muda: edita sem ler a mensagem do quadro
             try:
-                message = await channel.fetch_message(payload.message_id)
-            except:
-                return
-
-            # Conta as estrelas
-            reaction = discord.utils.get(message.reactions, emoji="⭐")
-            if not reaction: return
-            count = reaction.count
-
-            # Verifica se atingiu o mínimo
-            if count < config.threshold:
-                return
-
-            # Verifica se já está no starboard
-            entry = await service.get_entry(message.id)
-            star_channel = self.bot.get_channel(config.channel_id)
-            
-            if not star_channel:
-                return
+                await star_channel.get_partial_message(post_id).edit(content=content)
+            except discord.NotFound:
+                return # O destaque foi apagado à mão
+            self._unsaved[message_id] = count
+            return
 
-            # Conteúdo do Embed
-            embed = discord.Embed(description=message.content, color=discord.Color.gold())
-            embed.set_author(name=message.author.display_name, icon_url=message.author.display_avatar.url)
-            embed.add_field(name="Origem", value=f"[Ir para mensagem]({message.jump_url}) em {channel.mention}")
-            
-            if message.attachments:
-                embed.set_image(url=message.attachments[0].url)
-            
-            embed.timestamp = message.created_at
-            
-            content = f"{self.get_star_emoji(count)} **{count}** | {channel.mention}"
+        # Verifica se atingiu o mínimo
+        if count < config.threshold:
+            return
 
-            if entry:
-                # Atualiza mensagem existente
-                try:
-                    star_msg = await star_channel.fetch_message(entry.starboard_message_id)
-                    await star_msg.edit(content=content, embed=embed)
-                    await service.update_stars(entry, count)
-                except:
-                    # Se a mensagem do starboard foi apagada, cria nova? (Opcional)
-                    pass
-            else:
-                # Cria nova mensagem no starboard
-                star_msg = await star_channel.send(content=content, embed=embed)
-                await service.add_entry(message.id, star_msg.id, channel.id, count)
+        message = await channel.fetch_message(message_id)
+
+        # Conteúdo do Embed
+        embed = discord.Embed(description=message.content, color=discord.Color.gold())
+        embed.set_author(name=message.author.display_name, icon_url=message.author.display_avatar.url)
+        embed.add_field(name="Origem", value=f"[Ir para mensagem]({message.jump_url}) em {channel.mention}")
+        
+        if message.attachments:
+            embed.set_image(url=message.attachments[0].url)
+        
+        embed.timestamp = message.created_at
+
+        # Cria nova mensagem no starboard
+        star_msg = await star_channel.send(content=content, embed=embed)
+        async with get_session() as session:
+            await StarboardService(session).add_entry(message.id, star_msg.id, channel.id, count)
+
+    # --- Persistência ---
+    async def _save(self):
+        if not self._unsaved:
+            return
+        batch, self._unsaved = self._unsaved, {}
+        try:
+            async with get_session() as session:
+                await StarboardService(session).save_stars(batch)
+        except Exception as e:
+            logger.error(f"Falha ao gravar {len(batch)} contagem(ns) do starboard: {e}")
+            # Volta a pôr na fila sem pisar contagens mais recentes
+            for message_id, stars in batch.items():
+                self._unsaved.setdefault(message_id, stars)
+
+    @tasks.loop(seconds=30)
+    async def save_loop(self):
+        await self._save()
 
     @app_commands.command(name="config_starboard", description="[Admin] Configura o canal de destaques.")
     @app_commands.describe(canal="Onde as mensagens vão aparecer", minimo="Mínimo de estrelas (Padrão: 3)")
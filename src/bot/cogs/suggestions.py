@@ -18,7 +18,7 @@ class Suggestions(commands.Cog):
         async with get_session() as session:
             guild_service = GuildService(session)
             config = await guild_service.get_config(interaction.guild.id)
-            channel_id = getattr(config, "suggestion_channel_id", None) 
+            channel_id = config.suggestion_channel_id
 
             if not channel_id:
                 await interaction.followup.send(embed=EmbedFactory.error("Canal de sugestões não configurado."))
@@ -90,7 +90,10 @@ class Suggestions(commands.Cog):
                 embed.color = DreamColors.SUCCESS
                 embed.title = "✅ Sugestão Aprovada"
                 user_service = UserService(session)
-                await user_service.add_xp(sug.author_id, 100)
+                levels = await user_service.add_xp(sug.author_id, 100)
+                author = interaction.guild.get_member(sug.author_id)
+                if levels and author:
+                    self.bot.dispatch("level_up", author, levels)
             else:
                 embed.color = DreamColors.ERROR
                 embed.title = "❌ Sugestão Rejeitada"
@@ -126,10 +129,7 @@ class Suggestions(commands.Cog):
         
         async with get_session() as session:
             service = GuildService(session)
-            config = await service.get_config(interaction.guild.id)
-            config.suggestion_channel_id = canal.id
-            session.add(config)
-            await session.commit()
+            await service.update_config(interaction.guild.id, suggestion_channel_id=canal.id)
             
         await interaction.followup.send(embed=EmbedFactory.success(f"Canal definido para: {canal.mention}"))
 
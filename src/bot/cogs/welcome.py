@@ -72,11 +72,7 @@ class Welcome(commands.Cog):
         
         async with get_session() as session:
             service = GuildService(session)
-            config = await service.get_config(interaction.guild.id)
-            config.welcome_channel_id = canal.id
-            config.module_welcome = True 
-            session.add(config)
-            await session.commit()
+            await service.update_config(interaction.guild.id, welcome_channel_id=canal.id, module_welcome=True)
             
         embed = EmbedFactory.success(f"Canal definido para {canal.mention} e módulo ativado.", "Configuração Salva")
         await interaction.followup.send(embed=embed)
@@ -89,10 +85,7 @@ class Welcome(commands.Cog):
         
         async with get_session() as session:
             service = GuildService(session)
-            config = await service.get_config(interaction.guild.id)
-            config.welcome_message_text = mensagem
-            session.add(config)
-            await session.commit()
+            await service.update_config(interaction.guild.id, welcome_message_text=mensagem)
             
         example = mensagem.replace("{usuario}", interaction.user.mention).replace("{servidor}", interaction.guild.name).replace("{contador}", str(interaction.guild.member_count))
         
@@ -81,6 +81,87 @@ class Settings(BaseSettings):
     # Banco de Dados
     db_url: str = Field(alias="POSTGRES_URL", default="sqlite+aiosqlite:///bot.db")
 
+    # Pool de Conexões (Postgres; ignorado no SQLite)
+    db_pool_size: int = Field(default=5, description="Conexões mantidas abertas no pool")
+    db_max_overflow: int = Field(default=10, description="Conexões extra permitidas em picos")
+    db_pool_recycle: int = Field(default=1800, description="Idade máxima (s) de uma conexão antes de ser reciclada")
+    db_pool_pre_ping: bool = Field(default=True, description="Testa a conexão antes de a usar (evita conexões mortas)")
+
+    # PRAGMAs do SQLite (aplicados em cada conexão nova)
+    sqlite_journal_mode: str = Field(default="WAL", description="WAL permite leitores em paralelo com um escritor")
+    sqlite_synchronous: str = Field(default="NORMAL", description="NORMAL é seguro em WAL e muito mais rápido que FULL")
+    sqlite_mmap_size: int = Field(default=268435456, description="Bytes do ficheiro mapeados em memória (0 desliga)")
+    sqlite_cache_size: int = Field(default=-64000, description="Cache de páginas (negativo = KiB)")
+    sqlite_busy_timeout_ms: int = Field(default=5000, description="Espera (ms) por um lock antes de dar 'database is locked'")
+
+    # Migrações de Esquema (backfills em lote)
+    migration_batch_size: int = Field(default=5000, description="Linhas atualizadas por transação nos backfills")
+    migration_batch_pause_ms: int = Field(default=50, description="Pausa (ms) entre lotes, para dar vez às escritas do bot")
+
+    # Cache
+    cache_poll_interval: float = Field(default=2.0, description="Intervalo (s) de leitura das invalidações de cache entre processos")
+
+    # Ledger de XP/DreamCoins (gravação em lote)
+    ledger_flush_ms: int = Field(default=2000, description="Intervalo (ms) entre gravações em lote do ledger")
+    ledger_max_pending: int = Field(default=500, description="Nº de utilizadores pendentes que força uma gravação antecipada")
+
+    # Detetor de Flood (AutoMod)
+    flood_max_users: int = Field(default=5000, description="Máximo de (servidor, utilizador) seguidos em memória")
+    flood_burst_messages: int = Field(default=6, description="Mensagens na janela que contam como rajada")
+    flood_burst_window: float = Field(default=5.0, description="Janela (s) da rajada")
+    flood_mention_limit: int = Field(default=10, description="Menções somadas permitidas na janela")
+    flood_mention_window: float = Field(default=15.0, description="Janela (s) das menções")
+    flood_raid_messages: int = Field(default=25, description="Mensagens num canal (na janela de rajada) que ativam o modo raid")
+
+    # Reaction Roles
+    reaction_role_batch_delay: float = Field(default=1.0, description="Espera (s) para juntar as reações de um membro numa só edição de cargos")
+
+    # Starboard
+    starboard_edit_delay: float = Field(default=3.0, description="Espera (s) para juntar várias estrelas numa só edição do quadro")
+    starboard_save_interval: int = Field(default=30, description="Intervalo (s) entre gravações em lote das contagens")
+    starboard_max_tracked: int = Field(default=5000, description="Mensagens com contagem de estrelas mantida em memória")
+
+    # Eventos (botões de presença)
+    event_render_interval: float = Field(default=2.0, description="Intervalo mínimo (s) entre edições do painel de um evento")
+
+    # Enquetes (votos gravados em lote)
+    poll_flush_interval: float = Field(default=10.0, description="Intervalo (s) entre gravações em lote dos votos")
+
+    # Sorteios (inscrições gravadas em lote)
+    giveaway_flush_delay: float = Field(default=2.0, description="Espera (s) para juntar inscrições num só INSERT")
+
+    # Lembretes
+    default_timezone: str = Field(default="America/Sao_Paulo", description="Fuso horário por omissão dos lembretes recorrentes")
+    reminder_max_recurring: int = Field(default=25, description="Lembretes recorrentes ativos por utilizador")
+    reminder_workers: int = Field(default=8, description="Tarefas que entregam lembretes em paralelo")
+    reminder_max_concurrency: int = Field(default=10, description="Envios simultâneos para o Discord (abaixo do limite global de 50/s)")
+    reminder_batch_window: float = Field(default=0.5, description="Espera (s) para juntar lembretes que vencem juntos")
+    reminder_max_attempts: int = Field(default=4, description="Tentativas de entrega antes de desistir")
+    reminder_retry_base: float = Field(default=2.0, description="Espera (s) antes da 1ª nova tentativa; duplica a cada falha")
+
+    # Níveis
+    level_xp_base: int = Field(default=100, description="XP para passar do nível n ao n+1 = base × n (depois de mudar, correr recompute_levels.py)")
+
+    # Cargos por nível
+    reward_sync_concurrency: int = Field(default=2, description="Edições de cargos por nível em simultâneo (todos os servidores)")
+    reward_sync_interval: float = Field(default=1.0, description="Intervalo (s) mínimo entre edições de cargos no mesmo servidor")
+
+    # XP de atividade (mensagens e voz)
+    activity_message_xp_min: int = Field(default=15, description="XP mínimo por mensagem premiada")
+    activity_message_xp_max: int = Field(default=25, description="XP máximo por mensagem premiada")
+    activity_message_cooldown: float = Field(default=60.0, description="Intervalo (s) mínimo entre mensagens premiadas do mesmo utilizador")
+    activity_message_min_length: int = Field(default=5, description="Caracteres mínimos para uma mensagem contar")
+    activity_voice_xp_per_minute: int = Field(default=5, description="XP por minuto completo em voz (acompanhado e sem ensurdecer)")
+    activity_voice_min_members: int = Field(default=2, description="Membros humanos no canal para a voz contar")
+    activity_flush_interval: float = Field(default=30.0, description="Intervalo (s) entre gravações em lote do XP de atividade")
+
+    # Agendador (lembretes, sorteios, eventos, foco)
+    scheduler_horizon: int = Field(default=3600, description="Janela (s) de trabalhos lidos do banco para memória")
+
+    # Logs de Moderação (envio agrupado)
+    log_flush_delay: float = Field(default=2.0, description="Atraso (s) antes de enviar os logs em fila")
+    log_max_queue: int = Field(default=50, description="Embeds em fila por canal antes de passar a resumir")
+
     # Lavalink Nodes
     lavalink_nodes_json: str = Field(
         alias="LAVALINK_NODES",
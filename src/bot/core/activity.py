@@ -0,0 +1,206 @@
+import time
+import random
+import asyncio
+import logging
+from array import array
+from typing import Awaitable, Callable
+from bot.config import settings
+from bot.core.database import get_session
+from bot.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+# Chamado depois da gravação para cada (servidor, utilizador, níveis alcançados)
+LevelUpHandler = Callable[[int, int, list[int]], Awaitable[None]]
+
+class CooldownBuckets:
+    """
+    Cooldown por utilizador: o instante do último prémio fica num array de
+    timestamps (8 bytes por utilizador), com o índice de cada utilizador num dict.
+    As posições já expiradas são reaproveitadas por utilizadores novos.
+    """
+
+    def __init__(self, cooldown: float):
+        self.cooldown = cooldown
+        self._slots: dict[int, int] = {}
+        self._stamps = array("d")
+        self._free: list[int] = []
+
+    def hit(self, user_id: int, now: float) -> bool:
+        """Regista um prémio se o utilizador já saiu do cooldown. Retorna se foi aceite."""
+        slot = self._slots.get(user_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._stamps)
+                self._stamps.append(0.0)
+            self._slots[user_id] = slot
+        elif now - self._stamps[slot] < self.cooldown:
+            return False
+
+        self._stamps[slot] = now
+        return True
+
+    def prune(self, now: float) -> int:
+        """Liberta as posições de quem já saiu do cooldown. Retorna quantas foram libertadas."""
+        expired = [user_id for user_id, slot in self._slots.items() if now - self._stamps[slot] >= self.cooldown]
+        for user_id in expired:
+            self._free.append(self._slots.pop(user_id))
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+class VoiceSession:
+    """Intervalo de voz em curso: desde quando o utilizador conta XP e em que servidor."""
+    __slots__ = ("guild_id", "since")
+
+    def __init__(self, guild_id: int, since: float):
+        self.guild_id = guild_id
+        self.since = since
+
+class ActivityXP:
+    """
+    XP de atividade (mensagens e voz) acumulado em memória e gravado em lote.
+
+    Mensagens: cada uma vale um prémio aleatório, no máximo um por cooldown e por
+    utilizador, decidido sem tocar no banco. Voz: em vez de percorrer os membros
+    periodicamente, o cog abre e fecha intervalos nos eventos de entrada e saída;
+    cada minuto completo dentro de um intervalo vale XP. Os prémios somam-se por
+    utilizador e são gravados numa só sessão a cada `flush_interval` (os utilizadores
+    são lidos numa consulta e o XP vai para o ledger); as subidas de nível são
+    entregues depois ao `on_level_up`.
+    """
+
+    def __init__(self, message_xp: tuple[int, int], message_cooldown: float, message_min_length: int,
+                 voice_xp_per_minute: int, flush_interval: float):
+        self.message_xp = message_xp
+        self.message_min_length = message_min_length
+        self.voice_xp_per_minute = voice_xp_per_minute
+        self.flush_interval = flush_interval
+
+        self.cooldowns = CooldownBuckets(message_cooldown)
+        self.on_level_up: LevelUpHandler | None = None
+
+        self._voice: dict[int, VoiceSession] = {}
+        # user_id -> [xp, guild_id do último prémio]
+        self._pending: dict[int, list[int]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def _award(self, user_id: int, guild_id: int, xp: int):
+        entry = self._pending.get(user_id)
+        if entry is None:
+            self._pending[user_id] = [xp, guild_id]
+        else:
+            entry[0] += xp
+            entry[1] = guild_id
+
+    # --- Mensagens ---
+    def message(self, user_id: int, guild_id: int, length: int) -> int:
+        """Regista uma mensagem. Retorna o XP ganho (0 se curta demais ou em cooldown)."""
+        if length < self.message_min_length:
+            return 0
+        if not self.cooldowns.hit(user_id, time.monotonic()):
+            return 0
+
+        xp = random.randint(*self.message_xp)
+        self._award(user_id, guild_id, xp)
+        return xp
+
+    # --- Voz ---
+    def voice_start(self, user_id: int, guild_id: int):
+        """Abre um intervalo de voz (sem efeito se já houver um aberto no mesmo servidor)."""
+        session = self._voice.get(user_id)
+        if session is not None:
+            if session.guild_id == guild_id:
+                return
+            self.voice_stop(user_id)
+        self._voice[user_id] = VoiceSession(guild_id, time.monotonic())
+
+    def voice_stop(self, user_id: int):
+        """Fecha o intervalo de voz do utilizador e credita os minutos completos."""
+        session = self._voice.pop(user_id, None)
+        if session is not None:
+            self._settle(user_id, session, time.monotonic())
+
+    def in_voice(self, user_id: int) -> bool:
+        return user_id in self._voice
+
+    def _settle(self, user_id: int, session: VoiceSession, now: float):
+        """Credita os minutos completos do intervalo; os segundos que sobram ficam para a próxima."""
+        minutes = int((now - session.since) // 60)
+        if minutes > 0:
+            self._award(user_id, session.guild_id, minutes * self.voice_xp_per_minute)
+            session.since += minutes * 60
+
+    # --- Gravação ---
+    async def flush(self):
+        """Grava o XP pendente (e os minutos de voz já completos) numa única sessão."""
+        async with self._flush_lock:
+            now = time.monotonic()
+            for user_id, session in self._voice.items():
+                self._settle(user_id, session, now)
+            self.cooldowns.prune(now)
+
+            if not self._pending:
+                return
+
+            batch, self._pending = self._pending, {}
+            leveled: list[tuple[int, int, list[int]]] = []
+            # Já entregues ao ledger: numa falha a meio, só os restantes voltam à fila
+            done: set[int] = set()
+            try:
+                async with get_session() as session:
+                    service = UserService(session)
+                    await service.preload(list(batch))
+                    for user_id, (xp, guild_id) in batch.items():
+                        levels = await service.add_xp(user_id, xp)
+                        done.add(user_id)
+                        if levels:
+                            leveled.append((guild_id, user_id, levels))
+            except Exception as e:
+                logger.error(
+                    f"Falha ao gravar XP de atividade ({len(batch) - len(done)} de {len(batch)} utilizadores): {e}"
+                )
+                for user_id, (xp, guild_id) in batch.items():
+                    if user_id not in done:
+                        self._award(user_id, guild_id, xp)
+
+            if self.on_level_up:
+                for guild_id, user_id, levels in leveled:
+                    try:
+                        await self.on_level_up(guild_id, user_id, levels)
+                    except Exception as e:
+                        logger.error(f"Erro ao tratar subida de nível de {user_id}: {e}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Para o ciclo, fecha os intervalos de voz e grava o que ficou pendente."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for user_id in list(self._voice):
+            self.voice_stop(user_id)
+        await self.flush()
+
+activity_xp = ActivityXP(
+    message_xp=(settings.activity_message_xp_min, settings.activity_message_xp_max),
+    message_cooldown=settings.activity_message_cooldown,
+    message_min_length=settings.activity_message_min_length,
+    voice_xp_per_minute=settings.activity_voice_xp_per_minute,
+    flush_interval=settings.activity_flush_interval,
+)
@@ -0,0 +1,159 @@
+import re
+import logging
+from collections import Counter
+from typing import Awaitable, Callable, NamedTuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from bot.config import settings
+from bot.core.cache import InvalidationChannel, invalidation_channel
+from bot.core.flood import FloodDetector
+from bot.core.pipeline import MessageContext
+from bot.models.automod import AutoModConfig
+from bot.services.automod_service import AutoModService, AUTOMOD_NAMESPACE
+
+logger = logging.getLogger(__name__)
+
+INVITE_REGEX = re.compile(r'(https?://)?(www\.)?(discord\.(gg|io|me|li)|discordapp\.com/invite)/.+[a-z]')
+
+# Usada enquanto o servidor não configurar a sua própria lista
+DEFAULT_WORDS = ["palavrao1", "palavrao2", "scam", "casino"]
+
+def compile_words(words: list[str]) -> re.Pattern | None:
+    """
+    Compila a lista de termos numa única regex em forma de trie
+    (ex: ["casa", "casino"] -> "cas(?:a|ino)"). Os prefixos comuns são
+    partilhados, por isso uma passagem pela mensagem cobre milhares de termos.
+    """
+    trie: dict = {}
+    for word in words:
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def emit(node: dict) -> str:
+        is_end = "" in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        # Um termo que é prefixo de outro torna o resto opcional (o match fica com o mais longo)
+        return group + "?" if is_end else group
+
+    if not trie:
+        return None
+    return re.compile(emit(trie))
+
+# Regra do detetor de flood -> (motivo no log, aviso no canal)
+FLOOD_MESSAGES = {
+    "burst": lambda detail: (f"Flood ({detail})", "🌊 Mais devagar! Estás a enviar mensagens rápido demais."),
+    "duplicates": lambda detail: (f"Mensagem Repetida ({detail})", "🔁 Evite repetir a mesma mensagem."),
+    "mention_storm": lambda detail: (f"Tempestade de Menções ({detail})", "📢 Menções em massa não são permitidas."),
+}
+
+class Violation(NamedTuple):
+    rule: str
+    reason: str   # vai para o log de moderação
+    warning: str  # aviso mostrado no canal
+
+class GuildRules:
+    """Regras de um servidor prontas a aplicar (config desligada da sessão + filtro compilado)."""
+    __slots__ = ("config", "pattern")
+
+    def __init__(self, config: AutoModConfig, pattern: re.Pattern | None):
+        self.config = config
+        self.pattern = pattern
+
+class AutoModEngine:
+    """
+    Motor de regras do AutoMod com cache por servidor.
+    O filtro de palavras é guardado por (guild_id, words_version), por isso só é
+    recompilado quando a lista muda, e não quando se mexe nos outros limites.
+    """
+
+    def __init__(self, channel: InvalidationChannel, flood: FloodDetector):
+        self._rules: dict[int, GuildRules] = {}
+        self._patterns: dict[tuple[int, int], re.Pattern | None] = {}
+        self.flood = flood
+        self.hits: Counter[str] = Counter()
+        channel.subscribe(AUTOMOD_NAMESPACE, self.invalidate)
+
+    def invalidate(self, guild_id: int):
+        self._rules.pop(guild_id, None)
+
+    async def rules_for(self, guild_id: int, get_session: Callable[[], Awaitable[AsyncSession]]) -> GuildRules:
+        rules = self._rules.get(guild_id)
+        if rules is not None:
+            return rules
+
+        session = await get_session()
+        service = AutoModService(session)
+        config = await service.get_config(guild_id)
+
+        key = (guild_id, config.words_version)
+        if key not in self._patterns:
+            words = await service.list_words(guild_id) or DEFAULT_WORDS
+            # Descarta as versões antigas deste servidor
+            self._patterns = {k: v for k, v in self._patterns.items() if k[0] != guild_id}
+            self._patterns[key] = compile_words(words)
+            logger.debug(f"Filtro do AutoMod compilado para {guild_id} (v{config.words_version}, {len(words)} termos)")
+
+        session.expunge(config)
+        rules = GuildRules(config, self._patterns[key])
+        self._rules[guild_id] = rules
+        return rules
+
+    def _hit(self, rule: str, reason: str, warning: str) -> Violation:
+        self.hits[rule] += 1
+        return Violation(rule, reason, warning)
+
+    def check(self, ctx: MessageContext, rules: GuildRules) -> Violation | None:
+        """Aplica as regras por ordem de custo; devolve a primeira violação encontrada."""
+        config = rules.config
+        message = ctx.message
+        content_lower = ctx.content_lower
+
+        if config.block_invites and INVITE_REGEX.search(content_lower):
+            return self._hit("invites", "Link de Convite (Anti-Invite)", "**Divulgação não é permitida aqui!**")
+
+        if config.block_words and rules.pattern is not None:
+            match = rules.pattern.search(content_lower)
+            if match:
+                return self._hit("words", f"Palavra Bloqueada: {match.group()}", "⚠️ Mantenha o nível da conversa.")
+
+        if config.block_mentions:
+            mentions = len(ctx.mention_ids) + len(message.role_mentions)
+            if mentions > config.mention_limit:
+                return self._hit("mentions", f"Spam de Menções ({mentions})", "📢 Menções em massa não são permitidas.")
+
+        if config.block_caps:
+            letters = [char for char in message.content if char.isalpha()]
+            if len(letters) >= config.caps_min_length:
+                upper = sum(1 for char in letters if char.isupper())
+                if upper / len(letters) >= config.caps_ratio:
+                    return self._hit("caps", "Excesso de Maiúsculas", "🔠 Evite escrever tudo em maiúsculas.")
+
+        if config.block_flood or config.block_duplicates:
+            verdict = self.flood.record(
+                message.guild.id, message.channel.id, message.author.id, content_lower,
+                mentions=len(ctx.mention_ids),
+                duplicate_limit=config.duplicate_limit if config.block_duplicates else 0,
+                duplicate_window=config.duplicate_window,
+                check_flood=config.block_flood
+            )
+            if verdict:
+                return self._hit(verdict.rule, *FLOOD_MESSAGES[verdict.rule](verdict.detail))
+
+        return None
+
+automod_engine = AutoModEngine(invalidation_channel, FloodDetector(
+    max_users=settings.flood_max_users,
+    burst_messages=settings.flood_burst_messages,
+    burst_window=settings.flood_burst_window,
+    mention_limit=settings.flood_mention_limit,
+    mention_window=settings.flood_mention_window,
+    raid_messages=settings.flood_raid_messages
+))
@@ -0,0 +1,125 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Callable
+from sqlmodel import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from bot.config import settings
+from bot.core.database import get_session
+from bot.models.cache_invalidation import CacheInvalidation
+from bot.models.guild_config import GuildConfig
+
+logger = logging.getLogger(__name__)
+
+# Identifica este processo para ignorar as próprias invalidações
+PROCESS_ORIGIN = f"{settings.bot_profile}:{os.getpid()}"
+
+class InvalidationChannel:
+    """
+    Canal de invalidação entre processos, apoiado na tabela `cache_invalidations`.
+    Funciona como um LISTEN/NOTIFY simplificado: quem escreve publica uma linha
+    na mesma transação da alteração, e cada processo lê periodicamente as linhas novas.
+    """
+
+    # Linhas mais antigas que isto já foram lidas por todos os processos ativos
+    RETENTION = timedelta(minutes=10)
+    PRUNE_EVERY = 150 # ciclos de leitura
+
+    def __init__(self, origin: str = PROCESS_ORIGIN):
+        self.origin = origin
+        self._handlers: dict[str, list[Callable[[int], None]]] = {}
+        self._last_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._polls = 0
+
+    def subscribe(self, namespace: str, handler: Callable[[int], None]):
+        """Regista uma função chamada com a chave invalidada."""
+        self._handlers.setdefault(namespace, []).append(handler)
+
+    def publish(self, session: AsyncSession, namespace: str, key: int):
+        """Adiciona o aviso à sessão. Só é visível para os outros após o commit do chamador."""
+        session.add(CacheInvalidation(namespace=namespace, key=key, origin=self.origin))
+
+    async def poll(self):
+        """Lê as invalidações publicadas desde a última leitura e despacha-as."""
+        async with get_session() as session:
+            if self._last_id is None:
+                # Primeira leitura: apenas marca a posição atual (a cache ainda está fria)
+                result = await session.execute(select(func.max(CacheInvalidation.id)))
+                self._last_id = result.scalar_one_or_none() or 0
+                return
+
+            stmt = select(CacheInvalidation.id, CacheInvalidation.namespace, CacheInvalidation.key, CacheInvalidation.origin).where(
+                CacheInvalidation.id > self._last_id
+            ).order_by(CacheInvalidation.id)
+            rows = (await session.execute(stmt)).all()
+
+            for row_id, namespace, key, origin in rows:
+                self._last_id = row_id
+                if origin == self.origin:
+                    continue
+                for handler in self._handlers.get(namespace, []):
+                    handler(key)
+
+            self._polls += 1
+            if self._polls % self.PRUNE_EVERY == 0:
+                cutoff = datetime.utcnow() - self.RETENTION
+                await session.execute(delete(CacheInvalidation).where(CacheInvalidation.created_at < cutoff))
+                await session.commit()
+
+    async def _run(self, interval: float):
+        while True:
+            try:
+                await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # A tabela pode ainda não existir enquanto o MAIN inicializa o banco
+                logger.debug(f"Falha ao ler invalidações de cache: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(interval))
+            logger.info(f"Canal de invalidação de cache ativo ({interval}s).")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+class GuildConfigCache:
+    """
+    Cache em memória de `GuildConfig` por guild_id.
+    Os objetos guardados estão desligados da sessão e devem ser tratados como só de leitura;
+    as escritas passam pelo GuildService, que atualiza a cache e publica a invalidação.
+    """
+    NAMESPACE = "guild_config"
+
+    def __init__(self, channel: InvalidationChannel):
+        self.channel = channel
+        self._configs: dict[int, GuildConfig] = {}
+        channel.subscribe(self.NAMESPACE, self.invalidate)
+
+    def get(self, guild_id: int) -> GuildConfig | None:
+        return self._configs.get(guild_id)
+
+    def set(self, config: GuildConfig):
+        self._configs[config.guild_id] = config
+
+    def invalidate(self, guild_id: int):
+        self._configs.pop(guild_id, None)
+
+    def clear(self):
+        self._configs.clear()
+
+    def publish(self, session: AsyncSession, guild_id: int):
+        self.channel.publish(session, self.NAMESPACE, guild_id)
+
+invalidation_channel = InvalidationChannel()
+guild_config_cache = GuildConfigCache(invalidation_channel)
@@ -1,19 +1,72 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
 from bot.config import settings
+from bot.core.migrations import run_migrations
 import logging
 from contextlib import asynccontextmanager # <--- Importante
 
 logger = logging.getLogger(__name__)
 
+IS_SQLITE = make_url(settings.db_url).get_backend_name() == "sqlite"
+
+def _engine_options() -> dict:
+    """Opções de pool. O SQLite usa o pool por omissão (um ficheiro local não beneficia de pool_size)."""
+    if IS_SQLITE:
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+# PRAGMAs aplicados em cada conexão SQLite (a maioria vale só para a conexão)
+SQLITE_PRAGMAS = {
+    "journal_mode": settings.sqlite_journal_mode,
+    "synchronous": settings.sqlite_synchronous,
+    "mmap_size": settings.sqlite_mmap_size,
+    "cache_size": settings.sqlite_cache_size,
+    "busy_timeout": settings.sqlite_busy_timeout_ms,
+}
+
 # Configuração da Engine
 engine = create_async_engine(
     settings.db_url,
     echo=False, 
-    future=True
+    future=True,
+    **_engine_options()
 )
 
+if IS_SQLITE:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+async def log_engine_profile():
+    """Regista no log a configuração efetiva da engine (lida da própria conexão no SQLite)."""
+    if not IS_SQLITE:
+        logger.info(
+            f"Engine {engine.dialect.name}: pool_size={settings.db_pool_size}, max_overflow={settings.db_max_overflow}, "
+            f"recycle={settings.db_pool_recycle}s, pre_ping={settings.db_pool_pre_ping}"
+        )
+        return
+
+    try:
+        async with engine.connect() as conn:
+            effective = {}
+            for name in SQLITE_PRAGMAS:
+                result = await conn.exec_driver_sql(f"PRAGMA {name}")
+                effective[name] = result.scalar()
+        logger.info("Engine sqlite: " + ", ".join(f"{k}={v}" for k, v in effective.items()))
+    except Exception as e:
+        logger.warning(f"Não foi possível ler os PRAGMAs do SQLite: {e}")
+
 # Fábrica de Sessões
 async_session_maker = sessionmaker(
     engine, 
@@ -23,11 +76,13 @@ async_session_maker = sessionmaker(
 
 async def init_db():
     """
-    Cria as tabelas no banco de dados se elas não existirem.
+    Cria as tabelas no banco de dados se elas não existirem
+    e aplica as migrações de esquema pendentes (colunas, índices, backfills).
     """
     try:
         async with engine.begin() as conn:
             await conn.run_sync(SQLModel.metadata.create_all)
+        await run_migrations(engine)
         logger.info("Banco de dados inicializado e tabelas verificadas.")
     except Exception as e:
         logger.critical(f"Erro ao inicializar o banco de dados: {e}")
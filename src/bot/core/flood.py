@@ -0,0 +1,131 @@
+import time
+from array import array
+from collections import OrderedDict
+from typing import NamedTuple
+
+class _Ring:
+    """
+    Buffer circular de tamanho fixo com o instante, o hash do conteúdo e o nº de
+    menções das últimas mensagens. Usa arrays (sem objetos por mensagem).
+    """
+    __slots__ = ("times", "hashes", "mentions", "pos", "size")
+
+    def __init__(self, capacity: int):
+        self.times = array("d", bytes(8 * capacity))
+        self.hashes = array("q", bytes(8 * capacity))
+        self.mentions = array("H", bytes(2 * capacity))
+        self.pos = 0
+        self.size = 0
+
+    def push(self, now: float, digest: int, mentions: int):
+        i = self.pos
+        self.times[i] = now
+        self.hashes[i] = digest
+        self.mentions[i] = min(mentions, 65535)
+        self.pos = (i + 1) % len(self.times)
+        if self.size < len(self.times):
+            self.size += 1
+
+    def recent(self, cutoff: float):
+        """Índices das entradas com instante >= cutoff, da mais recente para a mais antiga."""
+        capacity = len(self.times)
+        i = self.pos
+        for _ in range(self.size):
+            i = (i - 1) % capacity
+            if self.times[i] < cutoff:
+                return
+            yield i
+
+class _LRU(OrderedDict):
+    """Dicionário limitado: ao passar do máximo, sai quem está parado há mais tempo."""
+
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+
+    def touch(self, key, factory):
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self[key] = value
+            if len(self) > self.max_size:
+                self.popitem(last=False)
+        else:
+            self.move_to_end(key)
+        return value
+
+class FloodVerdict(NamedTuple):
+    rule: str
+    detail: str
+
+class FloodDetector:
+    """
+    Detetor de flood por janela deslizante.
+    Mantém um buffer por (guild, utilizador) e outro por canal. A memória é limitada
+    a `max_users` utilizadores e `max_users // 10` canais. Os mais inativos são descartados.
+    """
+
+    CAPACITY = 32
+
+    def __init__(self, max_users: int, burst_messages: int, burst_window: float,
+                 mention_limit: int, mention_window: float, raid_messages: int):
+        self.burst_messages = burst_messages
+        self.burst_window = burst_window
+        self.mention_limit = mention_limit
+        self.mention_window = mention_window
+        self.raid_messages = raid_messages
+
+        self._users: _LRU = _LRU(max_users)
+        self._channels: _LRU = _LRU(max(1, max_users // 10))
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _new_ring(self) -> _Ring:
+        return _Ring(self.CAPACITY)
+
+    def is_raid(self, channel_id: int, now: float | None = None) -> bool:
+        """Há uma rajada no canal inteiro (muitos autores ao mesmo tempo)?"""
+        ring = self._channels.get(channel_id)
+        if ring is None:
+            return False
+        now = time.monotonic() if now is None else now
+        return sum(1 for _ in ring.recent(now - self.burst_window)) >= self.raid_messages
+
+    def record(self, guild_id: int, channel_id: int, user_id: int, content: str, mentions: int,
+               duplicate_limit: int, duplicate_window: float, check_flood: bool = True,
+               now: float | None = None) -> FloodVerdict | None:
+        """
+        Regista a mensagem e avalia rajadas, repetições e tempestades de menções.
+        `duplicate_limit` <= 0 desliga as repetições; `check_flood=False` desliga as outras duas.
+        """
+        now = time.monotonic() if now is None else now
+        digest = hash(content)
+
+        channel = self._channels.touch(channel_id, self._new_ring)
+        channel.push(now, digest, mentions)
+
+        ring = self._users.touch((guild_id, user_id), self._new_ring)
+        ring.push(now, digest, mentions)
+
+        if check_flood:
+            # Em modo raid o limite de rajada por utilizador cai para metade
+            burst_limit = self.burst_messages
+            if self.is_raid(channel_id, now):
+                burst_limit = max(2, burst_limit // 2)
+
+            burst = sum(1 for _ in ring.recent(now - self.burst_window))
+            if burst >= burst_limit:
+                return FloodVerdict("burst", f"{burst} mensagens em {self.burst_window:g}s")
+
+        if duplicate_limit > 0 and content:
+            repeats = sum(1 for i in ring.recent(now - duplicate_window) if ring.hashes[i] == digest)
+            if repeats > min(duplicate_limit, self.CAPACITY - 1):
+                return FloodVerdict("duplicates", f"{repeats} repetições")
+
+        if check_flood and mentions:
+            total = sum(ring.mentions[i] for i in ring.recent(now - self.mention_window))
+            if total > self.mention_limit:
+                return FloodVerdict("mention_storm", f"{total} menções em {self.mention_window:g}s")
+
+        return None
@@ -0,0 +1,355 @@
+import time
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from sqlalchemy import select
+from bot.core.database import engine
+from bot.core.ledger import user_ledger
+from bot.models.user import User
+from bot.models.guild_member import GuildMember
+
+logger = logging.getLogger(__name__)
+
+_ID_BITS = 64
+_ID_MASK = (1 << _ID_BITS) - 1
+
+class OrderedBoard:
+    """
+    Ranking ordenado em memória (estrutura de estatística de ordem).
+
+    Cada entrada é um único inteiro (-pontos << 64 | user_id), por isso a ordem
+    crescente das chaves é a do ranking (mais pontos primeiro; empate pelo id).
+    As chaves ficam em listas ordenadas de ~LOAD elementos (bisect dentro de cada
+    uma) e uma árvore de Fenwick soma os tamanhos das listas: posição de um
+    utilizador, entrada na posição k, inserção e remoção custam O(log n) mais um
+    deslocamento dentro de uma lista pequena. Só entram utilizadores com pontos > 0.
+    """
+
+    LOAD = 1000
+
+    def __init__(self):
+        self._buckets: list[list[int]] = []
+        self._maxes: list[int] = []
+        self._tree: list[int] = [0]
+        self._scores: dict[int, int] = {}
+
+    @staticmethod
+    def _key(user_id: int, score: int) -> int:
+        return (-score << _ID_BITS) | user_id
+
+    @staticmethod
+    def _decode(key: int) -> tuple[int, int]:
+        return key & _ID_MASK, -(key >> _ID_BITS)
+
+    # --- Árvore de Fenwick sobre o tamanho das listas ---
+    def _rebuild_tree(self):
+        size = len(self._buckets)
+        tree = [0] * (size + 1)
+        for i, bucket in enumerate(self._buckets, 1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, bucket: int, delta: int):
+        i = bucket + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, bucket: int) -> int:
+        """Nº de entradas nas listas anteriores a `bucket`."""
+        total = 0
+        i = bucket
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """(lista, posição dentro da lista) da entrada na posição global `index`."""
+        pos, rest = 0, index
+        step = 1 << (len(self._buckets).bit_length() - 1) if self._buckets else 0
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] <= rest:
+                pos = nxt
+                rest -= self._tree[nxt]
+            step >>= 1
+        return pos, rest
+
+    # --- Chaves ---
+    def _insert(self, key: int):
+        if not self._buckets:
+            self._buckets, self._maxes = [[key]], [key]
+            self._rebuild_tree()
+            return
+
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+            self._buckets[i].append(key)
+            self._maxes[i] = key
+        else:
+            insort(self._buckets[i], key)
+        self._tree_add(i, 1)
+
+        bucket = self._buckets[i]
+        if len(bucket) > 2 * self.LOAD:
+            self._buckets[i:i + 1] = [bucket[:self.LOAD], bucket[self.LOAD:]]
+            self._maxes[i:i + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+            self._rebuild_tree()
+
+    def _remove(self, key: int):
+        i = bisect_left(self._maxes, key)
+        bucket = self._buckets[i]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._buckets[i], self._maxes[i]
+            self._rebuild_tree()
+
+    # --- API ---
+    def load(self, scores: dict[int, int]):
+        """Substitui o conteúdo (uma ordenação, em vez de n inserções)."""
+        self._scores = {user_id: score for user_id, score in scores.items() if score > 0}
+        keys = sorted(self._key(user_id, score) for user_id, score in self._scores.items())
+        self._buckets = [keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._rebuild_tree()
+
+    def set(self, user_id: int, score: int):
+        old = self._scores.get(user_id, 0)
+        if score == old:
+            return
+        if old > 0:
+            self._remove(self._key(user_id, old))
+            del self._scores[user_id]
+        if score > 0:
+            self._insert(self._key(user_id, score))
+            self._scores[user_id] = score
+
+    def add(self, user_id: int, delta: int):
+        self.set(user_id, self._scores.get(user_id, 0) + delta)
+
+    def score(self, user_id: int) -> int:
+        return self._scores.get(user_id, 0)
+
+    def rank(self, user_id: int) -> int | None:
+        """Posição (1 = primeiro), ou None se o utilizador não tem pontos."""
+        score = self._scores.get(user_id)
+        if score is None:
+            return None
+        key = self._key(user_id, score)
+        i = bisect_left(self._maxes, key)
+        return self._prefix(i) + bisect_left(self._buckets[i], key) + 1
+
+    def page(self, offset: int, limit: int) -> list[tuple[int, int]]:
+        """Entradas (user_id, pontos) a partir da posição `offset` (0 = primeiro)."""
+        if offset >= len(self._scores) or limit <= 0:
+            return []
+        i, j = self._locate(offset)
+        entries = []
+        while i < len(self._buckets) and len(entries) < limit:
+            for key in self._buckets[i][j:j + limit - len(entries)]:
+                entries.append(self._decode(key))
+            i, j = i + 1, 0
+        return entries
+
+    def around(self, user_id: int, radius: int) -> tuple[int, list[tuple[int, int]]]:
+        """(posição da 1ª entrada, entradas) à volta do utilizador; vazio se não tem pontos."""
+        rank = self.rank(user_id)
+        if rank is None:
+            return 0, []
+        start = max(rank - 1 - radius, 0)
+        return start + 1, self.page(start, 2 * radius + 1)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+class Leaderboards:
+    """
+    Rankings de XP total e de DreamCoins, mantidos em memória, e um ranking de XP
+    por servidor (só com os membros desse servidor, segundo `guild_members`).
+
+    São reconstruídos no arranque com uma leitura em streaming de `users` e outra
+    de `guild_members`, e depois acompanham as escritas: o ledger avisa depois de
+    cada gravação com os incrementos já confirmados (subscribe), os débitos diretos
+    (try_debit, transferências) avisam da mesma forma, e o cog de membros chama
+    join/leave nas entradas e saídas. O que chega durante a leitura não se perde:
+    as entradas/saídas são repetidas no fim e os utilizadores tocados são relidos
+    do banco (um incremento não pode ser somado, porque a leitura pode já o ter visto).
+    """
+
+    # Ranking -> coluna de `users` que o ordena
+    COLUMNS = {"xp": "xp_total", "coins": "dream_coins"}
+    STREAM_CHUNK = 5000
+
+    def __init__(self):
+        self.boards = {name: OrderedBoard() for name in self.COLUMNS}
+        self.guild_boards: dict[int, OrderedBoard] = {}
+        # user_id -> servidores onde é membro (para levar o XP aos rankings de cada um)
+        self._member_guilds: dict[int, list[int]] = {}
+        self.loaded = False
+        self._load_lock = asyncio.Lock()
+        # Durante a leitura: utilizadores com escritas confirmadas e entradas/saídas por aplicar
+        self._loading = False
+        self._touched: set[int] = set()
+        self._membership: list[tuple[bool, int, int]] = []
+        user_ledger.subscribe(self.apply)
+
+    @property
+    def xp(self) -> OrderedBoard:
+        return self.boards["xp"]
+
+    @property
+    def coins(self) -> OrderedBoard:
+        return self.boards["coins"]
+
+    async def load(self, force: bool = False):
+        async with self._load_lock:
+            if self.loaded and not force:
+                return
+
+            start = time.perf_counter()
+            self._loading = True
+            self._touched, self._membership = set(), []
+            try:
+                await self._load()
+            finally:
+                self._loading = False
+                self._touched, self._membership = set(), []
+            logger.info(
+                f"Rankings carregados em {time.perf_counter() - start:.1f}s "
+                f"({len(self.xp)} com XP, {len(self.coins)} com DreamCoins, {len(self.guild_boards)} servidores)."
+            )
+
+    async def _load(self):
+        scores = {name: {} for name in self.COLUMNS}
+        table = User.__table__
+        columns = [table.c[column] for column in self.COLUMNS.values()]
+        stmt = select(table.c.id, *columns).execution_options(yield_per=self.STREAM_CHUNK)
+
+        async with engine.connect() as conn:
+            result = await conn.stream(stmt)
+            async for rows in result.partitions():
+                for user_id, *values in rows:
+                    for name, value in zip(self.COLUMNS, values):
+                        if value:
+                            scores[name][user_id] = value
+
+        members = GuildMember.__table__
+        stmt = select(members.c.guild_id, members.c.user_id).execution_options(yield_per=self.STREAM_CHUNK)
+        member_guilds: dict[int, list[int]] = {}
+        guild_scores: dict[int, dict[int, int]] = {}
+        xp_scores = scores["xp"]
+
+        async with engine.connect() as conn:
+            result = await conn.stream(stmt)
+            async for rows in result.partitions():
+                for guild_id, user_id in rows:
+                    member_guilds.setdefault(user_id, []).append(guild_id)
+                    guild = guild_scores.setdefault(guild_id, {})
+                    if user_id in xp_scores:
+                        guild[user_id] = xp_scores[user_id]
+
+        for name, board in self.boards.items():
+            board.load(scores[name])
+        self.guild_boards = {}
+        for guild_id, guild in guild_scores.items():
+            self.guild_boards[guild_id] = board = OrderedBoard()
+            board.load(guild)
+        self._member_guilds = member_guilds
+        await self._catch_up()
+        self.loaded = True
+
+    async def _catch_up(self):
+        """Aplica o que chegou durante a leitura, até não sobrar nada (sem await entre o fim e o loaded)."""
+        table = User.__table__
+        columns = [table.c[column] for column in self.COLUMNS.values()]
+        while True:
+            membership, self._membership = self._membership, []
+            for joined, guild_id, user_id in membership:
+                if joined:
+                    self._join(guild_id, user_id)
+                else:
+                    self._leave(guild_id, user_id)
+            if not self._touched:
+                return
+
+            touched, self._touched = list(self._touched), set()
+            for i in range(0, len(touched), self.STREAM_CHUNK):
+                async with engine.connect() as conn:
+                    rows = (await conn.execute(
+                        select(table.c.id, *columns).where(table.c.id.in_(touched[i:i + self.STREAM_CHUNK]))
+                    )).all()
+                for user_id, *values in rows:
+                    for board, value in zip(self.boards.values(), values):
+                        board.set(user_id, value or 0)
+                    for guild_id in self._member_guilds.get(user_id, ()):
+                        self.guild_boards[guild_id].set(user_id, self.xp.score(user_id))
+
+    # --- Rankings por servidor ---
+    def guild(self, guild_id: int) -> OrderedBoard:
+        """Ranking de XP do servidor (vazio se ainda não tem membros registados)."""
+        return self.guild_boards.get(guild_id) or OrderedBoard()
+
+    def join(self, guild_id: int, user_id: int):
+        if self._loading:
+            self._membership.append((True, guild_id, user_id))
+        elif self.loaded:
+            self._join(guild_id, user_id)
+
+    def _join(self, guild_id: int, user_id: int):
+        guilds = self._member_guilds.setdefault(user_id, [])
+        if guild_id not in guilds:
+            guilds.append(guild_id)
+        self.guild_boards.setdefault(guild_id, OrderedBoard()).set(user_id, self.xp.score(user_id))
+
+    def leave(self, guild_id: int, user_id: int):
+        if self._loading:
+            self._membership.append((False, guild_id, user_id))
+        elif self.loaded:
+            self._leave(guild_id, user_id)
+
+    def _leave(self, guild_id: int, user_id: int):
+        guilds = self._member_guilds.get(user_id)
+        if guilds and guild_id in guilds:
+            guilds.remove(guild_id)
+            if not guilds:
+                del self._member_guilds[user_id]
+        board = self.guild_boards.get(guild_id)
+        if board:
+            board.set(user_id, 0)
+
+    def drop_guild(self, guild_id: int):
+        """O bot saiu do servidor: esquece o ranking e as filiações (raro; percorre os membros)."""
+        if self.guild_boards.pop(guild_id, None) is None:
+            return
+        for user_id in [u for u, guilds in self._member_guilds.items() if guild_id in guilds]:
+            self.leave(guild_id, user_id)
+
+    def apply(self, entries: dict[int, dict[str, int]]):
+        """Aplica incrementos já gravados no banco (chamado pelo ledger)."""
+        if self._loading:
+            self._touched.update(entries)
+            return
+        if not self.loaded:
+            return
+        for name, column in self.COLUMNS.items():
+            board = self.boards[name]
+            for user_id, deltas in entries.items():
+                delta = deltas.get(column)
+                if delta:
+                    board.add(user_id, delta)
+
+        for user_id, deltas in entries.items():
+            delta = deltas.get("xp_total")
+            if delta:
+                for guild_id in self._member_guilds.get(user_id, ()):
+                    self.guild_boards[guild_id].add(user_id, delta)
+
+leaderboards = Leaderboards()
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+from typing import Callable
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from bot.config import settings
+from bot.core.database import engine, get_session
+from bot.models.user import User
+from bot.utils.progression import split_xp
+
+logger = logging.getLogger(__name__)
+
+# Recebe incrementos já gravados no banco: {user_id: {coluna: incremento}}
+LedgerListener = Callable[[dict[int, dict[str, int]]], None]
+
+def upsert_for(dialect_name: str):
+    """Devolve o `insert` com suporte a ON CONFLICT do dialeto em uso."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+class UserLedger:
+    """
+    Livro-razão em memória de incrementos para a tabela `users`.
+    Os prémios (XP, DreamCoins) são somados por utilizador e gravados de uma só
+    vez num UPSERT em lote, em vez de um commit por prémio. `nivel` e
+    `xp_maturidade` não são incrementos: saem sempre do `xp_total` gravado
+    (write_levels), por isso uma leitura desatualizada não os desacerta.
+    """
+
+    # Coluna -> valor de um utilizador novo (o INSERT do upsert parte destes valores)
+    COLUMNS = {"xp_total": 0, "dream_coins": 0}
+
+    def __init__(self, flush_interval_ms: int, max_pending: int):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self._pending: dict[int, dict[str, int]] = {}
+        # Lote a ser gravado pelo flush: continua visível às leituras até ao commit
+        self._inflight: dict[int, dict[str, int]] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._listeners: list[LedgerListener] = []
+
+    # --- Subscrições ---
+    def subscribe(self, listener: LedgerListener):
+        """Regista quem quer saber dos incrementos depois de confirmados (ex: rankings)."""
+        self._listeners.append(listener)
+
+    def notify(self, entries: dict[int, dict[str, int]]):
+        """Avisa os subscritores; também usado por quem escreve em `users` sem passar pelo ledger."""
+        for listener in self._listeners:
+            try:
+                listener(entries)
+            except Exception as e:
+                logger.error(f"Erro num subscritor do ledger: {e}")
+
+    # --- Registo de incrementos ---
+    def add(self, user_id: int, **deltas: int):
+        """Soma incrementos pendentes para o utilizador (ex: xp_total=50)."""
+        entry = self._pending.setdefault(user_id, {})
+        for column, value in deltas.items():
+            if column not in self.COLUMNS:
+                raise ValueError(f"Coluna não suportada pelo ledger: {column}")
+            if value:
+                entry[column] = entry.get(column, 0) + value
+
+        if not entry:
+            del self._pending[user_id]
+        elif len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    def pending(self, user_id: int) -> dict[str, int]:
+        """Incrementos ainda não confirmados no banco (em fila e no lote em gravação)."""
+        queued = self._pending.get(user_id)
+        inflight = self._inflight.get(user_id)
+        if not inflight:
+            return queued or {}
+        if not queued:
+            return inflight
+        return {column: queued.get(column, 0) + inflight.get(column, 0) for column in queued.keys() | inflight.keys()}
+
+    def take(self, user_id: int) -> dict[str, int] | None:
+        """Retira os incrementos do utilizador para serem gravados por outro caminho."""
+        return self._pending.pop(user_id, None)
+
+    def take_column(self, user_id: int, column: str) -> int:
+        """Retira apenas o incremento pendente de uma coluna (ex: o saldo antes de um débito)."""
+        entry = self._pending.get(user_id)
+        if not entry:
+            return 0
+        value = entry.pop(column, 0)
+        if not entry:
+            del self._pending[user_id]
+        return value
+
+    def restore(self, user_id: int, deltas: dict[str, int]):
+        """Devolve incrementos retirados com take() quando a gravação falhou."""
+        self.add(user_id, **deltas)
+
+    def view(self, user: User) -> User:
+        """
+        Leitura das próprias escritas: devolve uma cópia do utilizador com os
+        incrementos pendentes aplicados. O original (ligado à sessão) não é alterado.
+        """
+        deltas = self.pending(user.id)
+        if not deltas:
+            return user
+        data = user.model_dump()
+        for column, value in deltas.items():
+            data[column] = (data.get(column) or 0) + value
+        if "xp_total" in deltas:
+            data["nivel"], data["xp_maturidade"] = split_xp(data["xp_total"])
+        return User(**data)
+
+    # --- Gravação ---
+    async def write(self, session: AsyncSession, entries: dict[int, dict[str, int]]):
+        """Executa o UPSERT aditivo para as entradas dadas, sem fazer commit."""
+        if not entries:
+            return
+
+        insert = upsert_for(engine.dialect.name)
+        table = User.__table__
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={
+                column: table.c[column] + (stmt.excluded[column] - default)
+                for column, default in self.COLUMNS.items()
+            }
+        )
+        rows = [
+            {"id": user_id, **{column: default + deltas.get(column, 0) for column, default in self.COLUMNS.items()}}
+            for user_id, deltas in entries.items()
+        ]
+        if not any(deltas.get("xp_total") for deltas in entries.values()):
+            await session.execute(stmt, rows)
+            return
+
+        result = await session.execute(stmt.returning(table.c.id, table.c.xp_total), rows)
+        totals = {user_id: total for user_id, total in result.all() if entries[user_id].get("xp_total")}
+        await self.write_levels(session, totals)
+
+    async def write_levels(self, session: AsyncSession, totals: dict[int, int]):
+        """
+        Grava `nivel` e `xp_maturidade` derivados do `xp_total` (user_id -> total acabado
+        de escrever, lido com RETURNING na mesma transação). Sem commit.
+        """
+        if not totals:
+            return
+        table = User.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values(nivel=bindparam("_nivel"), xp_maturidade=bindparam("_xp"))
+        )
+        params = []
+        for user_id, total in totals.items():
+            nivel, xp = split_xp(total)
+            params.append({"_id": user_id, "_nivel": nivel, "_xp": xp})
+        await session.execute(stmt, params)
+
+    async def flush(self):
+        """Grava todos os incrementos pendentes num único lote."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            # O lote sai da fila mas fica no _inflight: quem ler a linha antes do
+            # commit continua a somar estes incrementos (leitura das próprias escritas)
+            batch, self._pending = self._pending, {}
+            self._inflight = batch
+            try:
+                async with get_session() as session:
+                    await self.write(session, batch)
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Falha ao gravar ledger ({len(batch)} utilizadores): {e}")
+                self._inflight = {}
+                for user_id, deltas in batch.items():
+                    self.restore(user_id, deltas)
+                return
+            self._inflight = {}
+            self.notify(batch)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Para o ciclo e grava o que ficou pendente (chamado ao desligar)."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+user_ledger = UserLedger(settings.ledger_flush_ms, settings.ledger_max_pending)
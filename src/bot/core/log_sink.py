@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from collections import Counter, deque
+import discord
+from bot.core.database import get_session
+from bot.core.cache import guild_config_cache
+from bot.services.guild_service import GuildService
+
+logger = logging.getLogger(__name__)
+
+class LogSink:
+    """
+    Saída de logs de moderação com atraso e agrupamento.
+    Os embeds ficam numa fila por canal de logs e são enviados em mensagens de até
+    10 embeds e 6000 caracteres no total (limites do Discord), após um pequeno
+    atraso ou quando a fila enche.
+    Acima de `max_queue` embeds pendentes, os eventos passam a ser só contados e
+    saem num resumo ("+37 eventos de voz").
+    """
+
+    MAX_EMBEDS = 10
+    # Soma do texto de todos os embeds de uma mensagem (títulos, descrições, campos, rodapés)
+    MAX_CHARS = 6000
+
+    def __init__(self, bot: discord.Client, flush_delay: float, max_queue: int):
+        self.bot = bot
+        self.flush_delay = flush_delay
+        self.max_queue = max_queue
+        self._queues: dict[int, deque[discord.Embed]] = {}
+        self._dropped: dict[int, Counter[str]] = {}
+        self._channels: dict[int, discord.abc.Messageable] = {}
+        self._full: dict[int, asyncio.Event] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    async def channel_for(self, guild_id: int) -> discord.abc.GuildChannel | None:
+        """Canal de logs do servidor (config vinda da cache; só vai ao banco num miss)."""
+        config = guild_config_cache.get(guild_id)
+        if config is None:
+            async with get_session() as session:
+                config = await GuildService(session).get_config(guild_id)
+        if config and config.log_channel_id:
+            return self.bot.get_channel(config.log_channel_id)
+        return None
+
+    def push(self, channel: discord.abc.Messageable, embed: discord.Embed, category: str = "geral"):
+        """Põe o embed na fila do canal. Não bloqueia: o envio é feito em segundo plano."""
+        channel_id = channel.id
+        self._channels[channel_id] = channel
+        queue = self._queues.setdefault(channel_id, deque())
+
+        if len(queue) >= self.max_queue:
+            self._dropped.setdefault(channel_id, Counter())[category] += 1
+        else:
+            queue.append(embed)
+
+        if channel_id not in self._tasks:
+            self._full[channel_id] = asyncio.Event()
+            self._tasks[channel_id] = asyncio.create_task(self._drain(channel_id))
+        if len(queue) >= self.MAX_EMBEDS:
+            self._full[channel_id].set()
+
+    async def _drain(self, channel_id: int):
+        try:
+            await asyncio.wait_for(self._full[channel_id].wait(), timeout=self.flush_delay)
+        except asyncio.TimeoutError:
+            pass
+
+        try:
+            await self._send_pending(channel_id)
+        finally:
+            self._tasks.pop(channel_id, None)
+            self._full.pop(channel_id, None)
+
+    def _summary(self, channel_id: int) -> discord.Embed | None:
+        dropped = self._dropped.pop(channel_id, None)
+        if not dropped:
+            return None
+        lines = [f"➕ **+{count}** eventos de {category}" for category, count in dropped.most_common()]
+        return discord.Embed(
+            title="📚 Eventos Resumidos",
+            description="\n".join(lines) + "\n*Muitos eventos em pouco tempo; os detalhes foram omitidos.*",
+            color=discord.Color.dark_grey()
+        )
+
+    def _take_batch(self, queue: deque[discord.Embed]) -> tuple[list[discord.Embed], int]:
+        """Tira da fila os embeds que cabem numa mensagem; o resto fica para o envio seguinte."""
+        batch, size = [], 0
+        while queue and len(batch) < self.MAX_EMBEDS:
+            length = len(queue[0])
+            if batch and size + length > self.MAX_CHARS:
+                break
+            batch.append(queue.popleft())
+            size += length
+        return batch, size
+
+    async def _send_pending(self, channel_id: int):
+        channel = self._channels.get(channel_id)
+        queue = self._queues.get(channel_id)
+        if channel is None or queue is None:
+            return
+
+        # Continua até esvaziar: o que chegar durante os envios vai no mesmo ciclo
+        while queue or self._dropped.get(channel_id):
+            batch, size = self._take_batch(queue)
+            if not queue and len(batch) < self.MAX_EMBEDS:
+                summary = self._summary(channel_id)
+                if summary and (not batch or size + len(summary) <= self.MAX_CHARS):
+                    batch.append(summary)
+                elif summary:
+                    queue.append(summary) # Não cabe: sai sozinho na próxima mensagem
+
+            if not batch:
+                continue
+            try:
+                await channel.send(embeds=batch)
+            except discord.HTTPException as e:
+                logger.warning(f"Falha ao enviar {len(batch)} log(s) para o canal {channel_id}: {e}")
+
+        self._queues.pop(channel_id, None)
+        self._channels.pop(channel_id, None)
+
+    async def close(self):
+        """Envia tudo o que está em fila (chamado ao desligar)."""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        for channel_id in list(self._queues):
+            await self._send_pending(channel_id)
+        self._tasks.clear()
+        self._full.clear()
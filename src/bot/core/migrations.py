@@ -0,0 +1,324 @@
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, NamedTuple
+from sqlalchemy import Table, inspect, insert, literal, select, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from bot.config import settings
+from bot.models.schema_migration import SchemaMigration
+from bot.models.guild_config import GuildConfig
+from bot.models.automod import AutoModConfig
+from bot.models.poll import Poll
+from bot.models.event import Event
+from bot.models.reminder import Reminder
+from bot.models.user import User
+
+logger = logging.getLogger(__name__)
+
+LOG_TABLE = SchemaMigration.__table__
+
+class MigrationContext:
+    """
+    Operações disponíveis a uma migração. Todas são idempotentes, porque uma
+    migração interrompida volta a correr do início no arranque seguinte.
+    Cada operação usa transações curtas, para não prender o banco aos outros processos.
+    """
+
+    # Intervalo (s) entre mensagens de progresso dos backfills
+    PROGRESS_EVERY = 5.0
+
+    def __init__(self, engine: AsyncEngine, version: int, step: int, cursor: int | None):
+        self.engine = engine
+        self.dialect = engine.dialect
+        self.version = version
+        # Backfill onde a execução anterior parou e a última chave gravada
+        self._resume_step = step
+        self._resume_cursor = cursor
+        self._step = 0
+
+    async def execute(self, sql: str, **params: Any):
+        async with self.engine.begin() as conn:
+            return await conn.execute(text(sql), params)
+
+    async def has_column(self, table: str, column: str) -> bool:
+        def check(sync_conn) -> bool:
+            return column in {col["name"] for col in inspect(sync_conn).get_columns(table)}
+
+        async with self.engine.connect() as conn:
+            return await conn.run_sync(check)
+
+    def _literal(self, value: Any) -> str:
+        return str(literal(value).compile(dialect=self.dialect, compile_kwargs={"literal_binds": True}))
+
+    async def add_column(self, table: Table, name: str, default: Any = None) -> bool:
+        """
+        Adiciona a coluna `name` (tipo lido do modelo) se ainda não existir.
+        Com `default`, a coluna fica NOT NULL com esse valor; sem ele, fica anulável.
+        Ambas as formas são só de metadados (SQLite e Postgres 11+), sem reescrever a tabela.
+        """
+        if await self.has_column(table.name, name):
+            return False
+
+        ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {table.c[name].type.compile(dialect=self.dialect)}"
+        if default is not None:
+            ddl += f" NOT NULL DEFAULT {self._literal(default)}"
+
+        async with self.engine.begin() as conn:
+            await conn.exec_driver_sql(ddl)
+        logger.info(f"Migração {self.version}: coluna {table.name}.{name} adicionada.")
+        return True
+
+    async def create_index(self, name: str, table: str, columns: str, unique: bool = False):
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        if self.dialect.name == "postgresql":
+            # CONCURRENTLY não bloqueia as escritas, mas não pode correr dentro de uma transação
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.exec_driver_sql(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+        else:
+            async with self.engine.begin() as conn:
+                await conn.exec_driver_sql(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({columns})")
+
+    async def backfill(self, table: Table, values: str, where: str | None = None,
+                       key: str = "id", chunk: int | None = None, **params: Any) -> int:
+        """
+        Executa `UPDATE table SET values [WHERE where]` em lotes de `chunk` linhas,
+        percorrendo a chave primária por ordem (keyset; funciona com IDs esparsos como
+        os do Discord). Cada lote é uma transação própria e grava o progresso em
+        `schema_migrations`; depois de uma falha ou reinício, retoma no lote seguinte.
+        Retorna o nº de linhas atualizadas nesta execução.
+        """
+        step = self._step
+        self._step += 1
+        if step < self._resume_step:
+            return 0 # Já concluído numa execução anterior
+
+        chunk = chunk or settings.migration_batch_size
+        pause = settings.migration_batch_pause_ms / 1000
+        start = self._resume_cursor if step == self._resume_step else None
+
+        condition = f" AND ({where})" if where else ""
+
+        def after(start: int | None) -> tuple[str, dict]:
+            if start is None:
+                return "1 = 1", {}
+            return f"{key} > :_start", {"_start": start}
+
+        async with self.engine.connect() as conn:
+            high = (await conn.execute(text(f"SELECT MAX({key}) FROM {table.name}"))).scalar()
+            clause, bound = after(start)
+            total = (await conn.execute(text(f"SELECT COUNT(*) FROM {table.name} WHERE {clause}"), bound)).scalar() or 0
+        if high is None or (start is not None and start >= high):
+            return 0
+
+        logger.info(f"Migração {self.version}: backfill de {table.name} ({total} linhas)...")
+        updated = seen = 0
+        next_log = time.monotonic() + self.PROGRESS_EVERY
+
+        while start is None or start < high:
+            clause, bound = after(start)
+            async with self.engine.begin() as conn:
+                end = (await conn.execute(
+                    text(f"SELECT {key} FROM {table.name} WHERE {clause} ORDER BY {key} LIMIT 1 OFFSET :_offset"),
+                    {**bound, "_offset": chunk - 1}
+                )).scalar()
+                if end is None:
+                    end = high
+
+                stmt = text(f"UPDATE {table.name} SET {values} WHERE {clause} AND {key} <= :_end{condition}")
+                result = await conn.execute(stmt, {**params, **bound, "_end": end})
+                await conn.execute(
+                    update(LOG_TABLE)
+                    .where(LOG_TABLE.c.version == self.version)
+                    .values(step=step, cursor=end, rows=LOG_TABLE.c.rows + result.rowcount)
+                )
+
+            updated += result.rowcount
+            seen += chunk
+            start = end
+
+            if time.monotonic() >= next_log:
+                pct = min(seen / total, 1) * 100 if total else 100
+                logger.info(f"Migração {self.version}: {table.name} {pct:.0f}% ({updated} linhas atualizadas)")
+                next_log = time.monotonic() + self.PROGRESS_EVERY
+            await asyncio.sleep(pause)
+
+        # O próximo backfill desta migração começa do zero
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                update(LOG_TABLE).where(LOG_TABLE.c.version == self.version).values(step=step + 1, cursor=None)
+            )
+        logger.info(f"Migração {self.version}: backfill de {table.name} concluído ({updated} linhas).")
+        return updated
+
+    async def rewrite(self, table: Table, column: str, transform: Callable[[Any], Any],
+                      where: str | None = None) -> int:
+        """
+        Reescreve `column` em Python (valor novo = transform(valor antigo)) nas linhas
+        que cumprem `where`. Para conversões que o SQL não faz de forma portável, em
+        tabelas pequenas: tudo numa só transação, que também marca o passo como feito,
+        por isso uma nova execução não aplica a conversão duas vezes.
+        Retorna o nº de linhas atualizadas.
+        """
+        step = self._step
+        self._step += 1
+        if step < self._resume_step:
+            return 0
+
+        query = select(table.c.id, table.c[column])
+        if where:
+            query = query.where(text(where))
+
+        async with self.engine.begin() as conn:
+            rows = (await conn.execute(query)).all()
+            for row_id, value in rows:
+                await conn.execute(update(table).where(table.c.id == row_id).values({column: transform(value)}))
+            await conn.execute(
+                update(LOG_TABLE)
+                .where(LOG_TABLE.c.version == self.version)
+                .values(step=step + 1, cursor=None, rows=LOG_TABLE.c.rows + len(rows))
+            )
+        logger.info(f"Migração {self.version}: {table.name}.{column} reescrita em {len(rows)} linhas.")
+        return len(rows)
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[MigrationContext], Awaitable[None]]
+
+MIGRATIONS: list[Migration] = []
+
+def migration(version: int, name: str):
+    """Regista uma migração. As versões são aplicadas por ordem e nunca reutilizadas."""
+    def decorator(func):
+        if any(m.version == version for m in MIGRATIONS):
+            raise ValueError(f"Versão de migração repetida: {version}")
+        MIGRATIONS.append(Migration(version, name, func))
+        return func
+    return decorator
+
+async def run_migrations(engine: AsyncEngine):
+    """
+    Aplica as migrações pendentes, por ordem de versão.
+    Deve correr num único processo (o MAIN, via init_db), depois do create_all.
+    """
+    async with engine.connect() as conn:
+        applied = {row.version: row for row in (await conn.execute(select(LOG_TABLE))).all()}
+
+    pending = [m for m in sorted(MIGRATIONS, key=lambda m: m.version) if m.version not in applied or applied[m.version].finished_at is None]
+    if not pending:
+        logger.info(f"Esquema atualizado (versão {max((m.version for m in MIGRATIONS), default=0)}).")
+        return
+
+    for m in pending:
+        row = applied.get(m.version)
+        if row is None:
+            async with engine.begin() as conn:
+                await conn.execute(insert(LOG_TABLE).values(version=m.version, name=m.name, started_at=datetime.utcnow()))
+            ctx = MigrationContext(engine, m.version, 0, None)
+            logger.info(f"Migração {m.version}: {m.name}")
+        else:
+            ctx = MigrationContext(engine, m.version, row.step, row.cursor)
+            logger.info(f"Migração {m.version}: {m.name} (retomada no backfill {row.step}, chave {row.cursor})")
+
+        start = time.perf_counter()
+        try:
+            await m.upgrade(ctx)
+        except Exception as e:
+            logger.critical(f"Migração {m.version} falhou: {e}")
+            raise
+
+        duration_ms = int((time.perf_counter() - start) * 1000)
+        async with engine.begin() as conn:
+            await conn.execute(
+                update(LOG_TABLE)
+                .where(LOG_TABLE.c.version == m.version)
+                .values(finished_at=datetime.utcnow(), duration_ms=duration_ms, cursor=None)
+            )
+        logger.info(f"Migração {m.version} concluída em {duration_ms} ms.")
+
+# --- Migrações ---
+# Bancos novos já nascem com o esquema completo (create_all); as migrações
+# trazem os bancos antigos até lá e devem ser inofensivas num banco novo.
+
+class IndexSpec(NamedTuple):
+    name: str
+    table: str
+    columns: str
+
+# Índices das consultas quentes (o create_all não cria índices em tabelas já existentes).
+# afk_status(user_id) e user_skills(skill) já têm índice no próprio modelo.
+INDEXES = [
+    IndexSpec("ix_reminders_active_due_at", "reminders", "active, due_at"),
+    IndexSpec("ix_giveaways_active_end_time", "giveaways", "active, end_time"),
+    IndexSpec("ix_events_active_start_time", "events", "active, start_time"),
+    IndexSpec("ix_focus_sessions_active_ends_at", "focus_sessions", "active, ends_at"),
+    IndexSpec("ix_reaction_roles_message_emoji", "reaction_roles", "message_id, emoji"),
+    IndexSpec("ix_tags_guild_name", "tags", "guild_id, name"),
+    IndexSpec("ix_event_participants_event_status", "event_participants", "event_id, status"),
+    IndexSpec("ix_birthdays_month_day", "birthdays", "month, day"),
+    IndexSpec("ix_users_leaderboard", "users", "nivel DESC, xp_maturidade DESC"),
+    IndexSpec("ix_users_rich_list", "users", "dream_coins DESC"),
+]
+
+@migration(1, "Índices das consultas quentes")
+async def _hot_query_indexes(ctx: MigrationContext):
+    for index in INDEXES:
+        await ctx.create_index(index.name, index.table, index.columns)
+
+@migration(2, "Canais de sugestões, denúncias e desabafos em guild_configs")
+async def _guild_channel_columns(ctx: MigrationContext):
+    table = GuildConfig.__table__
+    for name in ("suggestion_channel_id", "report_channel_id", "confession_channel_id"):
+        await ctx.add_column(table, name)
+
+@migration(3, "Interruptor de flood no AutoMod")
+async def _automod_block_flood(ctx: MigrationContext):
+    await ctx.add_column(AutoModConfig.__table__, "block_flood", default=True)
+
+@migration(4, "Enquetes de escolha múltipla")
+async def _poll_multi_choice(ctx: MigrationContext):
+    await ctx.add_column(Poll.__table__, "multi_choice", default=False)
+
+@migration(5, "Lembretes recorrentes (cron e fuso horário)")
+async def _recurring_reminders(ctx: MigrationContext):
+    table = Reminder.__table__
+    await ctx.add_column(table, "cron")
+    await ctx.add_column(table, "timezone")
+
+@migration(6, "XP total acumulado em users (níveis em forma fechada)")
+async def _user_xp_total(ctx: MigrationContext):
+    await ctx.add_column(User.__table__, "xp_total", default=0)
+    # Até aqui a curva era fixa (100 × nível); nivel * (nivel - 1) é sempre par
+    await ctx.backfill(
+        User.__table__,
+        "xp_total = :base * (nivel * (nivel - 1) / 2) + xp_maturidade",
+        where="xp_total = 0",
+        base=100
+    )
+
+@migration(7, "Índice do ranking por XP total")
+async def _xp_total_index(ctx: MigrationContext):
+    await ctx.create_index("ix_users_xp_total", "users", "xp_total DESC, id")
+    # O ranking deixou de ordenar por (nivel, xp_maturidade)
+    await ctx.execute("DROP INDEX IF EXISTS ix_users_leaderboard")
+
+@migration(8, "Índice do ranking de DreamCoins com desempate por id")
+async def _rich_list_index(ctx: MigrationContext):
+    # O get_rich_list ordena por (dream_coins DESC, id); sem o id, o SQLite ordenava cada página
+    await ctx.create_index("ix_users_dream_coins", "users", "dream_coins DESC, id")
+    await ctx.execute("DROP INDEX IF EXISTS ix_users_rich_list")
+
+@migration(9, "Início dos eventos ativos em UTC")
+async def _event_start_utc(ctx: MigrationContext):
+    # O /evento_criar gravava a hora local do anfitrião; agora grava UTC, como o resto
+    # do banco. O timestamp() de um datetime ingénuo lê-o como hora local (com o
+    # horário de verão da própria data), por isso cada linha é convertida certa.
+    # Eventos já terminados ficam como estão (só servem de histórico).
+    await ctx.rewrite(
+        Event.__table__,
+        "start_time",
+        lambda start: datetime.utcfromtimestamp(start.timestamp()),
+        where="active"
+    )
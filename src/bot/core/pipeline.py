@@ -0,0 +1,131 @@
+import time
+import logging
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable, NamedTuple
+import discord
+from sqlalchemy.ext.asyncio import AsyncSession
+from bot.core.database import get_session
+from bot.core.cache import guild_config_cache
+from bot.models.guild_config import GuildConfig
+from bot.services.guild_service import GuildService
+
+logger = logging.getLogger(__name__)
+
+class MessageContext:
+    """
+    Dados de uma mensagem calculados uma única vez e partilhados por todos os estágios.
+    A sessão do banco só é aberta se algum estágio a pedir, e é fechada no fim do pipeline.
+    """
+
+    def __init__(self, message: discord.Message):
+        self.message = message
+        self.content_lower = message.content.lower()
+        self.mention_ids = {user.id for user in message.mentions}
+
+        # Membros têm permissões; um autor sem Member (ex: fora da cache) não tem nenhuma
+        self.permissions: discord.Permissions = getattr(message.author, "guild_permissions", discord.Permissions.none())
+        self.is_admin = self.permissions.administrator
+
+        self.config: GuildConfig | None = None
+        self.stopped = False
+        self._stack = AsyncExitStack()
+        self._session: AsyncSession | None = None
+
+    async def session(self) -> AsyncSession:
+        """Sessão partilhada entre os estágios, aberta na primeira utilização."""
+        if self._session is None:
+            self._session = await self._stack.enter_async_context(get_session())
+        return self._session
+
+    async def load_config(self):
+        """Fotografia da GuildConfig (vinda da cache; só vai ao banco num miss)."""
+        self.config = guild_config_cache.get(self.message.guild.id)
+        if self.config is None:
+            self.config = await GuildService(await self.session()).get_config(self.message.guild.id)
+
+    def stop(self):
+        """Interrompe o pipeline: os estágios seguintes e os comandos de texto não correm."""
+        self.stopped = True
+
+    async def close(self):
+        await self._stack.aclose()
+
+StageHandler = Callable[[MessageContext], Awaitable[None]]
+
+class Stage(NamedTuple):
+    name: str
+    priority: int
+    handler: StageHandler
+
+class StageStats:
+    """Contadores de tempo de um estágio."""
+    __slots__ = ("calls", "total", "max", "errors")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def record(self, elapsed: float):
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    @property
+    def avg_ms(self) -> float:
+        return (self.total / self.calls * 1000) if self.calls else 0.0
+
+class MessagePipeline:
+    """
+    Processa cada mensagem de servidor por estágios registados pelos cogs,
+    por ordem crescente de prioridade. Um estágio pode chamar ctx.stop() para parar a cadeia.
+    """
+
+    def __init__(self):
+        self._stages: list[Stage] = []
+        self.stats: dict[str, StageStats] = {}
+
+    def register(self, name: str, handler: StageHandler, priority: int = 100):
+        """Regista (ou substitui) um estágio. Menor prioridade corre primeiro."""
+        self.unregister(name)
+        self._stages.append(Stage(name, priority, handler))
+        self._stages.sort(key=lambda stage: stage.priority)
+        self.stats.setdefault(name, StageStats())
+
+    def unregister(self, name: str):
+        self._stages = [stage for stage in self._stages if stage.name != name]
+
+    @property
+    def stages(self) -> list[str]:
+        return [stage.name for stage in self._stages]
+
+    async def run(self, message: discord.Message) -> MessageContext:
+        ctx = MessageContext(message)
+        try:
+            if not self._stages:
+                return ctx
+
+            try:
+                await ctx.load_config()
+            except Exception as e:
+                # Os estágios continuam a correr; os que dependem da config verificam ctx.config
+                logger.error(f"Falha ao carregar a config do servidor {message.guild.id}: {e}")
+
+            for stage in list(self._stages):
+                stats = self.stats[stage.name]
+                start = time.perf_counter()
+                try:
+                    await stage.handler(ctx)
+                except Exception as e:
+                    stats.errors += 1
+                    logger.error(f"Erro no estágio '{stage.name}' do pipeline de mensagens: {e}")
+                finally:
+                    stats.record(time.perf_counter() - start)
+
+                if ctx.stopped:
+                    break
+        finally:
+            await ctx.close()
+        return ctx
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from bot.config import settings
+from bot.core.database import get_session
+from bot.models.poll import Poll
+from bot.services.poll_service import PollService
+
+logger = logging.getLogger(__name__)
+
+class PollTally:
+    """Votos de uma enquete ativa: quem votou em quê e o total por opção."""
+    __slots__ = ("poll_id", "multi_choice", "counts", "votes")
+
+    def __init__(self, poll_id: int, options: int, multi_choice: bool):
+        self.poll_id = poll_id
+        self.multi_choice = multi_choice
+        self.counts = [0] * options
+        self.votes: dict[int, set[int]] = {}
+
+class PollVoteStore:
+    """
+    Registo dos votos das enquetes ativas, em memória (message_id -> PollTally).
+    Cada utilizador conta no máximo uma vez por opção, e só numa opção nas enquetes
+    de escolha única. Os totais estão sempre prontos (resultados em O(opções), sem
+    ler a mensagem); as alterações são gravadas em `poll_votes` periodicamente.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._polls: dict[int, PollTally] = {}
+        # (poll_id, user_id, opção) -> True para gravar, False para apagar
+        self._pending: dict[tuple[int, int, int], bool] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        # Enquetes ativas sem votos gravados (message_id -> channel_id): podem ser
+        # anteriores a `poll_votes` e ter os votos só nas reações
+        self._unseeded: dict[int, int] = {}
+
+    # --- Registo ---
+    def watches(self, message_id: int) -> bool:
+        return message_id in self._polls
+
+    def track(self, poll: Poll):
+        """Começa a contar uma enquete acabada de criar."""
+        self._polls[poll.message_id] = PollTally(poll.id, len(poll.options.split("|")), poll.multi_choice)
+
+    def forget(self, message_id: int) -> PollTally | None:
+        self._unseeded.pop(message_id, None)
+        return self._polls.pop(message_id, None)
+
+    def take_unseeded(self) -> list[tuple[int, int]]:
+        """(message_id, channel_id) das enquetes a semear a partir das reações (uma vez)."""
+        unseeded, self._unseeded = self._unseeded, {}
+        return [(message_id, channel_id) for message_id, channel_id in unseeded.items() if message_id in self._polls]
+
+    def results(self, message_id: int) -> list[int] | None:
+        tally = self._polls.get(message_id)
+        return list(tally.counts) if tally else None
+
+    async def load(self) -> int:
+        """Carrega as enquetes ativas e os seus votos. Retorna quantas enquetes são."""
+        async with get_session() as session:
+            service = PollService(session)
+            polls = await service.get_active_polls()
+            votes = await service.get_active_votes()
+
+        self._polls = {}
+        by_id = {}
+        for poll in polls:
+            self.track(poll)
+            by_id[poll.id] = self._polls[poll.message_id]
+
+        for poll_id, user_id, option in votes:
+            tally = by_id.get(poll_id)
+            if tally and option < len(tally.counts):
+                tally.votes.setdefault(user_id, set()).add(option)
+                tally.counts[option] += 1
+
+        self._unseeded = {poll.message_id: poll.channel_id for poll in polls if not by_id[poll.id].votes}
+        return len(self._polls)
+
+    # --- Votos ---
+    def vote(self, message_id: int, user_id: int, option: int) -> list[int]:
+        """
+        Regista o voto. Numa enquete de escolha única, substitui o voto anterior;
+        retorna as opções retiradas (para o chamador remover as reações antigas).
+        """
+        tally = self._polls.get(message_id)
+        if tally is None or not 0 <= option < len(tally.counts):
+            return []
+
+        chosen = tally.votes.setdefault(user_id, set())
+        if option in chosen:
+            return []
+
+        replaced = [] if tally.multi_choice else sorted(chosen)
+        for old in replaced:
+            self._remove(tally, user_id, old)
+
+        chosen.add(option)
+        tally.counts[option] += 1
+        self._pending[(tally.poll_id, user_id, option)] = True
+        return replaced
+
+    def unvote(self, message_id: int, user_id: int, option: int) -> bool:
+        tally = self._polls.get(message_id)
+        if tally is None or option not in tally.votes.get(user_id, ()):
+            return False
+        self._remove(tally, user_id, option)
+        return True
+
+    def _remove(self, tally: PollTally, user_id: int, option: int):
+        chosen = tally.votes[user_id]
+        chosen.discard(option)
+        if not chosen:
+            del tally.votes[user_id]
+        tally.counts[option] -= 1
+        self._pending[(tally.poll_id, user_id, option)] = False
+
+    # --- Gravação ---
+    async def flush(self):
+        """Grava todos os votos pendentes num único lote."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            batch, self._pending = self._pending, {}
+            added = [key for key, keep in batch.items() if keep]
+            removed = [key for key, keep in batch.items() if not keep]
+            try:
+                async with get_session() as session:
+                    await PollService(session).save_votes(added, removed)
+            except Exception as e:
+                logger.error(f"Falha ao gravar {len(batch)} voto(s) de enquetes: {e}")
+                for key, keep in batch.items():
+                    self._pending.setdefault(key, keep)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Para o ciclo e grava o que ficou pendente."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+poll_votes = PollVoteStore(settings.poll_flush_interval)
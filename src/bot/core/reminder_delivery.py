@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple
+import aiohttp
+import discord
+from bot.core.database import get_session
+from bot.services.reminder_service import ReminderService
+
+logger = logging.getLogger(__name__)
+
+class DeliveryJob(NamedTuple):
+    """Uma mensagem a enviar: vários lembretes iguais no mesmo canal saem juntos."""
+    channel_id: int
+    user_ids: tuple[int, ...]
+    reminder_ids: tuple[int, ...]
+    message: str
+    created_at: datetime
+    attempt: int = 0
+
+class ReminderDelivery:
+    """
+    Entrega de lembretes com um conjunto limitado de workers.
+
+    O agendador chama `deliver(id)` na hora de cada lembrete. Os lembretes que
+    vencem juntos são lidos numa só consulta e agrupados por (canal, mensagem):
+    quem definiu o mesmo lembrete no mesmo canal recebe uma só mensagem com todas
+    as menções. Os envios passam por um limite global e por um limite de um envio
+    de cada vez por canal (os buckets de rate limit do Discord são por canal).
+    Falhas temporárias são repetidas com espera exponencial; os lembretes tratados
+    são marcados como entregues em lote (um UPDATE ... WHERE id IN (...));
+    os recorrentes avançam para o próximo disparo e voltam ao agendador.
+    """
+
+    DM_CACHE_SIZE = 1000
+    # Atraso (s) para juntar as marcações de entregue num só UPDATE
+    COMPLETE_DELAY = 1.0
+
+    def __init__(self, bot: discord.Client, workers: int, max_concurrency: int,
+                 batch_window: float, max_attempts: int, retry_base: float):
+        self.bot = bot
+        self.workers = workers
+        self.batch_window = batch_window
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+
+        self._jobs: asyncio.Queue[DeliveryJob] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._sends = asyncio.Semaphore(max_concurrency)
+        self._channel_locks: weakref.WeakValueDictionary[int, asyncio.Lock] = weakref.WeakValueDictionary()
+        self._dm_channels: OrderedDict[int, discord.DMChannel] = OrderedDict()
+
+        # Lembretes à espera de serem lidos / de serem marcados como entregues
+        self._waiting: dict[int, asyncio.Future] = {}
+        self._queued: set[int] = set()
+        self._collect_task: asyncio.Task | None = None
+        self._completed: set[int] = set()
+        self._complete_task: asyncio.Task | None = None
+        self._retries: set[asyncio.TimerHandle] = set()
+
+    # --- Entrada ---
+    async def deliver(self, reminder_id: int):
+        """Põe o lembrete na fila e espera até estar tratado (entregue ou abandonado)."""
+        future = self._waiting.get(reminder_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._waiting[reminder_id] = future
+            self._queued.add(reminder_id)
+            if self._collect_task is None:
+                self._collect_task = asyncio.create_task(self._collect())
+        await asyncio.shield(future)
+
+    async def _collect(self):
+        await asyncio.sleep(self.batch_window)
+        ids, self._queued = self._queued, set()
+        self._collect_task = None
+
+        try:
+            async with get_session() as session:
+                reminders = await ReminderService(session).get_active_reminders(list(ids))
+        except Exception as e:
+            logger.error(f"Falha ao ler {len(ids)} lembrete(s) para entrega: {e}")
+            for reminder_id in ids:
+                self._resolve(reminder_id) # O agendador volta a pegá-los na próxima leitura
+            return
+
+        # Cancelados ou já entregues entretanto
+        for reminder_id in ids - {r.id for r in reminders}:
+            self._resolve(reminder_id)
+
+        groups: dict[tuple[int, str], list] = {}
+        for reminder in reminders:
+            groups.setdefault((reminder.channel_id, reminder.message), []).append(reminder)
+
+        for (channel_id, message), group in groups.items():
+            self._jobs.put_nowait(DeliveryJob(
+                channel_id=channel_id,
+                user_ids=tuple(dict.fromkeys(r.user_id for r in group)),
+                reminder_ids=tuple(r.id for r in group),
+                message=message,
+                created_at=min(r.created_at for r in group)
+            ))
+
+    # --- Envio ---
+    async def _dm_channel(self, user_id: int) -> discord.DMChannel | None:
+        channel = self._dm_channels.get(user_id)
+        if channel:
+            self._dm_channels.move_to_end(user_id)
+            return channel
+
+        user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+        channel = user.dm_channel or await user.create_dm()
+        self._dm_channels[user_id] = channel
+        if len(self._dm_channels) > self.DM_CACHE_SIZE:
+            self._dm_channels.popitem(last=False)
+        return channel
+
+    async def _destination(self, job: DeliveryJob) -> discord.abc.Messageable | None:
+        channel = self.bot.get_channel(job.channel_id)
+        if channel:
+            return channel
+        # Canal fora da cache: era uma DM (só faz sentido com um único destinatário)
+        if len(job.user_ids) == 1:
+            return await self._dm_channel(job.user_ids[0])
+        return None
+
+    async def _send(self, job: DeliveryJob):
+        channel = await self._destination(job)
+        if channel is None:
+            raise LookupError(f"canal {job.channel_id} não encontrado")
+
+        embed = discord.Embed(
+            title="⏰ Lembrete!",
+            description=f"**Você pediu para lembrar:**\n\n📝 {job.message}",
+            color=discord.Color.teal(),
+            timestamp=job.created_at
+        )
+        embed.set_footer(text="Definido em")
+        content = " ".join(f"<@{user_id}>" for user_id in job.user_ids)
+
+        lock = self._channel_locks.get(channel.id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._channel_locks[channel.id] = lock
+
+        async with lock, self._sends:
+            await channel.send(content=content, embed=embed)
+
+    @staticmethod
+    def _is_temporary(error: Exception) -> bool:
+        if isinstance(error, discord.HTTPException):
+            return error.status >= 500 or error.status == 429
+        return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientError))
+
+    def _retry(self, job: DeliveryJob):
+        delay = self.retry_base * 2 ** job.attempt
+        retry = job._replace(attempt=job.attempt + 1)
+
+        def requeue():
+            self._retries.discard(handle)
+            self._jobs.put_nowait(retry)
+
+        handle = asyncio.get_running_loop().call_later(delay, requeue)
+        self._retries.add(handle)
+
+    async def _worker(self):
+        while True:
+            job = await self._jobs.get()
+            try:
+                await self._send(job)
+            except Exception as e:
+                if self._is_temporary(e) and job.attempt + 1 < self.max_attempts:
+                    logger.warning(f"Lembrete(s) {list(job.reminder_ids)}: falha temporária ({e}); nova tentativa {job.attempt + 2}/{self.max_attempts}.")
+                    self._retry(job)
+                    continue
+                logger.error(f"Erro ao entregar lembrete(s) {list(job.reminder_ids)}: {e}")
+            finally:
+                self._jobs.task_done()
+
+            # Entregue, ou falha definitiva: marca para não repetir
+            self._complete(job.reminder_ids)
+
+    # --- Conclusão ---
+    def _resolve(self, reminder_id: int):
+        future = self._waiting.pop(reminder_id, None)
+        if future and not future.done():
+            future.set_result(None)
+
+    def _complete(self, reminder_ids: tuple[int, ...]):
+        self._completed.update(reminder_ids)
+        if self._complete_task is None:
+            self._complete_task = asyncio.create_task(self._complete_later())
+
+    async def _complete_later(self):
+        try:
+            await asyncio.sleep(self.COMPLETE_DELAY)
+        finally:
+            self._complete_task = None
+        await self.flush_completed()
+
+    async def flush_completed(self):
+        if not self._completed:
+            return
+        ids, self._completed = self._completed, set()
+        try:
+            async with get_session() as session:
+                next_due = await ReminderService(session).complete_reminders(list(ids))
+        except Exception as e:
+            logger.error(f"Falha ao marcar {len(ids)} lembrete(s) como entregues: {e}")
+        else:
+            # Recorrentes: a mesma linha volta ao agendador com o próximo disparo
+            for reminder_id, due_at in next_due.items():
+                self.bot.scheduler.schedule("reminder", reminder_id, due_at)
+        # Mesmo com falha: o agendador volta a ler do banco os que ficaram ativos
+        for reminder_id in ids:
+            self._resolve(reminder_id)
+
+    # --- Ciclo de vida ---
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for handle in self._retries:
+            handle.cancel()
+        self._retries.clear()
+        for task in [*self._tasks, self._collect_task, self._complete_task]:
+            if task:
+                task.cancel()
+        self._tasks = []
+        self._collect_task = self._complete_task = None
+        await self.flush_completed()
+        for reminder_id in list(self._waiting):
+            self._resolve(reminder_id)
@@ -0,0 +1,169 @@
+import time
+import asyncio
+import logging
+import discord
+from bot.core.database import get_session
+from bot.services.level_service import LevelService
+from bot.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+class RoleChange:
+    """Diferença entre os cargos atuais de um membro e os cargos de recompensa que devia ter."""
+    __slots__ = ("add", "remove")
+
+    def __init__(self, add: list[discord.Role], remove: list[discord.Role]):
+        self.add = add
+        self.remove = remove
+
+    def __bool__(self) -> bool:
+        return bool(self.add or self.remove)
+
+class RewardRoleSync:
+    """
+    Reconciliação dos cargos de recompensa por nível.
+
+    O conjunto-alvo de um membro sai da tabela em memória do LevelService (todas
+    as recompensas até ao seu nível, por bisect); a diferença para os cargos atuais
+    é aplicada num único member.edit(roles=...). As edições passam por um limite
+    global de edições simultâneas e por um intervalo mínimo entre edições no mesmo
+    servidor (o rate limit de edição de membros é por servidor); a lista de cargos
+    só é montada depois dessa espera, a partir do estado atual do membro, para não
+    desfazer alterações feitas entretanto. O backfill percorre um servidor inteiro
+    em segundo plano, lendo os níveis em lote, e só edita quem precisa; um pedido
+    durante um backfill marca o servidor para uma nova passagem no fim.
+    """
+
+    # Membros por leitura de níveis no backfill
+    BACKFILL_CHUNK = 500
+
+    def __init__(self, bot: discord.Client, concurrency: int, interval: float):
+        self.bot = bot
+        self.interval = interval
+        self._edits = asyncio.Semaphore(concurrency)
+        self._pace_locks: dict[int, asyncio.Lock] = {}
+        self._next_edit: dict[int, float] = {}
+        self._backfills: dict[int, asyncio.Task] = {}
+        # Servidores com recompensas alteradas durante o backfill em curso
+        self._dirty: set[int] = set()
+
+    # --- Plano ---
+    def plan(self, member: discord.Member, level: int) -> RoleChange:
+        guild = member.guild
+        reward_ids = LevelService.reward_role_ids(guild.id)
+        if not reward_ids:
+            return RoleChange([], [])
+
+        target_ids = {role_id for _, role_id in LevelService.rewards_up_to(guild.id, level)}
+        current_ids = {role.id for role in member.roles}
+
+        add = [
+            role for role_id in target_ids - current_ids
+            if (role := guild.get_role(role_id)) and role.is_assignable()
+        ]
+        # Cargos de recompensa acima do nível (ex: depois de mudar a curva ou a tabela)
+        remove = [
+            role for role in member.roles
+            if role.id in reward_ids and role.id not in target_ids and role.is_assignable()
+        ]
+        return RoleChange(add, remove)
+
+    # --- Edição ---
+    async def _pace(self, guild_id: int):
+        """Espera pela vez do servidor: no máximo uma edição a cada `interval` segundos."""
+        lock = self._pace_locks.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            wait = self._next_edit.get(guild_id, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_edit[guild_id] = time.monotonic() + self.interval
+
+    async def apply(self, member: discord.Member, level: int, reason: str) -> RoleChange:
+        """
+        Espera pela vez do servidor e só então planeia e edita, com os cargos atuais
+        do membro (a espera pode ser longa num backfill). Retorna o que mudou.
+        """
+        async with self._edits:
+            await self._pace(member.guild.id)
+            member = member.guild.get_member(member.id) or member
+            change = self.plan(member, level)
+            if change:
+                roles = [role for role in member.roles if not role.is_default() and role not in change.remove]
+                roles.extend(role for role in change.add if role not in roles)
+                await member.edit(roles=roles, reason=reason)
+            return change
+
+    async def sync_member(self, member: discord.Member, level: int) -> RoleChange:
+        """Acerta os cargos de recompensa do membro para o nível dado. Retorna o que mudou."""
+        if not self.plan(member, level):
+            return RoleChange([], [])
+        return await self.apply(member, level, f"Recompensas de nível: {level}")
+
+    # --- Backfill ---
+    def is_backfilling(self, guild_id: int) -> bool:
+        return guild_id in self._backfills
+
+    def start_backfill(self, guild: discord.Guild) -> bool:
+        """
+        Lança o acerto de todo o servidor em segundo plano. Se já estiver a correr,
+        marca o servidor para uma nova passagem no fim e retorna False.
+        """
+        if guild.id in self._backfills:
+            self._dirty.add(guild.id)
+            return False
+        if not LevelService.reward_role_ids(guild.id):
+            return False
+        task = asyncio.create_task(self._backfill_until_clean(guild))
+        self._backfills[guild.id] = task
+        task.add_done_callback(lambda _: self._backfills.pop(guild.id, None))
+        return True
+
+    async def _backfill_until_clean(self, guild: discord.Guild):
+        """Repete a passagem enquanto as recompensas mudarem a meio (os já passados podiam ficar sem o cargo novo)."""
+        try:
+            while True:
+                self._dirty.discard(guild.id)
+                await self._backfill(guild)
+                if guild.id not in self._dirty or not LevelService.reward_role_ids(guild.id):
+                    return
+                logger.info(f"Backfill de cargos em {guild.name}: recompensas alteradas durante a passagem, a repetir.")
+        finally:
+            self._dirty.discard(guild.id)
+
+    async def _backfill(self, guild: discord.Guild):
+        start = time.perf_counter()
+        members = [member for member in guild.members if not member.bot]
+        edited = failed = 0
+
+        for i in range(0, len(members), self.BACKFILL_CHUNK):
+            chunk = members[i:i + self.BACKFILL_CHUNK]
+            try:
+                async with get_session() as session:
+                    levels = await UserService(session).get_levels([member.id for member in chunk])
+            except Exception as e:
+                logger.error(f"Backfill de cargos em {guild.name}: falha ao ler níveis: {e}")
+                return
+
+            for member in chunk:
+                level = levels.get(member.id, 1)
+                if not self.plan(member, level):
+                    continue
+                try:
+                    if await self.apply(member, level, "Acerto de recompensas de nível"):
+                        edited += 1
+                except discord.Forbidden:
+                    failed += 1
+                except discord.HTTPException as e:
+                    failed += 1
+                    logger.warning(f"Backfill de cargos em {guild.name}: falha ao editar {member.id}: {e}")
+
+        logger.info(
+            f"Backfill de cargos em {guild.name}: {len(members)} membros, {edited} editados, "
+            f"{failed} falhas, em {time.perf_counter() - start:.0f}s."
+        )
+
+    async def stop(self):
+        for task in list(self._backfills.values()):
+            task.cancel()
+        self._backfills.clear()
+        self._dirty.clear()
@@ -0,0 +1,162 @@
+import heapq
+import asyncio
+import logging
+import itertools
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Executa o trabalho com a chave (id da linha na tabela do tipo)
+JobHandler = Callable[[int], Awaitable[None]]
+# Devolve (instante, chave) dos trabalhos pendentes com instante <= until
+JobLoader = Callable[[datetime], Awaitable[list[tuple[datetime, int]]]]
+
+class Scheduler:
+    """
+    Agendador único para todos os trabalhos com hora marcada (lembretes, fim de
+    sorteios, início de eventos, fim de sessões de foco).
+
+    O banco é a fonte de verdade: cada tipo regista um `loader` que lê os trabalhos
+    pendentes até ao horizonte, e um `handler` que os executa e marca como feitos.
+    Em memória fica apenas um heap com o que vence dentro do horizonte; o ciclo
+    dorme exatamente até ao próximo vencimento (ou até chegar um mais cedo).
+    Depois de um reinício, os trabalhos em atraso são lidos do banco e executados logo.
+    """
+
+    def __init__(self, horizon: timedelta):
+        self.horizon = horizon
+        self._handlers: dict[str, JobHandler] = {}
+        self._loaders: dict[str, JobLoader] = {}
+        self._heap: list[tuple[datetime, int, str, int]] = []
+        # (tipo, chave) -> instante atual; entradas do heap que não batem certo são ignoradas
+        self._due: dict[tuple[str, int], datetime] = {}
+        self._counter = itertools.count()
+        # Até onde o banco já foi lido (None antes da primeira leitura)
+        self._loaded_until: datetime | None = None
+        self._refill_at: datetime | None = None
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+        # Trabalhos em execução: não são relidos do banco enquanto o handler não acabar
+        self._inflight: set[tuple[str, int]] = set()
+
+    # --- Registo ---
+    def register(self, kind: str, handler: JobHandler, loader: JobLoader):
+        self._handlers[kind] = handler
+        self._loaders[kind] = loader
+        if self._task is not None and self._loaded_until is not None:
+            # Registo tardio (cog carregado depois do arranque): lê já este tipo
+            asyncio.create_task(self._load(kind, self._loaded_until))
+
+    def unregister(self, kind: str):
+        self._handlers.pop(kind, None)
+        self._loaders.pop(kind, None)
+        for key in [k for k in self._due if k[0] == kind]:
+            del self._due[key]
+
+    # --- Agendamento ---
+    def schedule(self, kind: str, key: int, due: datetime):
+        """Agenda (ou reagenda) um trabalho já gravado no banco."""
+        if self._loaded_until is None or due > self._loaded_until:
+            # Fora do horizonte (ou antes da 1ª leitura, que ainda não começou):
+            # será lido do banco quando o horizonte avançar
+            self._due.pop((kind, key), None)
+            return
+
+        self._due[(kind, key)] = due
+        heapq.heappush(self._heap, (due, next(self._counter), kind, key))
+        if self._heap[0][3] == key and self._heap[0][2] == kind:
+            self._wakeup.set()
+
+    def cancel(self, kind: str, key: int):
+        """Remove o trabalho da memória (o chamador deve desativá-lo no banco)."""
+        self._due.pop((kind, key), None)
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    # --- Ciclo ---
+    async def _load(self, kind: str, until: datetime):
+        loader = self._loaders.get(kind)
+        if loader is None:
+            return
+        try:
+            jobs = await loader(until)
+        except Exception as e:
+            logger.error(f"Falha ao carregar trabalhos '{kind}': {e}")
+            return
+
+        for due, key in jobs:
+            if (kind, key) not in self._due and (kind, key) not in self._inflight:
+                self._due[(kind, key)] = due
+                heapq.heappush(self._heap, (due, next(self._counter), kind, key))
+        self._wakeup.set()
+
+    async def _refill(self):
+        until = datetime.utcnow() + self.horizon
+        # O novo horizonte vale já: um trabalho criado enquanto os loaders correm pode
+        # ter escapado ao SELECT do seu tipo, e é o schedule() que o põe no heap
+        # (se o loader também o trouxer, o _load ignora o repetido)
+        self._loaded_until = until
+        self._refill_at = until - self.horizon / 4
+        for kind in list(self._loaders):
+            await self._load(kind, until)
+
+    def _dispatch(self, kind: str, key: int):
+        handler = self._handlers.get(kind)
+        if handler is None:
+            return
+
+        async def run():
+            try:
+                await handler(key)
+            except Exception as e:
+                logger.error(f"Erro no trabalho '{kind}' #{key}: {e}")
+            finally:
+                self._inflight.discard((kind, key))
+
+        self._inflight.add((kind, key))
+
+        task = asyncio.create_task(run())
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self):
+        while True:
+            now = datetime.utcnow()
+            if self._refill_at is None or now >= self._refill_at:
+                await self._refill()
+                now = datetime.utcnow()
+
+            # Executa tudo o que já venceu
+            while self._heap and self._heap[0][0] <= now:
+                due, _, kind, key = heapq.heappop(self._heap)
+                if self._due.get((kind, key)) != due:
+                    continue # Cancelado ou reagendado
+                del self._due[(kind, key)]
+                self._dispatch(kind, key)
+
+            # Dorme até ao próximo vencimento ou à próxima leitura do horizonte
+            wake_at = min(self._heap[0][0], self._refill_at) if self._heap else self._refill_at
+            timeout = max((wake_at - datetime.utcnow()).total_seconds(), 0)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Agendador ativo (horizonte de {int(self.horizon.total_seconds())}s).")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
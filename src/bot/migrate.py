@@ -0,0 +1,46 @@
+"""
+Aplica as migrações de esquema pendentes e mostra o registo (tabela schema_migrations).
+Substitui o antigo reset_db.py: o banco nunca precisa de ser apagado para ganhar colunas ou índices.
+
+Uso (na raiz do projeto):
+    python src/bot/migrate.py            # aplica as pendentes e mostra o estado
+    python src/bot/migrate.py --status   # só mostra o estado
+"""
+import os
+import sys
+import asyncio
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import select
+from bot.core.database import engine, init_db
+from bot.core.migrations import MIGRATIONS, LOG_TABLE
+import bot.models
+
+async def show_status():
+    async with engine.connect() as conn:
+        applied = {row.version: row for row in (await conn.execute(select(LOG_TABLE))).all()}
+
+    for m in sorted(MIGRATIONS, key=lambda m: m.version):
+        row = applied.get(m.version)
+        if row is None:
+            print(f"⏳ {m.version:>3}  {m.name}")
+        elif row.finished_at is None:
+            print(f"⚠️ {m.version:>3}  {m.name} (interrompida no backfill {row.step}, chave {row.cursor})")
+        else:
+            print(f"✅ {m.version:>3}  {m.name} ({row.finished_at:%Y-%m-%d %H:%M}, {row.duration_ms} ms, {row.rows} linhas)")
+
+async def main(status_only: bool):
+    try:
+        if not status_only:
+            await init_db()
+        await show_status()
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrações de esquema do DreamClubBot.")
+    parser.add_argument("--status", action="store_true", help="Só mostra o estado, sem aplicar nada")
+    args = parser.parse_args()
+    asyncio.run(main(args.status))
@@ -2,6 +2,7 @@
 # Este arquivo é a "lista de chamada" para a criação do banco de dados.
 
 from bot.models.user import User
+from bot.models.guild_member import GuildMember
 from bot.models.goal import Goal
 from bot.models.journal import JournalEntry
 from bot.models.shop import ShopItem
@@ -12,11 +13,11 @@ from bot.models.tribe import Tribe, TribeMember
 from bot.models.mentorship import Mentorship
 from bot.models.guild_config import GuildConfig
 from bot.models.ticket import Ticket
-from bot.models.giveaway import Giveaway
+from bot.models.giveaway import Giveaway, GiveawayEntry
 from bot.models.reaction_role import ReactionRole
 from bot.models.reminder import Reminder
 from bot.models.suggestion import Suggestion
-from bot.models.poll import Poll
+from bot.models.poll import Poll, PollVote
 from bot.models.event import Event, EventParticipant
 from bot.models.birthday import Birthday
 from bot.models.starboard import StarboardConfig, StarboardEntry
@@ -28,4 +29,8 @@ from bot.models.feed import NewsFeed
 from bot.models.level_reward import LevelReward
 from bot.models.tag import Tag
 from bot.models.confession import Confession
-from bot.models.notification_config import NotificationConfig
\ No newline at end of file
+from bot.models.notification_config import NotificationConfig
+from bot.models.cache_invalidation import CacheInvalidation
+from bot.models.automod import AutoModConfig, AutoModWord
+from bot.models.focus import FocusSession
+from bot.models.schema_migration import SchemaMigration
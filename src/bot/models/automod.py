@@ -0,0 +1,43 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column, UniqueConstraint
+
+class AutoModConfig(SQLModel, table=True):
+    """
+    Regras do AutoMod por servidor.
+    """
+    __tablename__ = "automod_configs"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    guild_id: int = Field(sa_column=Column(BigInteger, unique=True, index=True))
+
+    # Regras ligadas/desligadas
+    block_invites: bool = Field(default=True)
+    block_words: bool = Field(default=True)
+    block_caps: bool = Field(default=True)
+    block_mentions: bool = Field(default=True)
+    block_duplicates: bool = Field(default=True)
+    block_flood: bool = Field(default=True, description="Rajadas de mensagens e tempestades de menções")
+
+    # Limites
+    caps_min_length: int = Field(default=12, description="Nº mínimo de letras para avaliar as maiúsculas")
+    caps_ratio: float = Field(default=0.7, description="Fração de maiúsculas a partir da qual a mensagem é apagada")
+    mention_limit: int = Field(default=5, description="Menções (membros + cargos) permitidas por mensagem")
+    duplicate_limit: int = Field(default=3, description="Repetições da mesma mensagem permitidas na janela")
+    duplicate_window: int = Field(default=30, description="Janela (s) das mensagens repetidas")
+
+    # Incrementado sempre que a lista de palavras muda (chave da cache do filtro compilado)
+    words_version: int = Field(default=0)
+
+class AutoModWord(SQLModel, table=True):
+    """
+    Termo bloqueado num servidor.
+    """
+    __tablename__ = "automod_words"
+    __table_args__ = (UniqueConstraint("guild_id", "word"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    guild_id: int = Field(sa_column=Column(BigInteger, index=True))
+    word: str = Field(max_length=100)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
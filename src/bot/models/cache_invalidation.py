@@ -0,0 +1,19 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column
+
+class CacheInvalidation(SQLModel, table=True):
+    """
+    Aviso de invalidação de cache partilhado entre processos (MAIN, MUSIC_n e Web).
+    Cada escrita publica uma linha; os outros processos leem as linhas novas periodicamente.
+    """
+    __tablename__ = "cache_invalidations"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    namespace: str = Field(description="Tipo de cache (ex: guild_config)")
+    key: int = Field(sa_column=Column(BigInteger)) # Chave invalidada (ex: ID do servidor)
+    origin: str = Field(description="Processo que publicou a invalidação")
+
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -0,0 +1,23 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column
+
+class FocusSession(SQLModel, table=True):
+    """
+    Sessão de foco (Pomodoro) em curso ou terminada.
+    Fica no banco para o temporizador sobreviver a um reinício do bot.
+    """
+    __tablename__ = "focus_sessions"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    user_id: int = Field(sa_column=Column(BigInteger, index=True))
+    channel_id: Optional[int] = Field(default=None, sa_column=Column(BigInteger)) # Alternativa se a DM estiver fechada
+
+    minutes: int = Field(description="Duração pedida")
+    xp_reward: int = Field(description="XP entregue no fim")
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    ends_at: datetime = Field(description="Quando a sessão termina")
+
+    active: bool = Field(default=True)
@@ -1,7 +1,7 @@
 from typing import Optional
 from datetime import datetime
 from sqlmodel import SQLModel, Field
-from sqlalchemy import BigInteger, Column
+from sqlalchemy import BigInteger, Column, UniqueConstraint
 
 class Giveaway(SQLModel, table=True):
     """
@@ -19,4 +19,17 @@ class Giveaway(SQLModel, table=True):
     winners_count: int = Field(default=1, description="Número de vencedores")
     
     end_time: datetime = Field(description="Data/Hora de término")
-    active: bool = Field(default=True)
\ No newline at end of file
+    active: bool = Field(default=True)
+
+class GiveawayEntry(SQLModel, table=True):
+    """
+    Participação num sorteio, registada no momento da inscrição (reação ou botão).
+    """
+    __tablename__ = "giveaway_entries"
+    __table_args__ = (UniqueConstraint("giveaway_id", "user_id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    giveaway_id: int = Field(foreign_key="giveaways.id")
+    user_id: int = Field(sa_column=Column(BigInteger))
+
+    won: bool = Field(default=False, description="Já foi sorteado (não volta a sair num reroll)")
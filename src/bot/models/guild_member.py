@@ -0,0 +1,15 @@
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column
+
+class GuildMember(SQLModel, table=True):
+    """
+    Projeção de quem está em cada servidor (a tabela `users` é global).
+    Mantida pelos eventos de entrada/saída e acertada com a cache do Discord no arranque;
+    serve os rankings por servidor.
+    """
+    __tablename__ = "guild_members"
+
+    guild_id: int = Field(sa_column=Column(BigInteger, primary_key=True))
+    user_id: int = Field(sa_column=Column(BigInteger, primary_key=True))
+    joined_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,7 +1,7 @@
 from typing import Optional
 from datetime import datetime
 from sqlmodel import SQLModel, Field
-from sqlalchemy import BigInteger, Column
+from sqlalchemy import BigInteger, Column, UniqueConstraint
 
 class Poll(SQLModel, table=True):
     """
@@ -18,6 +18,20 @@ class Poll(SQLModel, table=True):
     
     question: str = Field(description="A pergunta da enquete")
     options: str = Field(description="Opções separadas por |") # Ex: "Opção A|Opção B|Opção C"
+    multi_choice: bool = Field(default=False, description="Permite votar em várias opções")
     
     active: bool = Field(default=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class PollVote(SQLModel, table=True):
+    """
+    Um voto numa opção de uma enquete. Em enquetes de escolha única cada
+    utilizador tem no máximo uma linha; nas de escolha múltipla, uma por opção.
+    """
+    __tablename__ = "poll_votes"
+    __table_args__ = (UniqueConstraint("poll_id", "user_id", "option"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    poll_id: int = Field(foreign_key="polls.id")
+    user_id: int = Field(sa_column=Column(BigInteger))
+    option: int = Field(description="Índice da opção (0 = primeira)")
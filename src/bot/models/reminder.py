@@ -16,6 +16,10 @@ class Reminder(SQLModel, table=True):
     
     message: str = Field(description="A mensagem do lembrete")
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    due_at: datetime = Field(description="Quando o lembrete deve disparar")
+    due_at: datetime = Field(description="Quando o lembrete deve disparar (nos recorrentes, o próximo disparo)")
+
+    # Recorrência (None = lembrete único)
+    cron: Optional[str] = Field(default=None, max_length=100, description="Agenda cron (minuto hora dia mês dia-da-semana)")
+    timezone: Optional[str] = Field(default=None, max_length=64, description="Fuso horário IANA em que a agenda é lida")
     
     active: bool = Field(default=True)
\ No newline at end of file
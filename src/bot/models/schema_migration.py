@@ -0,0 +1,23 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+from sqlalchemy import BigInteger, Column
+
+class SchemaMigration(SQLModel, table=True):
+    """
+    Registo das migrações de esquema aplicadas (ver bot.core.migrations).
+    Uma linha sem `finished_at` é uma migração interrompida: é retomada no próximo arranque.
+    """
+    __tablename__ = "schema_migrations"
+
+    version: int = Field(primary_key=True)
+    name: str = Field(description="Descrição curta da migração")
+
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = Field(default=None)
+    duration_ms: Optional[int] = Field(default=None)
+
+    # Progresso dos backfills em lote (para retomar depois de uma falha ou reinício)
+    step: int = Field(default=0, description="Backfill em curso dentro da migração")
+    cursor: Optional[int] = Field(default=None, sa_column=Column(BigInteger)) # Última chave já processada
+    rows: int = Field(default=0, description="Linhas atualizadas pelos backfills")
@@ -2,6 +2,7 @@ from typing import Optional
 from datetime import datetime
 from sqlmodel import SQLModel, Field
 from sqlalchemy import BigInteger, Column
+from bot.utils.progression import xp_for_next
 
 class User(SQLModel, table=True):
     """
@@ -12,8 +13,9 @@ class User(SQLModel, table=True):
     id: int = Field(default=None, sa_column=Column(BigInteger, primary_key=True))
     
     # Nível (Maturidade)
-    xp_maturidade: int = Field(default=0, description="XP acumulado de maturidade")
+    xp_maturidade: int = Field(default=0, description="XP dentro do nível atual")
     nivel: int = Field(default=1, description="Nível atual de evolução")
+    xp_total: int = Field(default=0, description="XP acumulado desde o início (define o nível)")
     
     # Economia (DreamCoins)
     dream_coins: int = Field(default=0, description="Saldo em DreamCoins (DC$)")
@@ -25,4 +27,4 @@ class User(SQLModel, table=True):
 
     @property
     def proximo_nivel_xp(self) -> int:
-        return self.nivel * 100
\ No newline at end of file
+        return xp_for_next(self.nivel)
\ No newline at end of file
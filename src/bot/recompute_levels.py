@@ -0,0 +1,85 @@
+"""
+Recalcula `nivel` e `xp_maturidade` de todos os utilizadores a partir de `xp_total`,
+com a curva atual (LEVEL_XP_BASE). Usar depois de mudar a curva ou para reparar níveis.
+
+A tabela é lida por ordem de id em lotes (MIGRATION_BATCH_SIZE), cada lote é
+calculado de uma vez (vetorizado com NumPy, se estiver instalado) e só as linhas
+que mudam são gravadas. Correr com o bot desligado, para o ledger não gravar
+incrementos calculados com a curva antiga.
+
+Uso (na raiz do projeto):
+    python src/bot/recompute_levels.py            # aplica
+    python src/bot/recompute_levels.py --dry-run  # só conta o que mudaria
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import bindparam, select, update
+from bot.config import settings
+from bot.core.database import engine
+from bot.models.user import User
+from bot.utils.progression import np, split_many
+import bot.models
+
+async def recompute(dry_run: bool) -> tuple[int, int]:
+    table = User.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values(nivel=bindparam("_nivel"), xp_maturidade=bindparam("_xp"))
+    )
+    seen = changed = 0
+    last_id = None
+
+    while True:
+        query = select(table.c.id, table.c.xp_total, table.c.nivel, table.c.xp_maturidade).order_by(table.c.id).limit(settings.migration_batch_size)
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+
+        async with engine.connect() as conn:
+            rows = (await conn.execute(query)).all()
+        if not rows:
+            break
+
+        ids, totals, levels, xps = zip(*rows)
+        new_levels, new_xps = split_many(totals)
+        if np is not None:
+            mask = (new_levels != np.asarray(levels)) | (new_xps != np.asarray(xps))
+            idx = np.flatnonzero(mask).tolist()
+        else:
+            idx = [i for i in range(len(rows)) if new_levels[i] != levels[i] or new_xps[i] != xps[i]]
+
+        if idx and not dry_run:
+            async with engine.begin() as conn:
+                await conn.execute(stmt, [
+                    {"_id": ids[i], "_nivel": int(new_levels[i]), "_xp": int(new_xps[i])}
+                    for i in idx
+                ])
+
+        seen += len(rows)
+        changed += len(idx)
+        last_id = ids[-1]
+
+    return seen, changed
+
+async def main(dry_run: bool):
+    start = time.perf_counter()
+    try:
+        seen, changed = await recompute(dry_run)
+    finally:
+        await engine.dispose()
+
+    engine_name = "NumPy" if np is not None else "Python puro"
+    action = "a corrigir" if dry_run else "corrigidos"
+    print(f"✅ {seen} utilizadores lidos, {changed} {action} (base {settings.level_xp_base}, {engine_name}) em {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalcula os níveis a partir do XP total.")
+    parser.add_argument("--dry-run", action="store_true", help="Não grava; só mostra quantos mudariam")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run))
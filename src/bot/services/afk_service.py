@@ -3,9 +3,32 @@ from sqlmodel import select
 from bot.models.afk import AFKStatus
 
 class AFKService:
+    # Registo em memória dos utilizadores AFK (user_id -> estado, desligado da sessão).
+    # Carregado no arranque do cog; o banco só é tocado quando alguém entra ou sai de AFK.
+    _registry: dict[int, AFKStatus] = {}
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @classmethod
+    def is_afk(cls, user_id: int) -> bool:
+        return user_id in cls._registry
+
+    @classmethod
+    def lookup(cls, user_id: int) -> AFKStatus | None:
+        """Consulta em O(1) ao registo em memória."""
+        return cls._registry.get(user_id)
+
+    async def load_registry(self) -> int:
+        """Carrega todos os estados AFK do banco para a memória. Retorna quantos são."""
+        result = await self.session.execute(select(AFKStatus))
+        registry = {}
+        for afk in result.scalars().all():
+            self.session.expunge(afk)
+            registry[afk.user_id] = afk
+        AFKService._registry = registry
+        return len(registry)
+
     async def set_afk(self, user_id: int, guild_id: int, reason: str) -> AFKStatus:
         """Define o usuário como AFK (atualiza se já existir)."""
         stmt = select(AFKStatus).where(AFKStatus.user_id == user_id)
@@ -18,13 +41,20 @@ class AFKService:
         else:
             afk = AFKStatus(user_id=user_id, guild_id=guild_id, reason=reason)
             self.session.add(afk)
-        
+
         await self.session.commit()
         await self.session.refresh(afk)
+
+        self.session.expunge(afk)
+        AFKService._registry[user_id] = afk
         return afk
 
     async def remove_afk(self, user_id: int) -> bool:
         """Remove o status AFK se existir. Retorna True se removeu."""
+        # Caminho quente: quase ninguém está AFK, por isso nem vamos ao banco
+        if user_id not in AFKService._registry:
+            return False
+
         stmt = select(AFKStatus).where(AFKStatus.user_id == user_id)
         result = await self.session.execute(stmt)
         afk = result.scalar_one_or_none()
@@ -32,11 +62,10 @@ class AFKService:
         if afk:
             await self.session.delete(afk)
             await self.session.commit()
-            return True
-        return False
+
+        AFKService._registry.pop(user_id, None)
+        return afk is not None
 
     async def get_afk_status(self, user_id: int) -> AFKStatus | None:
         """Verifica se o usuário está AFK."""
-        stmt = select(AFKStatus).where(AFKStatus.user_id == user_id)
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
\ No newline at end of file
+        return self.lookup(user_id)
@@ -0,0 +1,72 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select, delete
+from bot.core.cache import invalidation_channel
+from bot.models.automod import AutoModConfig, AutoModWord
+
+# Namespace das invalidações entre processos (ver bot.core.cache)
+AUTOMOD_NAMESPACE = "automod"
+
+class AutoModService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_config(self, guild_id: int) -> AutoModConfig:
+        stmt = select(AutoModConfig).where(AutoModConfig.guild_id == guild_id)
+        config = (await self.session.execute(stmt)).scalar_one_or_none()
+
+        if not config:
+            config = AutoModConfig(guild_id=guild_id)
+            self.session.add(config)
+            await self.session.commit()
+            await self.session.refresh(config)
+
+        return config
+
+    async def update_config(self, guild_id: int, **fields) -> AutoModConfig:
+        config = await self.get_config(guild_id)
+        for name, value in fields.items():
+            if name not in AutoModConfig.model_fields:
+                raise ValueError(f"Campo de AutoMod desconhecido: {name}")
+            setattr(config, name, value)
+
+        self.session.add(config)
+        invalidation_channel.publish(self.session, AUTOMOD_NAMESPACE, guild_id)
+        await self.session.commit()
+        await self.session.refresh(config)
+        return config
+
+    async def list_words(self, guild_id: int) -> list[str]:
+        stmt = select(AutoModWord.word).where(AutoModWord.guild_id == guild_id).order_by(AutoModWord.word)
+        return list((await self.session.execute(stmt)).scalars().all())
+
+    async def add_words(self, guild_id: int, words: list[str]) -> list[str]:
+        """Adiciona termos (em minúsculas). Retorna os que eram novos."""
+        existing = set(await self.list_words(guild_id))
+        added = []
+        for word in words:
+            word = word.strip().lower()
+            if word and word not in existing:
+                existing.add(word)
+                added.append(word)
+                self.session.add(AutoModWord(guild_id=guild_id, word=word))
+
+        if added:
+            await self._bump_version(guild_id)
+        return added
+
+    async def remove_word(self, guild_id: int, word: str) -> bool:
+        stmt = delete(AutoModWord).where(AutoModWord.guild_id == guild_id, AutoModWord.word == word.strip().lower())
+        result = await self.session.execute(stmt)
+        if not result.rowcount:
+            return False
+
+        await self._bump_version(guild_id)
+        return True
+
+    async def _bump_version(self, guild_id: int):
+        """Nova versão da lista: o filtro compilado é reconstruído em todos os processos."""
+        config = await self.get_config(guild_id)
+        config.words_version += 1
+        self.session.add(config)
+        invalidation_channel.publish(self.session, AUTOMOD_NAMESPACE, guild_id)
+        await self.session.commit()
@@ -22,39 +22,57 @@ class EventService:
         await self.session.refresh(event)
         return event
 
+    async def get_event(self, event_id: int) -> Event | None:
+        return await self.session.get(Event, event_id)
+
+    async def get_due_events(self, until: datetime, since: datetime) -> list[Event]:
+        """Eventos ativos que começam entre `since` e `until` (os muito antigos não são anunciados)."""
+        stmt = select(Event).where(
+            Event.active == True,
+            Event.start_time <= until,
+            Event.start_time >= since
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def mark_started(self, event_id: int) -> Event | None:
+        """Desativa o evento quando começa. Devolve None se já tinha sido tratado."""
+        event = await self.session.get(Event, event_id)
+        if not event or not event.active:
+            return None
+        event.active = False
+        self.session.add(event)
+        await self.session.commit()
+        return event
+
     async def get_event_by_message(self, message_id: int) -> Event | None:
         stmt = select(Event).where(Event.message_id == message_id)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def add_participant(self, event_id: int, user_id: int, status: str) -> bool:
-        """Adiciona ou atualiza a presença."""
-        # Verifica se já existe
-        stmt = select(EventParticipant).where(
-            EventParticipant.event_id == event_id,
-            EventParticipant.user_id == user_id
-        )
-        existing = (await self.session.execute(stmt)).scalar_one_or_none()
-
-        if existing:
-            if existing.status == status:
-                return False # Nada mudou
-            existing.status = status
-            self.session.add(existing)
-        else:
-            participant = EventParticipant(event_id=event_id, user_id=user_id, status=status)
-            self.session.add(participant)
-        
-        await self.session.commit()
-        return True
+    async def get_roster(self, event_id: int) -> dict[int, str]:
+        """Todas as presenças do evento numa só consulta (user_id -> status, por ordem de inscrição)."""
+        stmt = select(EventParticipant.user_id, EventParticipant.status).where(
+            EventParticipant.event_id == event_id
+        ).order_by(EventParticipant.id)
+        result = await self.session.execute(stmt)
+        return dict(result.all())
 
-    async def remove_participant(self, event_id: int, user_id: int):
-        """Remove a presença."""
-        stmt = delete(EventParticipant).where(
+    async def save_rsvps(self, event_id: int, changes: dict[int, str | None]):
+        """
+        Grava em lote as presenças alteradas (user_id -> status, ou None para remover):
+        um DELETE das linhas antigas e um INSERT das novas, na mesma transação.
+        """
+        if not changes:
+            return
+        await self.session.execute(delete(EventParticipant).where(
             EventParticipant.event_id == event_id,
-            EventParticipant.user_id == user_id
-        )
-        await self.session.execute(stmt)
+            EventParticipant.user_id.in_(list(changes))
+        ))
+        self.session.add_all([
+            EventParticipant(event_id=event_id, user_id=user_id, status=status)
+            for user_id, status in changes.items() if status is not None
+        ])
         await self.session.commit()
 
     async def get_participants(self, event_id: int, status: str) -> list[int]:
@@ -0,0 +1,50 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from bot.models.focus import FocusSession
+from datetime import datetime, timedelta
+
+class FocusService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def start_session(self, user_id: int, channel_id: int | None, minutes: int, xp_reward: int) -> FocusSession:
+        focus = FocusSession(
+            user_id=user_id,
+            channel_id=channel_id,
+            minutes=minutes,
+            xp_reward=xp_reward,
+            ends_at=datetime.utcnow() + timedelta(minutes=minutes)
+        )
+        self.session.add(focus)
+        await self.session.commit()
+        await self.session.refresh(focus)
+        return focus
+
+    async def get_active(self, user_id: int) -> FocusSession | None:
+        stmt = select(FocusSession).where(FocusSession.user_id == user_id, FocusSession.active == True)
+        return (await self.session.execute(stmt)).scalars().first()
+
+    async def get_due_sessions(self, until: datetime) -> list[FocusSession]:
+        """Sessões ativas que terminam até `until`."""
+        stmt = select(FocusSession).where(FocusSession.active == True, FocusSession.ends_at <= until)
+        return (await self.session.execute(stmt)).scalars().all()
+
+    async def finish(self, session_id: int) -> FocusSession | None:
+        """Marca a sessão como terminada. Devolve None se já não estava ativa."""
+        focus = await self.session.get(FocusSession, session_id)
+        if not focus or not focus.active:
+            return None
+        focus.active = False
+        self.session.add(focus)
+        await self.session.commit()
+        return focus
+
+    async def cancel(self, user_id: int) -> int | None:
+        """Cancela a sessão ativa do utilizador. Devolve o id cancelado."""
+        focus = await self.get_active(user_id)
+        if not focus:
+            return None
+        focus.active = False
+        self.session.add(focus)
+        await self.session.commit()
+        return focus.id
@@ -1,12 +1,28 @@
+from sqlalchemy import and_, bindparam, delete, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
-from bot.models.giveaway import Giveaway
+from bot.core.database import engine
+from bot.core.ledger import upsert_for
+from bot.models.giveaway import Giveaway, GiveawayEntry
 from datetime import datetime
 
 class GiveawayService:
+    # Sorteios ativos em memória (message_id -> giveaway_id). As reações em
+    # mensagens que não são sorteios ativos são ignoradas sem ir ao banco.
+    _active: dict[int, int] = {}
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @classmethod
+    def giveaway_for(cls, message_id: int) -> int | None:
+        return cls._active.get(message_id)
+
+    async def load_active(self) -> int:
+        stmt = select(Giveaway.message_id, Giveaway.id).where(Giveaway.active == True)
+        GiveawayService._active = dict((await self.session.execute(stmt)).all())
+        return len(GiveawayService._active)
+
     async def create_giveaway(self, guild_id: int, channel_id: int, message_id: int, prize: str, end_time: datetime, winners: int) -> Giveaway:
         gw = Giveaway(
             guild_id=guild_id,
@@ -19,6 +35,7 @@ class GiveawayService:
         )
         self.session.add(gw)
         await self.session.commit()
+        GiveawayService._active[message_id] = gw.id
         return gw
 
     async def get_active_giveaways(self) -> list[Giveaway]:
@@ -27,14 +44,68 @@ class GiveawayService:
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def get_due_giveaways(self, until: datetime) -> list[Giveaway]:
+        """Sorteios ativos que terminam até `until` (filtrado no banco)."""
+        stmt = select(Giveaway).where(Giveaway.active == True, Giveaway.end_time <= until)
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def get_giveaway(self, giveaway_id: int) -> Giveaway | None:
+        return await self.session.get(Giveaway, giveaway_id)
+
+    async def get_by_message(self, message_id: int) -> Giveaway | None:
+        stmt = select(Giveaway).where(Giveaway.message_id == message_id)
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
     async def end_giveaway(self, message_id: int):
         """Marca o sorteio como finalizado no banco."""
-        stmt = select(Giveaway).where(Giveaway.message_id == message_id)
-        result = await self.session.execute(stmt)
-        gw = result.scalar_one_or_none()
+        gw = await self.get_by_message(message_id)
         
         if gw:
             gw.active = False
             self.session.add(gw)
             await self.session.commit()
-        return gw
\ No newline at end of file
+        GiveawayService._active.pop(message_id, None)
+        return gw
+
+    # --- Inscrições ---
+    async def save_entries(self, joined: list[tuple[int, int]], left: list[tuple[int, int]]):
+        """Grava em lote as inscrições novas e as desistências (cada uma é (giveaway_id, user_id))."""
+        table = GiveawayEntry.__table__
+        if left:
+            stmt = delete(table).where(and_(
+                table.c.giveaway_id == bindparam("g"),
+                table.c.user_id == bindparam("u")
+            ))
+            await self.session.execute(stmt, [{"g": g, "u": u} for g, u in left])
+        if joined:
+            insert = upsert_for(engine.dialect.name)
+            stmt = insert(table).on_conflict_do_nothing(index_elements=["giveaway_id", "user_id"])
+            await self.session.execute(stmt, [{"giveaway_id": g, "user_id": u, "won": False} for g, u in joined])
+        await self.session.commit()
+
+    async def count_entries(self, giveaway_id: int) -> int:
+        stmt = select(func.count()).select_from(GiveawayEntry).where(GiveawayEntry.giveaway_id == giveaway_id)
+        return (await self.session.execute(stmt)).scalar_one()
+
+    async def draw_winners(self, giveaway_id: int, count: int) -> list[int]:
+        """
+        Sorteia até `count` inscritos que ainda não ganharam (amostra aleatória feita
+        no banco com ORDER BY random()) e marca-os como vencedores.
+        """
+        stmt = (
+            select(GiveawayEntry.user_id)
+            .where(GiveawayEntry.giveaway_id == giveaway_id, GiveawayEntry.won == False)
+            .order_by(func.random())
+            .limit(count)
+        )
+        winners = list((await self.session.execute(stmt)).scalars().all())
+
+        if winners:
+            await self.session.execute(
+                update(GiveawayEntry)
+                .where(GiveawayEntry.giveaway_id == giveaway_id, GiveawayEntry.user_id.in_(winners))
+                .values(won=True)
+            )
+        await self.session.commit()
+        return winners
@@ -0,0 +1,44 @@
+from datetime import datetime
+from sqlalchemy import and_, bindparam, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from bot.core.database import engine
+from bot.core.ledger import upsert_for
+from bot.models.guild_member import GuildMember
+
+class GuildMemberService:
+    # Linhas por comando nas escritas em lote (servidores grandes têm centenas de milhares de membros)
+    CHUNK = 1000
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_member_ids(self, guild_id: int) -> set[int]:
+        stmt = select(GuildMember.user_id).where(GuildMember.guild_id == guild_id)
+        return set((await self.session.execute(stmt)).scalars().all())
+
+    async def add_members(self, guild_id: int, user_ids: list[int]):
+        """Regista membros (os que já existem são ignorados)."""
+        if not user_ids:
+            return
+        insert = upsert_for(engine.dialect.name)
+        stmt = insert(GuildMember.__table__).on_conflict_do_nothing(index_elements=["guild_id", "user_id"])
+        now = datetime.utcnow()
+        for i in range(0, len(user_ids), self.CHUNK):
+            await self.session.execute(stmt, [
+                {"guild_id": guild_id, "user_id": user_id, "joined_at": now} for user_id in user_ids[i:i + self.CHUNK]
+            ])
+        await self.session.commit()
+
+    async def remove_members(self, guild_id: int, user_ids: list[int]):
+        if not user_ids:
+            return
+        table = GuildMember.__table__
+        stmt = delete(table).where(and_(table.c.guild_id == guild_id, table.c.user_id == bindparam("u")))
+        for i in range(0, len(user_ids), self.CHUNK):
+            await self.session.execute(stmt, [{"u": user_id} for user_id in user_ids[i:i + self.CHUNK]])
+        await self.session.commit()
+
+    async def remove_guild(self, guild_id: int):
+        await self.session.execute(delete(GuildMember.__table__).where(GuildMember.__table__.c.guild_id == guild_id))
+        await self.session.commit()
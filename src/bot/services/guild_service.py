@@ -1,12 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
+from bot.core.cache import guild_config_cache
 from bot.models.guild_config import GuildConfig
 
 class GuildService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_config(self, guild_id: int) -> GuildConfig:
+    async def _load(self, guild_id: int) -> GuildConfig:
+        """Busca (ou cria) a configuração diretamente no banco, ligada à sessão atual."""
         stmt = select(GuildConfig).where(GuildConfig.guild_id == guild_id)
         result = await self.session.execute(stmt)
         config = result.scalar_one_or_none()
@@ -16,47 +18,52 @@ class GuildService:
             self.session.add(config)
             await self.session.commit()
             await self.session.refresh(config)
-        
+
         return config
 
-    async def set_welcome_channel(self, guild_id: int, channel_id: int) -> GuildConfig:
-        config = await self.get_config(guild_id)
-        config.welcome_channel_id = channel_id
-        self.session.add(config)
-        await self.session.commit()
-        await self.session.refresh(config)
+    async def get_config(self, guild_id: int) -> GuildConfig:
+        """
+        Devolve a configuração do servidor, servida pela cache em memória.
+        O objeto é só de leitura: para alterar use update_config (ou os setters).
+        """
+        config = guild_config_cache.get(guild_id)
+        if config is not None:
+            return config
+
+        config = await self._load(guild_id)
+        self.session.expunge(config)
+        guild_config_cache.set(config)
         return config
 
-    async def set_autorole(self, guild_id: int, role_id: int) -> GuildConfig:
-        config = await self.get_config(guild_id)
-        config.welcome_role_id = role_id
+    async def update_config(self, guild_id: int, **fields) -> GuildConfig:
+        """Write-through: grava no banco, atualiza a cache local e avisa os outros processos."""
+        config = await self._load(guild_id)
+        for name, value in fields.items():
+            if name not in GuildConfig.model_fields:
+                raise ValueError(f"Campo de configuração desconhecido: {name}")
+            setattr(config, name, value)
+
         self.session.add(config)
+        guild_config_cache.publish(self.session, guild_id)
         await self.session.commit()
         await self.session.refresh(config)
+
+        self.session.expunge(config)
+        guild_config_cache.set(config)
         return config
 
+    async def set_welcome_channel(self, guild_id: int, channel_id: int) -> GuildConfig:
+        return await self.update_config(guild_id, welcome_channel_id=channel_id)
+
+    async def set_autorole(self, guild_id: int, role_id: int) -> GuildConfig:
+        return await self.update_config(guild_id, welcome_role_id=role_id)
+
     async def set_voice_hub(self, guild_id: int, channel_id: int, category_id: int) -> GuildConfig:
-        config = await self.get_config(guild_id)
-        config.voice_hub_id = channel_id
-        config.voice_category_id = category_id
-        self.session.add(config)
-        await self.session.commit()
-        await self.session.refresh(config)
-        return config
+        return await self.update_config(guild_id, voice_hub_id=channel_id, voice_category_id=category_id)
 
     async def set_ticket_category(self, guild_id: int, category_id: int) -> GuildConfig:
-        config = await self.get_config(guild_id)
-        config.ticket_category_id = category_id
-        self.session.add(config)
-        await self.session.commit()
-        await self.session.refresh(config)
-        return config
+        return await self.update_config(guild_id, ticket_category_id=category_id)
 
     async def set_log_channel(self, guild_id: int, channel_id: int) -> GuildConfig:
         """[NOVO] Define o canal de logs de moderação."""
-        config = await self.get_config(guild_id)
-        config.log_channel_id = channel_id
-        self.session.add(config)
-        await self.session.commit()
-        await self.session.refresh(config)
-        return config
\ No newline at end of file
+        return await self.update_config(guild_id, log_channel_id=channel_id)
@@ -1,11 +1,47 @@
+from bisect import bisect_right, insort
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from bot.models.level_reward import LevelReward
 
 class LevelService:
+    # Recompensas em memória: guild_id -> [(nível, role_id)] ordenado por nível.
+    # Carregado no arranque do cog; os cargos-alvo de um nível saem por bisect, sem I/O.
+    _table: dict[int, list[tuple[int, int]]] = {}
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @classmethod
+    def rewards_up_to(cls, guild_id: int, level: int) -> list[tuple[int, int]]:
+        """Recompensas (nível, role_id) de todos os níveis até `level`, inclusive."""
+        rewards = cls._table.get(guild_id, [])
+        return rewards[:bisect_right(rewards, (level, float("inf")))]
+
+    @classmethod
+    def reward_role_ids(cls, guild_id: int) -> set[int]:
+        return {role_id for _, role_id in cls._table.get(guild_id, [])}
+
+    @classmethod
+    def _set(cls, guild_id: int, level: int, role_id: int | None):
+        rewards = [r for r in cls._table.get(guild_id, []) if r[0] != level]
+        if role_id is not None:
+            insort(rewards, (level, role_id))
+        if rewards:
+            cls._table[guild_id] = rewards
+        else:
+            cls._table.pop(guild_id, None)
+
+    async def load_index(self) -> int:
+        """Carrega todas as recompensas para a memória. Retorna quantas são."""
+        result = await self.session.execute(select(LevelReward.guild_id, LevelReward.level_required, LevelReward.role_id))
+        table: dict[int, list[tuple[int, int]]] = {}
+        for guild_id, level, role_id in result.all():
+            table.setdefault(guild_id, []).append((level, role_id))
+        for rewards in table.values():
+            rewards.sort()
+        LevelService._table = table
+        return sum(len(rewards) for rewards in table.values())
+
     async def add_reward(self, guild_id: int, level: int, role_id: int) -> LevelReward:
         """Cria ou atualiza uma recompensa para um nível."""
         # Verifica se já existe recompensa para este nível
@@ -19,11 +55,13 @@ class LevelService:
             existing.role_id = role_id
             self.session.add(existing)
             await self.session.commit()
+            LevelService._set(guild_id, level, role_id)
             return existing
 
         reward = LevelReward(guild_id=guild_id, level_required=level, role_id=role_id)
         self.session.add(reward)
         await self.session.commit()
+        LevelService._set(guild_id, level, role_id)
         return reward
 
     async def get_rewards_for_level(self, guild_id: int, level: int) -> list[LevelReward]:
@@ -50,5 +88,6 @@ class LevelService:
         if reward:
             await self.session.delete(reward)
             await self.session.commit()
+            LevelService._set(guild_id, level, None)
             return True
         return False
\ No newline at end of file
@@ -53,10 +53,13 @@ class NetworkingService:
         return result.scalars().all()
 
     async def search_users_by_skill(self, skill: str) -> list[int]:
-        """Busca IDs de usuários que têm uma skill (busca parcial)."""
+        """Busca IDs de usuários que têm uma skill (busca pelo início do nome)."""
         skill_clean = skill.lower().strip()
-        # Usa 'contains' para achar "Python" se buscar "py"
-        stmt = select(UserSkill.user_id).where(UserSkill.skill.contains(skill_clean))
+        # Intervalo [py, py\uffff) acha "python" se buscar "py" e usa o índice de skill
+        stmt = select(UserSkill.user_id).where(
+            UserSkill.skill >= skill_clean,
+            UserSkill.skill < skill_clean + "\uffff"
+        )
         result = await self.session.execute(stmt)
         # Retorna lista única de IDs (set)
         return list(set(result.scalars().all()))
\ No newline at end of file
@@ -1,12 +1,16 @@
+from sqlalchemy import and_, bindparam, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
-from bot.models.poll import Poll
+from bot.core.database import engine
+from bot.core.ledger import upsert_for
+from bot.models.poll import Poll, PollVote
 
 class PollService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def create_poll(self, guild_id: int, channel_id: int, message_id: int, author_id: int, question: str, options: str) -> Poll:
+    async def create_poll(self, guild_id: int, channel_id: int, message_id: int, author_id: int, question: str, options: str,
+                          multi_choice: bool = False) -> Poll:
         poll = Poll(
             guild_id=guild_id,
             channel_id=channel_id,
@@ -14,6 +18,7 @@ class PollService:
             author_id=author_id,
             question=question,
             options=options,
+            multi_choice=multi_choice,
             active=True
         )
         self.session.add(poll)
@@ -25,10 +30,40 @@ class PollService:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_active_polls(self) -> list[Poll]:
+        result = await self.session.execute(select(Poll).where(Poll.active == True))
+        return result.scalars().all()
+
+    async def get_active_votes(self) -> list[tuple[int, int, int]]:
+        """(poll_id, user_id, opção) de todas as enquetes ativas, numa só consulta."""
+        stmt = (
+            select(PollVote.poll_id, PollVote.user_id, PollVote.option)
+            .join(Poll, Poll.id == PollVote.poll_id)
+            .where(Poll.active == True)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def save_votes(self, added: list[tuple[int, int, int]], removed: list[tuple[int, int, int]]):
+        """Grava em lote os votos novos e apagados (cada um é (poll_id, user_id, opção))."""
+        table = PollVote.__table__
+        if removed:
+            stmt = delete(table).where(and_(
+                table.c.poll_id == bindparam("p"),
+                table.c.user_id == bindparam("u"),
+                table.c.option == bindparam("o")
+            ))
+            await self.session.execute(stmt, [{"p": p, "u": u, "o": o} for p, u, o in removed])
+        if added:
+            insert = upsert_for(engine.dialect.name)
+            stmt = insert(table).on_conflict_do_nothing(index_elements=["poll_id", "user_id", "option"])
+            await self.session.execute(stmt, [{"poll_id": p, "user_id": u, "option": o} for p, u, o in added])
+        await self.session.commit()
+
     async def close_poll(self, message_id: int) -> Poll | None:
         poll = await self.get_active_poll(message_id)
         if poll:
             poll.active = False
             self.session.add(poll)
             await self.session.commit()
-        return poll
\ No newline at end of file
+        return poll
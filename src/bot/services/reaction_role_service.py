@@ -3,9 +3,32 @@ from sqlmodel import select
 from bot.models.reaction_role import ReactionRole
 
 class ReactionRoleService:
+    # Índice em memória message_id -> {emoji: role_id}. Carregado no arranque do cog;
+    # as reações em mensagens que não estão aqui são ignoradas sem ir ao banco.
+    _index: dict[int, dict[str, int]] = {}
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @classmethod
+    def watches(cls, message_id: int) -> bool:
+        return message_id in cls._index
+
+    @classmethod
+    def lookup(cls, message_id: int, emoji: str) -> int | None:
+        """ID do cargo ligado à reação (consulta em O(1), sem I/O)."""
+        emojis = cls._index.get(message_id)
+        return emojis.get(emoji) if emojis else None
+
+    async def load_index(self) -> int:
+        """Carrega todas as configurações do banco para a memória. Retorna quantas são."""
+        result = await self.session.execute(select(ReactionRole.message_id, ReactionRole.emoji, ReactionRole.role_id))
+        index: dict[int, dict[str, int]] = {}
+        for message_id, emoji, role_id in result.all():
+            index.setdefault(message_id, {})[emoji] = role_id
+        ReactionRoleService._index = index
+        return sum(len(emojis) for emojis in index.values())
+
     async def add_reaction_role(self, guild_id: int, channel_id: int, message_id: int, emoji: str, role_id: int) -> ReactionRole:
         """Cria um novo vínculo de Reação -> Cargo."""
         # Verifica se já existe para evitar duplicados
@@ -19,6 +42,7 @@ class ReactionRoleService:
             existing.role_id = role_id # Atualiza o cargo se já existir
             self.session.add(existing)
             await self.session.commit()
+            ReactionRoleService._index.setdefault(message_id, {})[emoji] = role_id
             return existing
 
         rr = ReactionRole(
@@ -30,6 +54,7 @@ class ReactionRoleService:
         )
         self.session.add(rr)
         await self.session.commit()
+        ReactionRoleService._index.setdefault(message_id, {})[emoji] = role_id
         return rr
 
     async def get_role_by_reaction(self, message_id: int, emoji: str) -> ReactionRole | None:
@@ -47,5 +72,10 @@ class ReactionRoleService:
         if rr:
             await self.session.delete(rr)
             await self.session.commit()
+
+            emojis = ReactionRoleService._index.get(message_id, {})
+            emojis.pop(emoji, None)
+            if not emojis:
+                ReactionRoleService._index.pop(message_id, None)
             return True
         return False
\ No newline at end of file
@@ -1,19 +1,25 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, func, update
 from sqlmodel import select
+from bot.config import settings
 from bot.models.reminder import Reminder
+from bot.utils.cron import CronError, CronSchedule, get_zone, next_fire
 from datetime import datetime
 
 class ReminderService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def create_reminder(self, user_id: int, channel_id: int, message: str, due_at: datetime) -> Reminder:
-        """Agenda um novo lembrete."""
+    async def create_reminder(self, user_id: int, channel_id: int, message: str, due_at: datetime,
+                              cron: str | None = None, timezone: str | None = None) -> Reminder:
+        """Agenda um novo lembrete (recorrente se tiver `cron`; `due_at` é então o primeiro disparo)."""
         reminder = Reminder(
             user_id=user_id,
             channel_id=channel_id,
             message=message,
             due_at=due_at,
+            cron=cron,
+            timezone=timezone,
             active=True
         )
         self.session.add(reminder)
@@ -21,16 +27,84 @@ class ReminderService:
         await self.session.refresh(reminder)
         return reminder
 
-    async def get_due_reminders(self) -> list[Reminder]:
-        """Busca lembretes ativos cuja hora já chegou."""
-        now = datetime.utcnow()
+    async def get_reminder(self, reminder_id: int) -> Reminder | None:
+        return await self.session.get(Reminder, reminder_id)
+
+    async def get_due_reminders(self, until: datetime | None = None) -> list[Reminder]:
+        """Busca lembretes ativos que vencem até `until` (por omissão, agora)."""
+        until = until or datetime.utcnow()
         stmt = select(Reminder).where(
             Reminder.active == True,
-            Reminder.due_at <= now
+            Reminder.due_at <= until
         )
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def get_active_reminders(self, reminder_ids: list[int]) -> list[Reminder]:
+        """Lembretes ainda ativos entre os IDs dados (numa só consulta)."""
+        if not reminder_ids:
+            return []
+        stmt = select(Reminder).where(Reminder.id.in_(reminder_ids), Reminder.active == True)
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def get_user_reminders(self, user_id: int) -> list[Reminder]:
+        stmt = select(Reminder).where(Reminder.user_id == user_id, Reminder.active == True).order_by(Reminder.due_at)
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def count_recurring(self, user_id: int) -> int:
+        stmt = select(func.count()).select_from(Reminder).where(
+            Reminder.user_id == user_id,
+            Reminder.active == True,
+            Reminder.cron != None
+        )
+        return (await self.session.execute(stmt)).scalar_one()
+
+    async def cancel_reminder(self, reminder_id: int, user_id: int) -> bool:
+        """Desativa um lembrete do próprio utilizador. Retorna False se não existir."""
+        reminder = await self.session.get(Reminder, reminder_id)
+        if not reminder or reminder.user_id != user_id or not reminder.active:
+            return False
+        reminder.active = False
+        self.session.add(reminder)
+        await self.session.commit()
+        return True
+
+    async def complete_reminders(self, reminder_ids: list[int]) -> dict[int, datetime]:
+        """
+        Fecha os lembretes entregues. Os únicos ficam inativos num só UPDATE ... WHERE id IN (...);
+        os recorrentes continuam na mesma linha, com `due_at` avançado para o próximo disparo.
+        Retorna {id: próximo disparo} dos recorrentes.
+        """
+        if not reminder_ids:
+            return {}
+
+        stmt = select(Reminder.id, Reminder.cron, Reminder.timezone, Reminder.due_at).where(
+            Reminder.id.in_(reminder_ids),
+            Reminder.cron != None
+        )
+        now = datetime.utcnow()
+        next_due = {}
+        for reminder_id, cron, timezone, due_at in (await self.session.execute(stmt)).all():
+            try:
+                # A partir de agora: depois de o bot estar desligado, não dispara os atrasados todos
+                schedule = CronSchedule(cron)
+                next_due[reminder_id] = next_fire(schedule, get_zone(timezone or settings.default_timezone), max(now, due_at))
+            except CronError:
+                pass # Agenda inválida: termina como um lembrete único
+
+        once = [reminder_id for reminder_id in reminder_ids if reminder_id not in next_due]
+        if once:
+            await self.session.execute(update(Reminder).where(Reminder.id.in_(once)).values(active=False))
+        if next_due:
+            table = Reminder.__table__
+            stmt = update(table).where(table.c.id == bindparam("reminder_id")).values(due_at=bindparam("next_due"))
+            await self.session.execute(stmt, [{"reminder_id": k, "next_due": v} for k, v in next_due.items()])
+
+        await self.session.commit()
+        return next_due
+
     async def complete_reminder(self, reminder_id: int):
         """Marca como entregue (inativo)."""
         reminder = await self.session.get(Reminder, reminder_id)
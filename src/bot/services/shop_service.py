@@ -2,6 +2,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from bot.models.shop import ShopItem
 from bot.models.user import User
+from bot.core.ledger import user_ledger
+from bot.services.user_service import UserService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,23 +29,15 @@ class ShopService:
         if not item:
             return False, "Item não encontrado.", None
 
-        # 2. Busca o Usuário
-        # Nota: Usamos get_or_create indiretamente via consulta, 
-        # mas idealmente o UserService deveria ser injetado ou usado.
-        # Aqui fazemos a query direta para simplificar neste contexto de service.
-        result = await self.session.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
+        # 2. Débito atómico (UPDATE ... WHERE dream_coins >= preço)
+        users = UserService(self.session)
+        if await users.try_debit(user_id, item.price) is not None:
+            return True, "Compra realizada com sucesso!", item
 
+        # 3. Falhou: só agora lemos o perfil, para explicar o motivo
+        user = await self.session.get(User, user_id)
         if not user:
             return False, "Perfil não encontrado. Use o bot primeiro!", None
 
-        # 3. Verifica Saldo (DreamCoins)
-        if user.dream_coins < item.price:
-            return False, f"Saldo insuficiente. Precisas de DC$ {item.price}, tens DC$ {user.dream_coins}.", item
-
-        # 4. Deduz as Moedas (Transação)
-        user.dream_coins -= item.price
-        self.session.add(user)
-        await self.session.commit()
-        
-        return True, "Compra realizada com sucesso!", item
\ No newline at end of file
+        user = user_ledger.view(user)
+        return False, f"Saldo insuficiente. Precisas de DC$ {item.price}, tens DC$ {user.dream_coins}.", item
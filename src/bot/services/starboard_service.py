@@ -1,11 +1,40 @@
+from sqlalchemy import bindparam, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from bot.models.starboard import StarboardConfig, StarboardEntry
 
 class StarboardService:
+    # Configurações por servidor e mapa mensagem original -> mensagem no quadro, em memória.
+    # Carregados no arranque do cog; as estrelas de servidores sem starboard não tocam no banco.
+    _configs: dict[int, StarboardConfig] = {}
+    _posts: dict[int, int] = {}
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    @classmethod
+    def config_for(cls, guild_id: int) -> StarboardConfig | None:
+        return cls._configs.get(guild_id)
+
+    @classmethod
+    def post_for(cls, original_message_id: int) -> int | None:
+        """ID da mensagem no quadro, se a original já lá estiver."""
+        return cls._posts.get(original_message_id)
+
+    async def load_cache(self) -> tuple[int, int]:
+        """Carrega as configurações e as entradas para a memória. Retorna (configs, entradas)."""
+        configs = {}
+        for config in (await self.session.execute(select(StarboardConfig))).scalars().all():
+            self.session.expunge(config)
+            configs[config.guild_id] = config
+
+        stmt = select(StarboardEntry.original_message_id, StarboardEntry.starboard_message_id)
+        posts = dict((await self.session.execute(stmt)).all())
+
+        StarboardService._configs = configs
+        StarboardService._posts = posts
+        return len(configs), len(posts)
+
     async def get_config(self, guild_id: int) -> StarboardConfig | None:
         stmt = select(StarboardConfig).where(StarboardConfig.guild_id == guild_id)
         result = await self.session.execute(stmt)
@@ -22,6 +51,9 @@ class StarboardService:
         self.session.add(config)
         await self.session.commit()
         await self.session.refresh(config)
+
+        self.session.expunge(config)
+        StarboardService._configs[guild_id] = config
         return config
 
     async def get_entry(self, original_message_id: int) -> StarboardEntry | None:
@@ -38,8 +70,17 @@ class StarboardService:
         )
         self.session.add(entry)
         await self.session.commit()
+        StarboardService._posts[original_id] = starboard_id
 
-    async def update_stars(self, entry: StarboardEntry, stars: int):
-        entry.stars = stars
-        self.session.add(entry)
-        await self.session.commit()
\ No newline at end of file
+    async def save_stars(self, stars: dict[int, int]):
+        """Grava as contagens de várias entradas num só UPDATE em lote (original_message_id -> estrelas)."""
+        if not stars:
+            return
+        table = StarboardEntry.__table__
+        stmt = (
+            update(table)
+            .where(table.c.original_message_id == bindparam("original_id"))
+            .values(stars=bindparam("new_stars"))
+        )
+        await self.session.execute(stmt, [{"original_id": k, "new_stars": v} for k, v in stars.items()])
+        await self.session.commit()
@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update
 from sqlmodel import select, func
 from bot.models.tribe import Tribe, TribeMember
 from bot.models.user import User
+from bot.core.ledger import user_ledger
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,21 +42,28 @@ class TribeService:
         if (await self.session.execute(stmt_name)).first():
             return False, "Já existe uma tribo com esse nome.", None
 
-        # 3. Verifica XP do Líder (Custo: 1000 XP)
+        # 3. Debita o XP do Líder (Custo: 1000 XP), de forma atómica
         COST = 1000
-        stmt_user = select(User).where(User.id == user_id)
-        user = (await self.session.execute(stmt_user)).scalar_one_or_none()
-        
-        if not user or user.xp_maturidade < COST:
-            return False, f"XP Insuficiente. Precisas de {COST} XP para fundar uma tribo.", None
-
-        # 4. Processa Criação
+        # O XP ainda no ledger entra na mesma transação, para contar no saldo
+        pending = user_ledger.take_column(user_id, "xp_total")
         try:
-            # Deduz XP
-            user.xp_maturidade -= COST
-            self.session.add(user)
+            if pending:
+                await user_ledger.write(self.session, {user_id: {"xp_total": pending}})
+            table = User.__table__
+            result = await self.session.execute(
+                update(table)
+                .where(table.c.id == user_id, table.c.xp_maturidade >= COST)
+                .values(xp_total=table.c.xp_total - COST)
+                .returning(table.c.xp_total)
+            )
+            total = result.scalar_one_or_none()
+            if total is None:
+                await self.session.rollback()
+                user_ledger.restore(user_id, {"xp_total": pending})
+                return False, f"XP Insuficiente. Precisas de {COST} XP para fundar uma tribo.", None
+            await user_ledger.write_levels(self.session, {user_id: total})
 
-            # Cria Tribo
+            # 4. Cria Tribo
             new_tribe = Tribe(name=name, description=description, leader_id=user_id)
             self.session.add(new_tribe)
             await self.session.flush() # Para gerar o ID da tribo
@@ -64,9 +73,11 @@ class TribeService:
             self.session.add(member)
 
             await self.session.commit()
+            user_ledger.notify({user_id: {"xp_total": pending - COST}})
             return True, "Tribo fundada com sucesso!", new_tribe
         except Exception as e:
             await self.session.rollback()
+            user_ledger.restore(user_id, {"xp_total": pending})
             logger.error(f"Erro ao criar tribo: {e}")
             return False, "Erro interno ao criar tribo.", None
 
@@ -1,6 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select, desc
+from sqlmodel import select, desc, update
 from bot.models.user import User
+from bot.models.guild_member import GuildMember
+from bot.core.ledger import user_ledger
+from bot.core.leaderboard import leaderboards
+from bot.utils.progression import level_for
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,46 +25,114 @@ class UserService:
         
         return user
 
+    async def _fetch(self, user_id: int) -> User:
+        """Lê o utilizador sem o criar (um utilizador novo é devolvido com os valores padrão)."""
+        user = await self.session.get(User, user_id)
+        return user if user is not None else User(id=user_id)
+
+    async def preload(self, user_ids: list[int], chunk: int = 500):
+        """Lê vários utilizadores em poucas consultas; os get() seguintes saem da identity map."""
+        for i in range(0, len(user_ids), chunk):
+            await self.session.execute(select(User).where(User.id.in_(user_ids[i:i + chunk])))
+
+    async def get_levels(self, user_ids: list[int], chunk: int = 500) -> dict[int, int]:
+        """Nível de vários utilizadores (com o XP pendente); quem não existe fica de fora."""
+        levels = {}
+        for i in range(0, len(user_ids), chunk):
+            result = await self.session.execute(select(User.id, User.xp_total).where(User.id.in_(user_ids[i:i + chunk])))
+            for user_id, total in result.all():
+                levels[user_id] = level_for(total + user_ledger.pending(user_id).get("xp_total", 0))
+        return levels
+
     # --- XP (Maturidade) ---
-    async def add_xp(self, user_id: int, amount: int) -> bool:
-        """Adiciona XP. Retorna True se subiu de nível."""
-        user = await self.get_or_create_user(user_id)
-        user.xp_maturidade += amount
-        
-        leveled_up = False
-        xp_needed = user.proximo_nivel_xp
+    async def add_xp(self, user_id: int, amount: int) -> list[int]:
+        """
+        Adiciona XP (gravado em lote pelo ledger).
+        Retorna todos os níveis alcançados, por ordem (lista vazia se não subiu).
+        """
+        # Só o xp_total é incremento; o nível sai dele (aqui e ao gravar)
+        before = user_ledger.view(await self._fetch(user_id)).xp_total
+        total = max(before + amount, 0)
+        nivel = level_for(total)
 
-        if user.xp_maturidade >= xp_needed:
-            user.xp_maturidade -= xp_needed
-            user.nivel += 1
-            leveled_up = True
-            logger.info(f"Utilizador {user_id} subiu para o nível {user.nivel}")
+        levels = list(range(level_for(before) + 1, nivel + 1))
+        if levels:
+            logger.info(f"Utilizador {user_id} subiu para o nível {nivel}")
 
-        await self.session.commit()
-        return leveled_up
+        user_ledger.add(user_id, xp_total=total - before)
+        return levels
 
     # --- DreamCoins ---
     async def add_coins(self, user_id: int, amount: int) -> int:
-        user = await self.get_or_create_user(user_id)
-        user.dream_coins += amount
-        await self.session.commit()
-        return user.dream_coins
+        user = user_ledger.view(await self._fetch(user_id))
+        user_ledger.add(user_id, dream_coins=amount)
+        return user.dream_coins + amount
+
+    def _debit_statement(self, user_id: int, amount: int):
+        """UPDATE condicional: só debita se o saldo chegar."""
+        table = User.__table__
+        return (
+            update(table)
+            .where(table.c.id == user_id, table.c.dream_coins >= amount)
+            .values(dream_coins=table.c.dream_coins - amount)
+            .returning(table.c.dream_coins)
+        )
+
+    async def _debit(self, user_id: int, amount: int, credit: int) -> int | None:
+        """Grava o crédito pendente e debita, na transação em curso. Novo saldo ou None."""
+        if credit:
+            # Upsert antes do UPDATE: quem ainda não tem linha em `users` (só crédito
+            # no ledger) também pode gastar
+            await user_ledger.write(self.session, {user_id: {"dream_coins": credit}})
+        result = await self.session.execute(self._debit_statement(user_id, amount))
+        return result.scalar_one_or_none()
+
+    async def try_debit(self, user_id: int, amount: int) -> int | None:
+        """
+        Debita de forma atómica, num único UPDATE ... RETURNING.
+        Devolve o novo saldo, ou None se o saldo não chegar.
+        """
+        # O crédito ainda no ledger entra na mesma transação, para não ser ignorado
+        credit = user_ledger.take_column(user_id, "dream_coins")
+        try:
+            balance = await self._debit(user_id, amount, credit)
+            if balance is None:
+                await self.session.rollback()
+                user_ledger.restore(user_id, {"dream_coins": credit})
+                return None
+            await self.session.commit()
+            user_ledger.notify({user_id: {"dream_coins": credit - amount}})
+            return balance
+        except Exception:
+            await self.session.rollback()
+            user_ledger.restore(user_id, {"dream_coins": credit})
+            raise
 
     async def remove_coins(self, user_id: int, amount: int) -> bool:
-        user = await self.get_or_create_user(user_id)
-        if user.dream_coins < amount: return False
-        user.dream_coins -= amount
-        await self.session.commit()
-        return True
+        return await self.try_debit(user_id, amount) is not None
 
     async def transfer_coins(self, sender_id: int, receiver_id: int, amount: int) -> bool:
-        sender = await self.get_or_create_user(sender_id)
-        if sender.dream_coins < amount: return False
-        receiver = await self.get_or_create_user(receiver_id)
-        sender.dream_coins -= amount
-        receiver.dream_coins += amount
-        await self.session.commit()
-        return True
+        """Transferência numa só transação; as linhas são escritas por ordem de id (ordem de lock fixa)."""
+        if sender_id == receiver_id or amount <= 0:
+            return False
+
+        credit = user_ledger.take_column(sender_id, "dream_coins")
+        try:
+            for user_id in sorted((sender_id, receiver_id)):
+                if user_id == sender_id:
+                    if await self._debit(sender_id, amount, credit) is None:
+                        await self.session.rollback()
+                        user_ledger.restore(sender_id, {"dream_coins": credit})
+                        return False
+                else:
+                    await user_ledger.write(self.session, {receiver_id: {"dream_coins": amount}})
+            await self.session.commit()
+            user_ledger.notify({sender_id: {"dream_coins": credit - amount}, receiver_id: {"dream_coins": amount}})
+            return True
+        except Exception:
+            await self.session.rollback()
+            user_ledger.restore(sender_id, {"dream_coins": credit})
+            raise
 
     # --- Utilitários ---
     async def update_bio(self, user_id: int, new_bio: str) -> User:
@@ -70,14 +142,32 @@ class UserService:
         return user
 
     async def get_profile(self, user_id: int) -> User:
-        return await self.get_or_create_user(user_id)
+        """Perfil com os prémios ainda por gravar já somados (cópia só de leitura)."""
+        return user_ledger.view(await self.get_or_create_user(user_id))
 
-    async def get_leaderboard(self, limit: int = 10) -> list[User]:
-        statement = select(User).order_by(desc(User.nivel), desc(User.xp_maturidade)).limit(limit)
+    async def _ranked(self, entries: list[tuple[int, int]]) -> list[User]:
+        """Utilizadores das entradas de um ranking, pela mesma ordem (leitura por chave primária)."""
+        if not entries:
+            return []
+        ids = [user_id for user_id, _ in entries]
+        result = await self.session.execute(select(User).where(User.id.in_(ids)))
+        users = {user.id: user_ledger.view(user) for user in result.scalars().all()}
+        return [users[user_id] for user_id in ids if user_id in users]
+
+    async def get_leaderboard(self, limit: int = 10, offset: int = 0, guild_id: int | None = None) -> list[User]:
+        """Ranking de XP global ou, com `guild_id`, só dos membros desse servidor."""
+        if leaderboards.loaded:
+            board = leaderboards.xp if guild_id is None else leaderboards.guild(guild_id)
+            return await self._ranked(board.page(offset, limit))
+        statement = select(User).order_by(desc(User.xp_total), User.id).offset(offset).limit(limit)
+        if guild_id is not None:
+            statement = statement.join(GuildMember, GuildMember.user_id == User.id).where(GuildMember.guild_id == guild_id)
         result = await self.session.execute(statement)
         return result.scalars().all()
     
-    async def get_rich_list(self, limit: int = 10) -> list[User]:
-        statement = select(User).order_by(desc(User.dream_coins)).limit(limit)
+    async def get_rich_list(self, limit: int = 10, offset: int = 0) -> list[User]:
+        if leaderboards.loaded:
+            return await self._ranked(leaderboards.coins.page(offset, limit))
+        statement = select(User).order_by(desc(User.dream_coins), User.id).offset(offset).limit(limit)
         result = await self.session.execute(statement)
-        return result.scalars().all()
\ No newline at end of file
+        return result.scalars().all()
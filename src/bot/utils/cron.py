@@ -0,0 +1,159 @@
+"""
+Agendas recorrentes: expressões cron de 5 campos (minuto hora dia mês dia-da-semana)
+e atalhos em português ("dias úteis 08:00", "seg,qua 19:30", "todos os dias 07:00").
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+class CronError(ValueError):
+    pass
+
+WEEKDAYS = {
+    "dom": 0, "seg": 1, "ter": 2, "qua": 3, "qui": 4, "sex": 5, "sab": 6, "sáb": 6,
+    "sun": 0, "mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6,
+}
+MONTHS = {
+    "jan": 1, "fev": 2, "mar": 3, "abr": 4, "mai": 5, "jun": 6,
+    "jul": 7, "ago": 8, "set": 9, "out": 10, "nov": 11, "dez": 12,
+}
+
+# (mínimo, máximo, nomes) de cada campo; no dia da semana, 7 também é domingo
+FIELDS = (
+    (0, 59, {}),
+    (0, 23, {}),
+    (1, 31, {}),
+    (1, 12, MONTHS),
+    (0, 7, WEEKDAYS),
+)
+
+def _parse_field(text: str, low: int, high: int, names: dict[str, int]) -> frozenset[int]:
+    def value(token: str) -> int:
+        token = token.lower()
+        if token in names:
+            return names[token]
+        if not token.isdigit():
+            raise CronError(f"valor inválido: '{token}'")
+        return int(token)
+
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            if not step_text.isdigit() or int(step_text) < 1:
+                raise CronError(f"passo inválido: '{step_text}'")
+            step = int(step_text)
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (value(v) for v in part.split("-", 1))
+        else:
+            start = value(part)
+            end = high if step > 1 else start
+
+        if not low <= start <= end <= high:
+            raise CronError(f"fora do intervalo {low}-{high}: '{part}'")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+class CronSchedule:
+    """Expressão cron já interpretada; calcula o próximo disparo saltando campo a campo."""
+    __slots__ = ("expression", "minutes", "hours", "days", "months", "weekdays", "any_day", "any_weekday")
+
+    # Sem disparo dentro deste prazo, a expressão é considerada impossível (ex: 30 de fevereiro)
+    MAX_YEARS = 5
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise CronError("a expressão cron precisa de 5 campos: minuto hora dia mês dia-da-semana")
+
+        self.expression = " ".join(parts)
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_field(part, low, high, names) for part, (low, high, names) in zip(parts, FIELDS)
+        )
+        self.weekdays = frozenset(d % 7 for d in weekdays)
+        self.any_day = parts[2] == "*"
+        self.any_weekday = parts[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_days = moment.day in self.days
+        in_weekdays = (moment.weekday() + 1) % 7 in self.weekdays # cron: domingo = 0
+        # Como no cron clássico: com dia do mês e dia da semana restritos, basta um deles
+        if not self.any_day and not self.any_weekday:
+            return in_days or in_weekdays
+        return in_days and in_weekdays
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Próximo instante (hora local, sem fuso) estritamente depois de `moment`."""
+        t = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment.year + self.MAX_YEARS
+
+        while t.year <= limit:
+            if t.month not in self.months:
+                year, month = (t.year + 1, 1) if t.month == 12 else (t.year, t.month + 1)
+                t = t.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(t):
+                t = (t + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if t.hour not in self.hours:
+                t = (t + timedelta(hours=1)).replace(minute=0)
+                continue
+            minute = next((m for m in sorted(self.minutes) if m >= t.minute), None)
+            if minute is None:
+                t = (t + timedelta(hours=1)).replace(minute=0)
+                continue
+            return t.replace(minute=minute)
+
+        raise CronError("a expressão nunca dispara")
+
+def get_zone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise CronError(f"fuso horário desconhecido: '{name}'")
+
+def next_fire(schedule: CronSchedule, zone: ZoneInfo, after: datetime) -> datetime:
+    """Próximo disparo em UTC (sem fuso, como o resto do banco) depois de `after` (UTC)."""
+    local = after.replace(tzinfo=timezone.utc).astimezone(zone).replace(tzinfo=None)
+    while True:
+        local = schedule.next_after(local)
+        fire = local.replace(tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+        # Na mudança de hora, a mesma hora local pode cair antes de `after`
+        if fire > after:
+            return fire
+
+_SHORTCUT = re.compile(r"^(?P<days>.+?)\s+(?:(?:às|as)\s+)?(?P<hour>\d{1,2})(?:[:h](?P<minute>\d{2}))?h?$")
+
+_DAY_ALIASES = {
+    "todos os dias": "*", "todo dia": "*", "todo o dia": "*", "diario": "*", "diário": "*", "diariamente": "*",
+    "dias uteis": "1-5", "dias úteis": "1-5", "dia util": "1-5", "dia útil": "1-5",
+    "fim de semana": "0,6", "fins de semana": "0,6",
+}
+
+def parse_schedule(text: str) -> CronSchedule:
+    """Aceita uma expressão cron ou um atalho ('dias úteis 08:00', 'seg,qua,sex 18h30')."""
+    text = " ".join(text.strip().lower().split())
+    match = _SHORTCUT.match(text)
+    if not match or len(text.split()) == 5 and match.group("days").split()[0][0] in "0123456789*":
+        return CronSchedule(text)
+
+    hour, minute = int(match.group("hour")), int(match.group("minute") or 0)
+    if hour > 23 or minute > 59:
+        raise CronError(f"horário inválido: {hour:02d}:{minute:02d}")
+
+    days = match.group("days")
+    weekdays = _DAY_ALIASES.get(days)
+    if weekdays is None:
+        tokens = [t for t in re.split(r"[,\s]+", days) if t and t != "e"]
+        try:
+            weekdays = ",".join(str(WEEKDAYS[t[:3]]) for t in tokens)
+        except KeyError as e:
+            raise CronError(f"dia desconhecido: {e.args[0]}")
+        if not weekdays:
+            raise CronError("indique os dias (ex: 'dias úteis 08:00')")
+
+    return CronSchedule(f"{minute} {hour} * * {weekdays}")
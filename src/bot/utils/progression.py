@@ -0,0 +1,47 @@
+"""
+Curva de níveis (Maturidade). Passar do nível n para o n+1 custa `base * n` XP,
+logo o XP total para chegar ao nível n é a série aritmética base * n(n-1)/2,
+e o nível de um total T sai em O(1): n = (b + isqrt(b² + 8Tb)) // 2b.
+"""
+from math import isqrt
+from bot.config import settings
+
+try:
+    import numpy as np
+except ImportError: # Opcional: só acelera o recálculo em lote
+    np = None
+
+def xp_for_next(level: int, base: int | None = None) -> int:
+    """XP necessário para passar do nível `level` ao seguinte."""
+    return (base or settings.level_xp_base) * level
+
+def xp_to_reach(level: int, base: int | None = None) -> int:
+    """XP total acumulado ao chegar ao nível `level` (o nível 1 parte de 0)."""
+    return (base or settings.level_xp_base) * level * (level - 1) // 2
+
+def level_for(total: int, base: int | None = None) -> int:
+    """Nível correspondente a um XP total (forma fechada, aritmética inteira exata)."""
+    b = base or settings.level_xp_base
+    return (b + isqrt(b * b + 8 * max(total, 0) * b)) // (2 * b)
+
+def split_xp(total: int, base: int | None = None) -> tuple[int, int]:
+    """(nível, XP dentro do nível) de um XP total."""
+    level = level_for(total, base)
+    return level, max(total, 0) - xp_to_reach(level, base)
+
+def split_many(totals, base: int | None = None):
+    """
+    Versão vetorizada de split_xp para uma coluna inteira de totais.
+    Com NumPy devolve dois arrays; sem ele, duas listas.
+    """
+    b = base or settings.level_xp_base
+    if np is None:
+        pairs = [split_xp(int(t), b) for t in totals]
+        return [p[0] for p in pairs], [p[1] for p in pairs]
+
+    t = np.maximum(np.asarray(totals, dtype=np.int64), 0)
+    levels = ((b + np.sqrt(b * b + 8.0 * b * t)) // (2 * b)).astype(np.int64)
+    # O sqrt em vírgula flutuante pode errar por um nos limites exatos de cada nível
+    levels -= b * levels * (levels - 1) // 2 > t
+    levels += b * (levels + 1) * levels // 2 <= t
+    return levels, t - b * levels * (levels - 1) // 2
@@ -1,30 +1,49 @@
 import os
 import sys
-from fastapi import FastAPI, HTTPException, Depends
+import json
+import hashlib
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from sqlmodel import Session, select, create_engine
+from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel, ConfigDict # <--- Importação Nova
 import uvicorn
 
-# Adiciona o diretório raiz ao path para importar módulos do bot
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-
-# Importações do Bot
-from src.bot.config import settings
-from src.bot.models.guild_config import GuildConfig
-
-app = FastAPI(title="Dream Club API")
-
-# Configuração do Banco
-# Usamos o mesmo arquivo do bot
-sqlite_url = settings.db_url.replace("sqlite+aiosqlite", "sqlite")
-# check_same_thread=False é necessário para SQLite com FastAPI (threads diferentes)
-engine = create_engine(sqlite_url, connect_args={"check_same_thread": False})
-
-def get_session():
-    with Session(engine) as session:
-        yield session
+# Adiciona a pasta src ao path para importar o pacote `bot` (tal como o bot faz em main.py)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Importações do Bot (mesma engine assíncrona, sessões e serviços)
+from bot.config import settings
+from bot.core.database import get_session, log_engine_profile
+from bot.core.cache import invalidation_channel
+from bot.services.guild_service import GuildService
+import bot.models
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await log_engine_profile()
+    # Mantém a cache de GuildConfig coerente com as alterações feitas pelo bot
+    invalidation_channel.start(settings.cache_poll_interval)
+    yield
+    await invalidation_channel.stop()
+
+app = FastAPI(title="Dream Club API", lifespan=lifespan)
+
+async def get_guild_service():
+    async with get_session() as session:
+        yield GuildService(session)
+
+def config_etag(payload: dict) -> str:
+    """ETag forte calculada a partir do conteúdo da configuração."""
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
 
 # Modelo de Dados para validação da API
 class ConfigUpdate(BaseModel):
@@ -41,36 +60,22 @@ class ConfigUpdate(BaseModel):
 # --- API Endpoints ---
 
 @app.get("/api/guild/{guild_id}")
-async def get_guild_config(guild_id: int, session: Session = Depends(get_session)):
-    stmt = select(GuildConfig).where(GuildConfig.guild_id == guild_id)
-    config = session.exec(stmt).first()
-
-    if not config:
-        config = GuildConfig(guild_id=guild_id)
-        session.add(config)
-        session.commit()
-        session.refresh(config)
-    
-    return config
+async def get_guild_config(guild_id: int, request: Request, service: GuildService = Depends(get_guild_service)):
+    config = await service.get_config(guild_id)
+    payload = config.model_dump(mode="json")
+
+    etag = config_etag(payload)
+    # no-cache: o browser guarda a resposta mas revalida sempre com If-None-Match
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(payload, headers=headers)
 
 @app.post("/api/guild/{guild_id}")
-async def update_guild_config(guild_id: int, data: ConfigUpdate, session: Session = Depends(get_session)):
-    stmt = select(GuildConfig).where(GuildConfig.guild_id == guild_id)
-    config = session.exec(stmt).first()
-    
-    if not config:
-        raise HTTPException(status_code=404, detail="Guild not found")
-
-    config.welcome_message_text = data.welcome_message_text
-    config.module_welcome = data.module_welcome
-    config.module_economy = data.module_economy
-    config.module_music = data.module_music
-    config.module_tickets = data.module_tickets
-    config.module_automod = data.module_automod
-    
-    session.add(config)
-    session.commit()
-    
+async def update_guild_config(guild_id: int, data: ConfigUpdate, service: GuildService = Depends(get_guild_service)):
+    # O serviço grava, atualiza a cache e avisa os processos do bot (MAIN/MUSIC_n)
+    await service.update_config(guild_id, **data.model_dump())
     return {"status": "success", "message": "Configurações salvas!"}
 
 # --- Servir Frontend ---
@@ -13,7 +13,7 @@ let currentConfig = {};
 
 // --- Funções de API ---
 
-async def fetchConfig() {
+async function fetchConfig() {
     try {
         const response = await fetch(API_URL);
         currentConfig = await response.json();
@@ -26,7 +26,7 @@ async def fetchConfig() {
     }
 }
 
-async def saveConfig() {
+async function saveConfig() {
     try {
         const response = await fetch(API_URL, {
             method: 'POST',